@@ -0,0 +1,97 @@
+"""
+async_memory_bench.py: Memory tool-call latency under event-loop load.
+
+Replays the way GeminiLive dispatches memory tools while other blocking jobs
+(screenshots, audio, SFX) keep the loop's default executor busy. Compares
+sync tools sent through ``loop.run_in_executor(None, ...)`` against the
+coroutine tools backed by ``AsyncMemoryManager``'s dedicated thread.
+
+Usage:
+    python benchmarks/async_memory_bench.py [--calls 500] [--background 16]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.async_memory import AsyncMemoryManager  # noqa: E402
+from classes.memory import MemoryManager  # noqa: E402
+from classes.tool_definitions import get_tool_mapping  # noqa: E402
+
+
+async def _background_load(stop: asyncio.Event, jobs: int) -> None:
+    """Keep ``jobs`` short blocking tasks queued on the default executor."""
+    loop = asyncio.get_running_loop()
+
+    async def worker():
+        while not stop.is_set():
+            await loop.run_in_executor(None, time.sleep, 0.01)
+
+    await asyncio.gather(*(worker() for _ in range(jobs)))
+
+
+async def _call_tool(tool, **args):
+    if asyncio.iscoroutinefunction(tool):
+        return await tool(**args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lambda: tool(**args))
+
+
+async def _measure(tools: dict, calls: int, background: int) -> list[float]:
+    stop = asyncio.Event()
+    load = asyncio.create_task(_background_load(stop, background))
+    await asyncio.sleep(0.05)
+
+    latencies = []
+    for i in range(calls):
+        name, args = (
+            ("save_quick_note", {"content": f"note {i}", "tags": ["bench"]})
+            if i % 2 == 0
+            else ("search_memories", {"query": "note", "limit": 5})
+        )
+        start = time.perf_counter()
+        await _call_tool(tools[name], **args)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    stop.set()
+    await load
+    return latencies
+
+
+def _summary(latencies: list[float]) -> str:
+    q = statistics.quantiles(latencies, n=100)
+    return f"p50 {q[49]:7.2f} ms  p95 {q[94]:7.2f} ms  p99 {q[98]:7.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=500, help="Tool calls to time")
+    parser.add_argument(
+        "--background", type=int, default=16, help="Concurrent blocking jobs"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = MemoryManager(str(Path(tmp) / "executor.db"))
+        sync_tools = get_tool_mapping(MagicMock(), manager)
+        executor = asyncio.run(_measure(sync_tools, args.calls, args.background))
+        manager.close()
+
+        memory = AsyncMemoryManager(db_path=str(Path(tmp) / "dedicated.db"))
+        async_tools = get_tool_mapping(MagicMock(), memory)
+        dedicated = asyncio.run(_measure(async_tools, args.calls, args.background))
+        memory.close()
+
+    print(f"default executor  {_summary(executor)}")
+    print(f"memory thread     {_summary(dedicated)}")
+
+
+if __name__ == "__main__":
+    main()
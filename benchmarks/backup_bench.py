@@ -0,0 +1,119 @@
+"""
+backup_bench.py: Memory call latency while the database is being backed up.
+
+Fills a database with synthetic memories, then issues memory calls from the
+event loop (as tool calls do) through ``AsyncMemoryManager`` while nothing
+else runs, while ``snapshot`` copies the database step by step, and while a
+one-step copy blocks the memory thread (the naive approach). Reports call
+latency percentiles and how long each backup took.
+
+Usage:
+    python benchmarks/backup_bench.py [--rows 100000] [--pages 64]
+"""
+
+import argparse
+import asyncio
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import closing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.async_memory import AsyncMemoryManager  # noqa: E402
+from classes.memory import MemoryManager, MemoryType  # noqa: E402
+
+
+async def _call_latencies(
+    memories: AsyncMemoryManager, ids: list[int], done: asyncio.Event
+) -> list[float]:
+    """Alternate reads and writes until ``done`` is set; latencies in ms."""
+    latencies = []
+    i = 0
+    while not done.is_set() or len(latencies) < 200:
+        start = time.perf_counter()
+        if i % 4:
+            await memories.get_memory(ids[i % len(ids)])
+        else:
+            await memories.store_memory(f"Benchmark note {i}", MemoryType.LONG_TERM)
+        latencies.append((time.perf_counter() - start) * 1e3)
+        i += 1
+        await asyncio.sleep(0.001)
+    return latencies
+
+
+async def _run(memories: AsyncMemoryManager, ids: list[int], backup) -> tuple:
+    done = asyncio.Event()
+    calls = asyncio.create_task(_call_latencies(memories, ids, done))
+    start = time.perf_counter()
+    if backup:
+        await backup()
+    else:
+        await asyncio.sleep(1.0)
+    elapsed = time.perf_counter() - start
+    done.set()
+    latencies = sorted(await calls)
+    p99 = latencies[int(len(latencies) * 0.99)]
+    return elapsed, statistics.median(latencies), p99, latencies[-1]
+
+
+def _one_step_copy(manager: MemoryManager, destination: Path) -> None:
+    """Back up in a single step on the calling (memory) thread."""
+    with closing(sqlite3.connect(destination)) as target:
+        manager._connect().backup(target)
+
+
+async def _main(rows: int, pages: int, tmp: Path) -> None:
+    db_path = tmp / "memories.db"
+    with MemoryManager(str(db_path), near_duplicate_threshold=None) as manager:
+        manager.store_memories(
+            [
+                {
+                    "content": f"Synthetic memory {i} about topic {i % 97}. " * 3,
+                    "memory_type": MemoryType.LONG_TERM,
+                    "tags": [f"topic{i % 97}"],
+                }
+                for i in range(rows)
+            ]
+        )
+    size_mib = db_path.stat().st_size / 2**20
+
+    memories = AsyncMemoryManager(
+        db_path=str(db_path), cache_size=0, near_duplicate_threshold=None
+    )
+    ids = list(range(1, rows + 1, max(1, rows // 1000)))
+    cases = [
+        ("idle", None),
+        (
+            f"snapshot, {pages} pages/step",
+            lambda: memories.snapshot(tmp / "snapshots", 2, pages),
+        ),
+        (
+            "one-step copy on memory thread",
+            lambda: memories.call(_one_step_copy, memories.manager, tmp / "copy.db"),
+        ),
+    ]
+    print(f"{rows} rows, {size_mib:.1f} MiB")
+    print(f"{'case':<32} {'backup s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label, backup in cases:
+        elapsed, p50, p99, worst = await _run(memories, ids, backup)
+        shown = f"{elapsed:.2f}" if backup else "-"
+        print(f"{label:<32} {shown:>9} {p50:>8.2f} {p99:>8.2f} {worst:>8.2f}")
+    await memories.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000, help="Stored memories")
+    parser.add_argument("--pages", type=int, default=64, help="Pages per step")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_main(args.rows, args.pages, Path(tmp)))
+
+
+if __name__ == "__main__":
+    main()
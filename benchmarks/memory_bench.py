@@ -0,0 +1,115 @@
+"""
+memory_bench.py: Store/fetch throughput of the SQLite memory backend.
+
+Compares the previous access pattern (a fresh ``sqlite3.connect`` plus a
+commit per call, default rollback journal) against ``MemoryManager`` with
+its pooled per-thread WAL connections, with and without write-behind
+batching.
+
+Usage:
+    python benchmarks/memory_bench.py [--ops 2000]
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.memory import MemoryManager, MemoryType  # noqa: E402
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS memories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT NOT NULL,
+        content TEXT NOT NULL,
+        tags TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        importance INTEGER DEFAULT 1
+    )
+"""
+
+
+def _legacy_store(db_path: Path, content: str) -> int:
+    now = datetime.now().isoformat()
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.execute(
+            "INSERT INTO memories (type, content, tags, created_at, updated_at, importance)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            ("short_term", content, json.dumps(["bench"]), now, now, 1),
+        )
+        conn.commit()
+        return cursor.lastrowid  # type: ignore
+
+
+def _legacy_fetch(db_path: Path, memory_id: int) -> dict:
+    with sqlite3.connect(db_path) as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute(
+            "SELECT * FROM memories WHERE id = ?", (memory_id,)
+        ).fetchone()
+    return dict(row)
+
+
+def _rate(ops: int, seconds: float) -> str:
+    return f"{ops / seconds:10.0f} ops/s"
+
+
+def bench_legacy(db_path: Path, ops: int) -> tuple[float, float]:
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(_SCHEMA)
+
+    start = time.perf_counter()
+    ids = [_legacy_store(db_path, f"memory {i}") for i in range(ops)]
+    store_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for memory_id in ids:
+        _legacy_fetch(db_path, memory_id)
+    fetch_s = time.perf_counter() - start
+    return store_s, fetch_s
+
+
+def bench_pooled(db_path: Path, ops: int, **options) -> tuple[float, float]:
+    with MemoryManager(str(db_path), **options) as manager:
+        start = time.perf_counter()
+        ids = [
+            manager.store_memory(f"memory {i}", MemoryType.SHORT_TERM, ["bench"])
+            for i in range(ops)
+        ]
+        store_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for memory_id in ids:
+            manager.get_memory(memory_id)
+        fetch_s = time.perf_counter() - start
+    return store_s, fetch_s
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per phase")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = bench_legacy(Path(tmp) / "legacy.db", args.ops)
+        pooled = bench_pooled(Path(tmp) / "pooled.db", args.ops)
+        batched = bench_pooled(Path(tmp) / "batched.db", args.ops, write_behind=True)
+
+    print(f"{'':24}{'store':>16}{'fetch':>16}")
+    for label, (store_s, fetch_s) in (
+        ("connect-per-call", legacy),
+        ("pooled WAL", pooled),
+        ("pooled WAL + batching", batched),
+    ):
+        print(f"{label:24}{_rate(args.ops, store_s):>16}{_rate(args.ops, fetch_s):>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+memory_import_bench.py: Bulk NDJSON import time.
+
+Writes synthetic memories to an NDJSON file, imports it into an empty
+database with ``import_ndjson``, imports it again (every row a duplicate),
+then times the ``merge_near_duplicates`` passes that fingerprint the
+imported rows afterwards.
+
+Usage:
+    python benchmarks/memory_import_bench.py [--rows 100000] [--batch 500]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.memory import MemoryManager  # noqa: E402
+
+
+def _write_ndjson(path: Path, rows: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(rows):
+            record = {
+                "type": "long_term",
+                "content": f"Synthetic memory number {i} about topic {i % 97}",
+                "tags": [f"topic{i % 97}", "synthetic"],
+                "created_at": "2024-01-01T00:00:00",
+                "updated_at": "2024-01-01T00:00:00",
+                "importance": 1 + i % 5,
+            }
+            f.write(json.dumps(record))
+            f.write("\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000, help="Memories")
+    parser.add_argument(
+        "--batch", type=int, default=500, help="merge_near_duplicates batch size"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "memories.ndjson"
+        _write_ndjson(source, args.rows)
+        with MemoryManager(str(Path(tmp) / "import.db"), cache_size=0) as manager:
+            for label in ("import", "re-import"):
+                start = time.perf_counter()
+                counts = manager.import_ndjson(source)
+                print(f"{label:<10} {time.perf_counter() - start:>8.2f} s  {counts}")
+
+            start = time.perf_counter()
+            manager.merge_near_duplicates(args.batch)
+            pass_ms = (time.perf_counter() - start) * 1e3
+            print(f"one merge_near_duplicates({args.batch}) pass: {pass_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+memory_record_bench.py: Cost of turning fetched rows into memory records.
+
+Fills a database with synthetic memories, then fetches the whole table the
+way reads worked before (a dict per ``sqlite3.Row`` with tags decoded
+eagerly) and through ``fetch_all_memories`` (``Memory`` records, built from
+the row tuples), with and without a column projection. Reports median latency and the peak memory
+allocated while the result is held.
+
+Usage:
+    python benchmarks/memory_record_bench.py [--rows 100000] [--repeats 5]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.memory import MemoryManager, MemoryType  # noqa: E402
+
+
+def _dict_rows(manager: MemoryManager) -> list[dict]:
+    """The read path before ``Memory`` records: one eager dict per row."""
+    rows = manager._connect().execute(
+        "SELECT * FROM memories WHERE (expires_at IS NULL OR expires_at > ?)"
+        " ORDER BY updated_at DESC",
+        (time.strftime("%Y-%m-%dT%H:%M:%S"),),
+    )
+    return [
+        {
+            "id": row["id"],
+            "type": row["type"],
+            "content": row["content"],
+            "tags": json.loads(row["tags"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "importance": row["importance"],
+            "expires_at": row["expires_at"],
+        }
+        for row in rows
+    ]
+
+
+def _measure(fetch, repeats: int) -> tuple[float, float]:
+    """Median latency (ms) and peak allocation (MiB) of ``fetch``."""
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fetch()
+        latencies.append((time.perf_counter() - start) * 1e3)
+        del result
+    tracemalloc.start()
+    result = fetch()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return statistics.median(latencies), peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000, help="Stored memories")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed fetches")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # cache_size=0 so every fetch reads the database.
+        with MemoryManager(
+            str(Path(tmp) / "records.db"), cache_size=0, near_duplicate_threshold=None
+        ) as manager:
+            manager.store_memories(
+                [
+                    {
+                        "content": f"Synthetic memory number {i} about topic {i % 97}",
+                        "memory_type": MemoryType.LONG_TERM,
+                        "tags": [f"topic{i % 97}", "synthetic"],
+                    }
+                    for i in range(args.rows)
+                ]
+            )
+            cases = [
+                ("dict rows (before)", lambda: _dict_rows(manager)),
+                ("Memory records", manager.fetch_all_memories),
+                (
+                    "Memory records, id+content",
+                    lambda: manager.fetch_all_memories(columns=("id", "content")),
+                ),
+            ]
+            print(f"{args.rows} rows")
+            print(f"{'read path':<28} {'median ms':>10} {'peak MiB':>10}")
+            for label, fetch in cases:
+                latency, peak = _measure(fetch, args.repeats)
+                print(f"{label:<28} {latency:>10.1f} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+near_duplicate_bench.py: Cost of the near-duplicate check on memory writes.
+
+Fills a database with synthetic memories, then times ``store_memory`` for
+new facts and for reworded repeats of stored ones, with the check disabled
+and at the shipped default threshold (``--threshold`` to try another), and
+reports how many repeats were merged.
+
+Usage:
+    python benchmarks/near_duplicate_bench.py [--rows 100000] [--writes 500]
+        [--threshold 0.8]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.memory import MemoryManager, MemoryType  # noqa: E402
+
+_SUBJECTS = ["User", "The user", "Their friend", "User's sister", "Player"]
+_VERBS = ["likes", "hates", "plays", "collects", "watches", "visits", "owns"]
+_FILLERS = ["really", "often", "now", "usually", "still"]
+
+
+def _vocabulary(rng: random.Random, size: int) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(size)]
+
+
+def _fact(rng: random.Random, words: list[str]) -> str:
+    objects = " ".join(rng.choices(words, k=rng.randint(2, 6)))
+    return f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {objects}"
+
+
+def _reword(rng: random.Random, fact: str) -> str:
+    words = fact.split()
+    words.insert(rng.randint(1, len(words)), rng.choice(_FILLERS))
+    text = " ".join(words)
+    return text.lower() if rng.random() < 0.5 else text + "."
+
+
+def _time_writes(manager: MemoryManager, contents: list[str]) -> list[float]:
+    latencies = []
+    for content in contents:
+        start = time.perf_counter()
+        manager.store_memory(content, MemoryType.LONG_TERM)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000, help="Stored memories")
+    parser.add_argument("--writes", type=int, default=500, help="Writes to time")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.8,
+        help="Similarity threshold of the check (default: config.yaml.example's)",
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(15)
+    words = _vocabulary(rng, 20_000)
+    stored = [_fact(rng, words) for _ in range(args.rows)]
+    fresh = [_fact(rng, words) for _ in range(args.writes)]
+    repeats = [_reword(rng, fact) for fact in rng.sample(stored, args.writes)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, threshold in (
+            ("check off", None),
+            (f"check {args.threshold}", args.threshold),
+        ):
+            db_path = Path(tmp) / f"{threshold}.db"
+            with MemoryManager(str(db_path), near_duplicate_threshold=None) as m:
+                m.store_memories(
+                    [
+                        {"content": content, "memory_type": MemoryType.LONG_TERM}
+                        for content in stored
+                    ]
+                )
+            with MemoryManager(
+                str(db_path), near_duplicate_threshold=threshold
+            ) as manager:
+                # One pass over every row fingerprints the seeded memories,
+                # as the periodic merge does for bulk-stored ones.
+                manager.merge_near_duplicates(args.rows)
+                seeded = manager.get_stats()["total"]
+                new = _time_writes(manager, fresh)
+                repeated = _time_writes(manager, repeats)
+                total = manager.get_stats()["total"]
+            merged = seeded + len(fresh) + len(repeats) - total
+            print(
+                f"{label:10}  new p50 {statistics.median(new):6.0f} µs"
+                f"  repeat p50 {statistics.median(repeated):6.0f} µs"
+                f"  merged {merged}/{len(repeats)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
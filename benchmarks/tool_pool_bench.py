@@ -0,0 +1,91 @@
+"""
+tool_pool_bench.py: Tool latency while slow sync tools hold the workers.
+
+Starts several screenshot captures that hang (stand-ins that sleep) and,
+while they run, a quick memory read, both as sync tools through
+``ToolExecutor``. Runs them with one shared pool and no time limit (like the
+event loop's default executor) and with the per-class pools and timeouts of
+``TOOL_POOLS``. Reports how long the memory read and the whole batch took,
+and the queue metrics recorded.
+
+Usage:
+    python benchmarks/tool_pool_bench.py [--captures 6] [--hang 2.0] [--timeout 1.0]
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.metrics import Metrics  # noqa: E402
+from classes.tool_definitions import TOOL_POOLS  # noqa: E402
+from classes.tool_executor import ToolExecutor, ToolTimeoutError  # noqa: E402
+
+
+async def _batch(executor: ToolExecutor, captures: int, hang: float) -> tuple:
+    def capture_screenshot():
+        time.sleep(hang)
+        return "Screenshot captured"
+
+    def fetch_long_term_memories():
+        time.sleep(0.01)
+        return "[]"
+
+    async def timed(name, func):
+        start = time.perf_counter()
+        try:
+            await executor.run(name, func, {})
+            outcome = "ok"
+        except ToolTimeoutError:
+            outcome = "timeout"
+        return outcome, time.perf_counter() - start
+
+    start = time.perf_counter()
+    calls = [timed("capture_screenshot", capture_screenshot) for _ in range(captures)]
+    await asyncio.sleep(0.05)  # the captures hold the workers by now
+    results = await asyncio.gather(
+        *calls, timed("fetch_long_term_memories", fetch_long_term_memories)
+    )
+    return results[-1], time.perf_counter() - start, results[:-1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--captures", type=int, default=6, help="Hanging captures")
+    parser.add_argument("--hang", type=float, default=2.0, help="Capture seconds")
+    parser.add_argument("--timeout", type=float, default=1.0, help="Time limit")
+    args = parser.parse_args()
+    logging.getLogger("classes.tool_executor").setLevel(logging.ERROR)
+
+    cases = [
+        ("shared pool, no limit", lambda m: ToolExecutor({"io": 4}, {}, 0, metrics=m)),
+        (
+            "per-class pools + timeout",
+            lambda m: ToolExecutor(
+                None, TOOL_POOLS, timeout_seconds=args.timeout, metrics=m
+            ),
+        ),
+    ]
+    print(f"{'case':<26} {'read ms':>8} {'batch s':>8} {'timeouts':>9}  queue")
+    for label, make in cases:
+        metrics = Metrics()
+        executor = make(metrics)
+        (_, read), batch, captures = asyncio.run(
+            _batch(executor, args.captures, args.hang)
+        )
+        executor.shutdown()
+        timeouts = sum(outcome == "timeout" for outcome, _ in captures)
+        queue = {
+            name.split(".", 1)[1]: f"max depth {summary['max']:.0f}"
+            for name, summary in metrics.snapshot()["series"].items()
+            if name.startswith("tool_queue_depth.")
+        }
+        print(f"{label:<26} {read * 1e3:>8.1f} {batch:>8.2f} {timeouts:>9}  {queue}")
+
+
+if __name__ == "__main__":
+    main()
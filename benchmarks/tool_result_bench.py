@@ -0,0 +1,90 @@
+"""
+tool_result_bench.py: Payload size and serialization time of memory tool results.
+
+Compares the previous formatter (a list of dicts dumped with ``indent=2``)
+against the compact columnar format, both unbounded and with the default
+per-call byte budget.
+
+Usage:
+    python benchmarks/tool_result_bench.py [--repeat 200]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes import tool_definitions  # noqa: E402
+
+_WORDS = (
+    "user likes tacos ramen music avatar world friend prefers quiet evening".split()
+)
+
+
+def _legacy_format(memories: list[dict]) -> str:
+    return json.dumps(
+        [
+            {
+                "id": m["id"],
+                "type": m["type"],
+                "content": m["content"],
+                "tags": m["tags"],
+                "importance": m.get("importance", 1),
+            }
+            for m in memories
+        ],
+        indent=2,
+    )
+
+
+def _memories(count: int) -> list[dict]:
+    rng = random.Random(count)
+    return [
+        {
+            "id": i,
+            "type": rng.choice(["short_term", "long_term", "quick_note"]),
+            "content": " ".join(rng.choices(_WORDS, k=rng.randint(6, 40))),
+            "tags": rng.sample(_WORDS, 2),
+            "importance": rng.randint(1, 5),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _time(format_fn, memories: list[dict], repeat: int) -> tuple[int, float]:
+    payload = format_fn(memories)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        format_fn(memories)
+    elapsed_us = (time.perf_counter() - start) / repeat * 1e6
+    return len(payload.encode("utf-8")), elapsed_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per case")
+    args = parser.parse_args()
+
+    formatters = {
+        "indent=2 (previous)": _legacy_format,
+        "compact columnar": lambda m: tool_definitions._format_memories(
+            m, float("inf")
+        ),
+        f"compact, {tool_definitions.DEFAULT_RESULT_BUDGET_BYTES} B budget": lambda m: tool_definitions._format_memories(
+            m, tool_definitions.DEFAULT_RESULT_BUDGET_BYTES, resume=lambda i: "x" * 48
+        ),
+    }
+    print(f"{'memories':>8}  {'format':32}{'bytes':>10}{'µs/call':>10}")
+    for count in (10, 50, 500):
+        memories = _memories(count)
+        for label, format_fn in formatters.items():
+            size, micros = _time(format_fn, memories, args.repeat)
+            print(f"{count:>8}  {label:32}{size:>10}{micros:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
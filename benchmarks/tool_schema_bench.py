@@ -0,0 +1,90 @@
+"""
+tool_schema_bench.py: Cost of declaring the tools to Gemini on each connect.
+
+Compares what the google-genai SDK does on every connect when handed the
+tool functions (``FunctionDeclaration.from_callable`` per function) with
+building the explicit declarations of ``ToolSchema``, loading them from the
+declaration cache file (a later start) and from the in-process cache (a
+reconnect). Also times checking and coercing one call's arguments.
+
+Usage:
+    python benchmarks/tool_schema_bench.py [--repeats 20]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from google import genai  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from classes import tool_schema  # noqa: E402
+from classes.tool_definitions import get_tool_definitions  # noqa: E402
+from classes.tool_schema import ToolSchema  # noqa: E402
+
+
+def _introspect(client, functions: list) -> int:
+    """Declare ``functions`` the way the SDK does on connect; returns how many it could."""
+    declared = 0
+    for func in functions:
+        try:
+            types.FunctionDeclaration.from_callable(
+                client=client, callable=func, use_json_schema=True
+            )
+            declared += 1
+        except ValueError:
+            pass  # e.g. list[TypedDict] parameters, which the SDK rejects
+    return declared
+
+
+def _median_ms(func, repeats: int) -> float:
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs")
+    args = parser.parse_args()
+
+    functions = get_tool_definitions()
+    client = genai.Client(api_key="unused")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = str(Path(tmp) / "tool_declarations.json")
+        schema = ToolSchema.load(functions, cache_path)
+
+        def from_file():
+            tool_schema._LOADED.clear()
+            ToolSchema.load(functions, cache_path)
+
+        cases = [
+            ("SDK introspection", lambda: _introspect(client, functions)),
+            ("ToolSchema.build", lambda: ToolSchema.build(functions)),
+            ("load from cache file", from_file),
+            ("load in process", lambda: ToolSchema.load(functions, cache_path)),
+            (
+                "coerce save_memories",
+                lambda: schema.coerce(
+                    "save_memories",
+                    {"memories": [{"content": "likes tacos", "importance": "3"}]},
+                ),
+            ),
+        ]
+        introspected = _introspect(client, functions)
+        print(f"{len(functions)} tools, {introspected} declarable by the SDK")
+        print(f"{'case':<24} {'median ms':>10}")
+        for label, func in cases:
+            print(f"{label:<24} {_median_ms(func, args.repeats):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+tool_turn_bench.py: Latency of a tool turn with several function calls.
+
+Sends one tool call asking for look_left, look_right, jump, a memory fetch
+and a screenshot (stand-ins that sleep for typical durations) through
+``GeminiLive._handle_tool_call`` with a fake session. Runs it one call at a
+time (``max_concurrent_tools=1``, the old behaviour), concurrently, and
+with the look tools in the background, and checks that responses keep the
+order and IDs of the calls and that background actions report back.
+
+Usage:
+    python benchmarks/tool_turn_bench.py [--scale 0.1] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from google.genai import types  # noqa: E402
+
+from classes import tool_definitions  # noqa: E402
+from classes.gemini_live import GeminiLive  # noqa: E402
+
+
+class _FakeSession:
+    def __init__(self):
+        self.responses = None
+        self.notes = []
+
+    async def send_tool_response(self, function_responses):
+        self.responses = function_responses
+
+    async def send_client_content(self, turns, turn_complete=True):
+        self.notes.append(turns.parts[0].text)
+
+
+def _tool_mapping(scale: float) -> dict:
+    async def look(seconds: float):
+        await asyncio.sleep(seconds * scale)
+        return "ok"
+
+    async def jump():
+        await asyncio.sleep(0.1 * scale)
+        return "ok"
+
+    def fetch_long_term_memories(page_token=None, page_size=50):
+        time.sleep(0.4 * scale)  # a database read on a worker thread
+        return "[]"
+
+    def capture_screenshot():
+        time.sleep(1.0 * scale)
+        return "Screenshot captured"
+
+    return {
+        "look_left": look,
+        "look_right": look,
+        "jump": jump,
+        "fetch_long_term_memories": fetch_long_term_memories,
+        "capture_screenshot": capture_screenshot,
+    }
+
+
+_CALLS = [
+    ("look_left", {"seconds": 2}),
+    ("fetch_long_term_memories", {}),
+    ("jump", {}),
+    ("look_right", {"seconds": 1}),  # same axis as look_left: runs after it
+    ("capture_screenshot", {}),
+]
+
+
+async def _turn(
+    concurrency: int, scale: float, background: frozenset
+) -> tuple[float, list, list]:
+    gemini = GeminiLive(
+        api_key="unused",
+        model="unused",
+        input_sample_rate=16000,
+        tool_mapping=_tool_mapping(scale),
+        tool_conflicts=tool_definitions.TOOL_CONFLICT_GROUPS,
+        max_concurrent_tools=concurrency,
+        background_tools=background,
+    )
+    tool_call = types.LiveServerToolCall(
+        function_calls=[
+            types.FunctionCall(id=f"call-{i}", name=name, args=args)
+            for i, (name, args) in enumerate(_CALLS)
+        ]
+    )
+    session = _FakeSession()
+    start = time.perf_counter()
+    await gemini._handle_tool_call(session, tool_call, asyncio.Queue())
+    elapsed = time.perf_counter() - start
+    while gemini._tool_tasks or gemini._tool_jobs:
+        await asyncio.sleep(0.01)
+    return elapsed, [(r.id, r.name) for r in session.responses], session.notes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=float, default=0.1, help="Duration factor")
+    parser.add_argument("--concurrency", type=int, default=4, help="Calls at once")
+    args = parser.parse_args()
+
+    expected = [(f"call-{i}", name) for i, (name, _) in enumerate(_CALLS)]
+    durations = {"look_left": 2, "look_right": 1, "jump": 0.1}
+    durations.update(fetch_long_term_memories=0.4, capture_screenshot=1.0)
+    total = sum(durations.values()) * args.scale
+    slowest = (durations["look_left"] + durations["look_right"]) * args.scale
+    print(f"sum of calls {total:.2f}s, slowest conflict group {slowest:.2f}s")
+    cases = [
+        ("one at a time", 1, frozenset()),
+        ("concurrent", args.concurrency, frozenset()),
+        ("background", args.concurrency, tool_definitions.BACKGROUND_TOOLS),
+    ]
+    for label, concurrency, background in cases:
+        elapsed, responses, notes = asyncio.run(
+            _turn(concurrency, args.scale, background)
+        )
+        order = "ok" if responses == expected else f"WRONG {responses}"
+        print(f"{label:<14} {elapsed:6.2f}s  response order {order}", *notes)
+
+
+if __name__ == "__main__":
+    main()
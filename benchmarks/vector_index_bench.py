@@ -0,0 +1,71 @@
+"""
+vector_index_bench.py: Build and query latency of the memory similarity index.
+
+Indexes synthetic memories with ``HashedVectorIndex`` and reports build
+throughput and per-query latency percentiles.
+
+Usage:
+    python benchmarks/vector_index_bench.py [--memories 100000] [--queries 200]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.vector_index import HashedVectorIndex  # noqa: E402
+
+_WORDS = (
+    "user likes tacos ramen garlic bread music guitar drums world party friend "
+    "avatar dance jump scared happy sad tired game build map sunset ocean cat "
+    "dog birthday october favorite color blue green purple lives ohio texas "
+    "japan school work coffee tea movie anime pizza sushi late night stream"
+).split()
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(4, 14)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--memories", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = HashedVectorIndex(Path(tmp) / "bench.vec")
+
+        start = time.perf_counter()
+        for memory_id in range(1, args.memories + 1):
+            index.upsert(memory_id, _sentence(rng))
+        index.save()
+        build_s = time.perf_counter() - start
+
+        queries = [
+            " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 6)))
+            for _ in range(args.queries)
+        ]
+        index.search(queries[0], args.k)  # warm the page cache
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, args.k)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    print(f"memories indexed : {args.memories} ({args.memories / build_s:.0f}/s)")
+    print(f"query p50        : {statistics.median(timings):.2f} ms")
+    print(f"query p95        : {timings[int(len(timings) * 0.95) - 1]:.2f} ms")
+    print(f"query max        : {timings[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
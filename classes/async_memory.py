@@ -0,0 +1,232 @@
+"""
+async_memory.py: asyncio facade over MemoryManager.
+
+Every SQLite call is handed to one dedicated worker thread through a request
+queue, so memory work never competes with other jobs in the event loop's
+default executor, always reuses the same pooled connection, and runs in
+submission order. Coroutine methods mirror the MemoryManager API; the
+``blocking`` view offers the same calls to synchronous code such as the
+Streamlit dashboard.
+"""
+
+import asyncio
+import functools
+import queue
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from classes.memory import MemoryManager, MemoryType
+
+
+class _BlockingView:
+    """Synchronous view running each MemoryManager method on the worker thread."""
+
+    def __init__(self, owner: "AsyncMemoryManager"):
+        self._owner = owner
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._owner.manager, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            return self._owner.submit(attr, *args, **kwargs).result()
+
+        return call
+
+
+class AsyncMemoryManager:
+    """Runs a MemoryManager on a dedicated thread and exposes coroutine methods."""
+
+    def __init__(self, manager: Optional[MemoryManager] = None, **kwargs):
+        """
+        Start the worker thread.
+
+        Args:
+            manager (MemoryManager, optional): Manager to wrap, or a
+                ``MemoryRouter`` to serve per-context shards. When omitted,
+                a MemoryManager is created from ``kwargs``.
+        """
+        self.manager = manager or MemoryManager(**kwargs)
+        self.blocking = _BlockingView(self)
+        self._requests: queue.SimpleQueue = queue.SimpleQueue()
+        self._worker = threading.Thread(target=self._run, name="memory-db", daemon=True)
+        self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            future, func, args, kwargs = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """Queue ``func(*args, **kwargs)`` for the worker thread."""
+        if threading.current_thread() is self._worker:
+            # Re-entrant call from a task already on the worker: run inline
+            # instead of waiting on ourselves.
+            future = Future()
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+        if not self._worker.is_alive():
+            raise RuntimeError("AsyncMemoryManager is closed")
+        future = Future()
+        self._requests.put((future, func, args, kwargs))
+        return future
+
+    async def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run ``func(*args, **kwargs)`` on the worker thread and await it."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def close(self) -> None:
+        """Finish queued requests, stop the worker, then close the manager."""
+        if self._worker.is_alive():
+            self._requests.put(None)
+            self._worker.join()
+        self.manager.close()
+
+    async def aclose(self) -> None:
+        """Close without blocking the event loop."""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def cache_info(self) -> dict:
+        """Return query cache statistics (no database access needed)."""
+        return self.manager.cache_info()
+
+    # ------------------------------------------------------------------
+    # MemoryManager API
+    # ------------------------------------------------------------------
+
+    async def store_memory(
+        self,
+        content: str,
+        memory_type: MemoryType,
+        tags: Optional[list[str]] = None,
+        importance: int = 1,
+        expires_at: Optional[datetime] = None,
+    ) -> int:
+        """Async :meth:`MemoryManager.store_memory`."""
+        return await self.call(
+            self.manager.store_memory,
+            content,
+            memory_type,
+            tags,
+            importance,
+            expires_at,
+        )
+
+    async def store_memories(self, memories: list[dict]) -> list[int]:
+        """Async :meth:`MemoryManager.store_memories`."""
+        return await self.call(self.manager.store_memories, memories)
+
+    async def fetch_memories(self, *args, **kwargs) -> list[dict]:
+        """Async :meth:`MemoryManager.fetch_memories`."""
+        return await self.call(self.manager.fetch_memories, *args, **kwargs)
+
+    async def fetch_all_memories(
+        self, columns: Optional[Iterable[str]] = None
+    ) -> list[dict]:
+        """Async :meth:`MemoryManager.fetch_all_memories`."""
+        return await self.call(self.manager.fetch_all_memories, columns)
+
+    async def fetch_page(self, *args, **kwargs) -> tuple[list[dict], Optional[str]]:
+        """Async :meth:`MemoryManager.fetch_page`."""
+        return await self.call(self.manager.fetch_page, *args, **kwargs)
+
+    async def get_memory(self, memory_id: int) -> Optional[dict]:
+        """Async :meth:`MemoryManager.get_memory`."""
+        return await self.call(self.manager.get_memory, memory_id)
+
+    async def update_memory(self, *args, **kwargs) -> bool:
+        """Async :meth:`MemoryManager.update_memory`."""
+        return await self.call(self.manager.update_memory, *args, **kwargs)
+
+    async def delete_memory(self, memory_id: int) -> bool:
+        """Async :meth:`MemoryManager.delete_memory`."""
+        return await self.call(self.manager.delete_memory, memory_id)
+
+    async def update_memories(self, updates: list[dict]) -> list[bool]:
+        """Async :meth:`MemoryManager.update_memories`."""
+        return await self.call(self.manager.update_memories, updates)
+
+    async def delete_memories(self, memory_ids: list[int]) -> list[bool]:
+        """Async :meth:`MemoryManager.delete_memories`."""
+        return await self.call(self.manager.delete_memories, memory_ids)
+
+    async def search_memories(
+        self, query: str, limit: int = 20, offset: int = 0
+    ) -> list[dict]:
+        """Async :meth:`MemoryManager.search_memories`."""
+        return await self.call(self.manager.search_memories, query, limit, offset)
+
+    async def semantic_search(
+        self, query: str, limit: int = 5, offset: int = 0
+    ) -> list[dict]:
+        """Async :meth:`MemoryManager.semantic_search`."""
+        return await self.call(self.manager.semantic_search, query, limit, offset)
+
+    async def recall_memories(
+        self,
+        limit: int = 10,
+        memory_type: Optional[MemoryType] = None,
+        offset: int = 0,
+        record_access: bool = True,
+    ) -> list[dict]:
+        """Async :meth:`MemoryManager.recall_memories`."""
+        return await self.call(
+            self.manager.recall_memories, limit, memory_type, offset, record_access
+        )
+
+    async def revision(self, memory_type: Optional[MemoryType] = None) -> str:
+        """Async :meth:`MemoryManager.revision`."""
+        return await self.call(self.manager.revision, memory_type)
+
+    async def get_stats(self) -> dict:
+        """Async :meth:`MemoryManager.get_stats`."""
+        return await self.call(self.manager.get_stats)
+
+    async def flush(self) -> int:
+        """Async :meth:`MemoryManager.flush`."""
+        return await self.call(self.manager.flush)
+
+    async def purge_expired(self, batch_size: int = 200) -> int:
+        """Async :meth:`MemoryManager.purge_expired`."""
+        return await self.call(self.manager.purge_expired, batch_size)
+
+    async def merge_near_duplicates(self, batch_size: int = 500) -> int:
+        """Async :meth:`MemoryManager.merge_near_duplicates`."""
+        return await self.call(self.manager.merge_near_duplicates, batch_size)
+
+    async def run_maintenance(self, vacuum_pages: int = 256) -> None:
+        """Async :meth:`MemoryManager.run_maintenance`."""
+        return await self.call(self.manager.run_maintenance, vacuum_pages)
+
+    async def snapshot(
+        self, backup_dir, keep: int = 7, pages_per_step: int = 64
+    ) -> Path:
+        """Async :meth:`MemoryManager.snapshot`.
+
+        Runs in a thread of its own rather than on the memory thread, so
+        memory calls keep being served while the copy is made.
+        """
+        return await asyncio.to_thread(
+            self.manager.snapshot, backup_dir, keep, pages_per_step
+        )
+
+    async def restore(self, source) -> None:
+        """Async :meth:`MemoryManager.restore`."""
+        return await self.call(self.manager.restore, source)
@@ -7,7 +7,7 @@ Loads and manages configuration from config.yaml (API keys, OSC settings) and pr
 
 import logging
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import yaml
 
@@ -100,6 +100,131 @@ class Config:
         """Get OSC server port for incoming messages from VRChat (default: 9001)."""
         return self.get("osc", "receive_port", default=9001)
 
+    @property
+    def get_tools_max_concurrent(self) -> int:
+        """Get how many function calls of a tool turn run at once (default: 4)."""
+        return self.get("tools", "max_concurrent", default=4)
+
+    @property
+    def get_tools_timeout_seconds(self) -> float:
+        """Get the time limit of a tool call in seconds, 0 for none (default: 15)."""
+        return self.get("tools", "timeout_seconds", default=15.0)
+
+    @property
+    def get_tools_timeouts(self) -> dict:
+        """Get per-tool time limits overriding timeout_seconds (default: {})."""
+        return self.get("tools", "timeouts", default={}) or {}
+
+    @property
+    def get_tools_workers(self) -> dict:
+        """Get worker threads per tool pool: io, cpu, osc (default: 4, 2, 1)."""
+        return self.get("tools", "workers", default={}) or {}
+
+    @property
+    def get_tools_schema_cache(self) -> str:
+        """Get the file caching tool declarations between runs (default: 'tool_declarations.json')."""
+        return self.get("tools", "schema_cache", default="tool_declarations.json")
+
+    @property
+    def get_memory_db_path(self) -> str:
+        """Get path to the SQLite memory database (default: 'memories.db')."""
+        return self.get("memory", "db_path", default="memories.db")
+
+    @property
+    def get_memory_sharding(self) -> bool:
+        """Check if memories are kept in separate databases per context (default: False)."""
+        return self.get("memory", "sharding", default=False)
+
+    @property
+    def get_memory_shard_dir(self) -> str:
+        """Get the directory holding per-context memory databases (default: 'memory_shards')."""
+        return self.get("memory", "shard_dir", default="memory_shards")
+
+    @property
+    def get_memory_max_open_shards(self) -> int:
+        """Get how many per-context memory databases stay open at once (default: 8)."""
+        return self.get("memory", "max_open_shards", default=8)
+
+    @property
+    def get_memory_write_behind(self) -> bool:
+        """Check if memory writes are queued and flushed in batches (default: False)."""
+        return self.get("memory", "write_behind", default=False)
+
+    @property
+    def get_memory_flush_interval_ms(self) -> int:
+        """Get how often queued memory writes are flushed, in ms (default: 250)."""
+        return self.get("memory", "flush_interval_ms", default=250)
+
+    @property
+    def get_memory_flush_max_rows(self) -> int:
+        """Get how many queued memory writes trigger an early flush (default: 64)."""
+        return self.get("memory", "flush_max_rows", default=64)
+
+    @property
+    def get_memory_cache_size(self) -> int:
+        """Get how many memory query results are cached, 0 disables (default: 256)."""
+        return self.get("memory", "cache_size", default=256)
+
+    @property
+    def get_memory_cache_ttl_seconds(self) -> float:
+        """Get how long a cached memory query result stays valid (default: 30)."""
+        return self.get("memory", "cache_ttl_seconds", default=30.0)
+
+    @property
+    def get_memory_vector_index(self) -> bool:
+        """Check if the offline similarity index for memories is enabled (default: False)."""
+        return self.get("memory", "vector_index", default=False)
+
+    @property
+    def get_memory_near_duplicate_threshold(self) -> Optional[float]:
+        """Get the similarity (0-1) at which new memories merge into existing ones (default: 0.8)."""
+        return self.get("memory", "near_duplicate_threshold", default=0.8)
+
+    @property
+    def get_memory_digest_max_bytes(self) -> int:
+        """Get the size limit of the memory digest added to the prompt, 0 disables (default: 2000)."""
+        return self.get("memory", "digest_max_bytes", default=2000)
+
+    @property
+    def get_memory_reaper_interval_seconds(self) -> float:
+        """Get how often expired memories are purged, in seconds (default: 60)."""
+        return self.get("memory", "reaper_interval_seconds", default=60.0)
+
+    @property
+    def get_memory_backup_interval_hours(self) -> float:
+        """Get how often a memory database snapshot is taken, 0 disables (default: 24)."""
+        return self.get("memory", "backup_interval_hours", default=24.0)
+
+    @property
+    def get_memory_backup_dir(self) -> str:
+        """Get the directory holding memory database snapshots (default: 'memory_backups')."""
+        return self.get("memory", "backup_dir", default="memory_backups")
+
+    @property
+    def get_memory_backup_keep(self) -> int:
+        """Get how many memory database snapshots are kept (default: 7)."""
+        return self.get("memory", "backup_keep", default=7)
+
+    @property
+    def get_memory_tool_result_max_bytes(self) -> int:
+        """Get the size limit of each memory tool result, in bytes (default: 6000)."""
+        return self.get("memory", "tool_result_max_bytes", default=6000)
+
+    @property
+    def get_transcript_enabled(self) -> bool:
+        """Check if conversation transcripts are stored and searchable (default: True)."""
+        return self.get("transcript", "enabled", default=True)
+
+    @property
+    def get_transcript_db_path(self) -> str:
+        """Get path to the SQLite transcript database (default: 'transcripts.db')."""
+        return self.get("transcript", "db_path", default="transcripts.db")
+
+    @property
+    def get_transcript_flush_interval_ms(self) -> int:
+        """Get how often finished utterances are written, in ms (default: 1000)."""
+        return self.get("transcript", "flush_interval_ms", default=1000)
+
     @property
     def get_prompt_name(self) -> str:
         """Get the name of the system prompt to use from config (default: 'system_instruction')."""
@@ -9,7 +9,9 @@ lifecycle and event processing for AI responses.
 import asyncio
 import inspect
 import logging
+import time
 import traceback
+import uuid
 
 from google import genai
 from google.genai import types
@@ -17,9 +19,16 @@ from google.genai.errors import APIError
 from websockets.exceptions import ConnectionClosedOK
 
 from classes.config import DEFAULT_SYSTEM_PROMPT
+from classes.metrics import Metrics
+from classes.tool_executor import ToolExecutor, ToolTimeoutError
+from classes.tool_schema import ToolArgumentError
 
 logger = logging.getLogger(__name__)
 
+# Why a tool call was cancelled. Calls the server cancelled get no response.
+_SERVER_CANCELLED = "cancelled by the server"
+_INTERRUPTED = "interrupted by the user"
+
 
 class GeminiLive:
     """
@@ -42,6 +51,13 @@ class GeminiLive:
         voice_name="Puck",
         tools=None,
         tool_mapping=None,
+        tool_conflicts=None,
+        max_concurrent_tools=4,
+        background_tools=None,
+        metrics=None,
+        tool_executor=None,
+        tool_schema=None,
+        instruction_suffix=None,
     ):
         """
         Initializes the GeminiLive client.
@@ -54,6 +70,22 @@ class GeminiLive:
             voice_name (str, optional): Prebuilt voice to use for native audio.
             tools (list, optional): List of tools to enable. Defaults to None.
             tool_mapping (dict, optional): Mapping of tool names to functions. Defaults to None.
+            tool_conflicts (dict, optional): Conflict group of each tool whose
+                calls must not overlap (see TOOL_CONFLICT_GROUPS). Defaults to None.
+            max_concurrent_tools (int, optional): Most function calls of a tool
+                turn running at once. Defaults to 4.
+            background_tools (set, optional): Long-running tools acknowledged at
+                once and run in the background (see BACKGROUND_TOOLS). Defaults to None.
+            metrics (Metrics, optional): Where tool timings such as
+                time-to-cancel are recorded. Defaults to a new Metrics.
+            tool_executor (ToolExecutor, optional): Worker pools and timeouts
+                tools run with. Defaults to a ToolExecutor with default settings.
+            tool_schema (ToolSchema, optional): Declarations the arguments of
+                each call are checked and coerced against before it runs.
+                Defaults to None (arguments passed through as sent).
+            instruction_suffix (callable, optional): Coroutine function whose
+                result is appended to the system instruction on every connect,
+                e.g. a digest of current memories. Defaults to None.
         """
         self.api_key = api_key
         self.model = model
@@ -63,6 +95,19 @@ class GeminiLive:
         self.client = genai.Client(api_key=api_key)
         self.tools = tools or []
         self.tool_mapping = tool_mapping or {}
+        self.tool_conflicts = tool_conflicts or {}
+        self._tool_slots = asyncio.Semaphore(max(1, max_concurrent_tools))
+        self._tool_group_locks = {}
+        self.background_tools = frozenset(background_tools or ())
+        self.metrics = metrics or Metrics()
+        self.tool_executor = tool_executor or ToolExecutor(metrics=self.metrics)
+        self.tool_schema = tool_schema
+        self.instruction_suffix = instruction_suffix
+        # Running tool calls and background actions by function-call ID.
+        self._tool_tasks = {}
+        self._cancel_reasons = {}
+        # Tool turns and action reports still in progress.
+        self._tool_jobs = set()
 
     @staticmethod
     def _normalize_chunk(chunk):
@@ -181,37 +226,273 @@ class GeminiLive:
         except Exception as e:
             logger.info("send_text error: %s\n%s", e, traceback.format_exc())
 
-    async def _handle_tool_call(self, session, tool_call, event_queue):
-        function_responses = []
-        for fc in tool_call.function_calls:
-            func_name = fc.name
-            args = fc.args or {}
+    async def _invoke_tool(self, func_name, args):
+        """Run one tool and return its result; exceptions propagate."""
+        return await self.tool_executor.run(
+            func_name, self.tool_mapping[func_name], args
+        )
 
-            if func_name not in self.tool_mapping:
-                continue
+    async def _call_tool(self, func_name, args):
+        """Run one tool and return its result, or an error message."""
+        try:
+            return await self._invoke_tool(func_name, args)
+        except ToolTimeoutError as e:
+            return e.result
+        except Exception as e:
+            return f"Error: {e}"
 
-            try:
-                tool_func = self.tool_mapping[func_name]
-                if inspect.iscoroutinefunction(tool_func):
-                    result = await tool_func(**args)
-                else:
-                    loop = asyncio.get_running_loop()
-                    result = await loop.run_in_executor(None, lambda: tool_func(**args))
-            except Exception as e:
-                result = f"Error: {e}"
-
-            function_responses.append(
-                types.FunctionResponse(
-                    name=func_name,
-                    id=fc.id,
-                    response={"result": result},
+    def _group_lock(self, func_name):
+        """Lock of the tool's conflict group, or None if it conflicts with nothing.
+
+        Lock waiters are served first come, first served, so calls of one
+        group keep the order the model made them in.
+        """
+        group = self.tool_conflicts.get(func_name)
+        if group is None:
+            return None
+        return self._tool_group_locks.setdefault(group, asyncio.Lock())
+
+    async def _run_function_call(self, fc, args, event_queue):
+        """Run one function call once its conflict group and a slot are free."""
+        lock = self._group_lock(fc.name)
+        if lock is None:
+            async with self._tool_slots:
+                result = await self._call_tool(fc.name, args)
+        else:
+            async with lock, self._tool_slots:
+                result = await self._call_tool(fc.name, args)
+
+        await event_queue.put(
+            {"type": "tool_call", "name": fc.name, "args": args, "result": result}
+        )
+        return result
+
+    async def _run_background_action(
+        self, session, fc, action_id, args, event_queue, responded
+    ):
+        """Run a background call, then tell the model how it ended.
+
+        Background calls wait for their conflict group but do not hold a
+        concurrency slot. The outcome is reported from a task of its own, so
+        interrupting the user's turn cannot cancel an action that has
+        already finished; cancellations are reported by ``_action_stopped``.
+        """
+        lock = self._group_lock(fc.name)
+        try:
+            if lock is None:
+                result = await self._invoke_tool(fc.name, args)
+            else:
+                async with lock:
+                    result = await self._invoke_tool(fc.name, args)
+            status = "completed"
+        except ToolTimeoutError as e:
+            result, status = e.result, "timed out"
+        except Exception as e:
+            result, status = f"Error: {e}", "failed"
+        self._spawn(
+            self._report_action(
+                session, fc, action_id, status, result, event_queue, responded
+            )
+        )
+
+    def _action_stopped(self, task, session, fc, action_id, event_queue, responded):
+        """Done-callback of a background action: report it if the user interrupted it.
+
+        Runs even when the action was cancelled before its first step, so
+        its cancel reason is always dropped. Other cancellations are not
+        reported.
+        """
+        reason = self._cancel_reasons.pop(action_id, None)
+        if task.cancelled() and reason == _INTERRUPTED:
+            self._spawn(
+                self._report_action(
+                    session, fc, action_id, "cancelled", reason, event_queue, responded
                 )
             )
-            await event_queue.put(
-                {"type": "tool_call", "name": func_name, "args": args, "result": result}
+
+    async def _report_action(
+        self, session, fc, action_id, status, result, event_queue, responded
+    ):
+        """Tell the model how a background action ended.
+
+        The outcome is sent as context (without ending the user's turn), so
+        the model can mention it when it next speaks, and never before the
+        tool response acknowledging the call (``responded``).
+        """
+        await event_queue.put(
+            {
+                "type": "tool_done",
+                "name": fc.name,
+                "action_id": action_id,
+                "status": status,
+                "result": result,
+            }
+        )
+        note = f"[Action {action_id} ({fc.name}) {status}"
+        note += f": {result}]" if result is not None else "]"
+        await responded.wait()
+        try:
+            await session.send_client_content(
+                turns=types.Content(role="user", parts=[types.Part(text=note)]),
+                turn_complete=False,
+            )
+        except Exception as e:
+            logger.info("Could not report action %s: %s", action_id, e)
+
+    def _spawn(self, coro):
+        """Run ``coro`` as a task owned by the session (cancelled when it ends)."""
+        task = asyncio.create_task(coro)
+        self._tool_jobs.add(task)
+        task.add_done_callback(self._tool_jobs.discard)
+        return task
+
+    def _track(self, call_id, coro):
+        """Run ``coro`` as the cancellable task of function call ``call_id``."""
+        task = asyncio.create_task(coro)
+        self._tool_tasks[call_id] = task
+
+        def forget(_):
+            if self._tool_tasks.get(call_id) is task:
+                del self._tool_tasks[call_id]
+
+        task.add_done_callback(forget)
+        return task
+
+    def cancel_tool_calls(self, call_ids=None, reason="cancelled"):
+        """Cancel running tool calls by function-call ID (all when None).
+
+        Returns how many were cancelled. The time from the request until a
+        call has actually stopped (after releasing its OSC inputs, for
+        movement) is recorded in ``metrics`` as ``tool_cancel_ms``. Sync
+        tools stop being awaited at once, though their worker thread runs
+        the call to completion.
+        """
+        if call_ids is None:
+            call_ids = list(self._tool_tasks)
+        cancelled = 0
+        for call_id in call_ids:
+            task = self._tool_tasks.get(call_id)
+            if task is None or task.done():
+                continue
+            self._cancel_reasons[call_id] = reason
+            requested = time.perf_counter()
+            task.add_done_callback(
+                lambda _, start=requested: self.metrics.observe(
+                    "tool_cancel_ms", (time.perf_counter() - start) * 1000
+                )
+            )
+            task.cancel()
+            cancelled += 1
+        if cancelled:
+            self.metrics.increment("tool_calls_cancelled", cancelled)
+            logger.info("Cancelled %d tool calls (%s)", cancelled, reason)
+        return cancelled
+
+    async def _cancel_tool_work(self):
+        """Stop tool calls, background actions and reports when the session ends."""
+        self.cancel_tool_calls(reason="session ended")
+        tasks = [*self._tool_jobs, *self._tool_tasks.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._cancel_reasons.clear()
+
+    async def _start_call(self, session, fc, call_id, event_queue, responded):
+        """Start one function call.
+
+        Returns its task, or its result when that is known at once: the
+        acknowledgement of a background action, or the error for arguments
+        that do not match the tool's declaration (see ``tool_schema``).
+        """
+        args = fc.args or {}
+        try:
+            if self.tool_schema is not None:
+                args = self.tool_schema.coerce(fc.name, args)
+        except ToolArgumentError as e:
+            outcome = e.result
+        else:
+            if fc.name not in self.background_tools:
+                return self._track(
+                    call_id, self._run_function_call(fc, args, event_queue)
+                )
+            task = self._track(
+                call_id,
+                self._run_background_action(
+                    session, fc, call_id, args, event_queue, responded
+                ),
+            )
+            task.add_done_callback(
+                lambda done: self._action_stopped(
+                    done, session, fc, call_id, event_queue, responded
+                )
             )
+            outcome = {"status": "started", "action_id": call_id}
+        await event_queue.put(
+            {"type": "tool_call", "name": fc.name, "args": args, "result": outcome}
+        )
+        return outcome
+
+    def _function_response(self, fc, call_id, outcome):
+        """Response for one call, or None if the server withdrew the call."""
+        if isinstance(outcome, asyncio.Task):
+            if outcome.cancelled():
+                reason = self._cancel_reasons.pop(call_id, "cancelled")
+                if reason == _SERVER_CANCELLED:
+                    return None
+                outcome = f"Cancelled: {reason}"
+            else:
+                outcome = outcome.result()
+        return types.FunctionResponse(
+            name=fc.name, id=fc.id, response={"result": outcome}
+        )
 
-        await session.send_tool_response(function_responses=function_responses)
+    async def _handle_tool_call(self, session, tool_call, event_queue):
+        """Run the function calls of a tool turn concurrently and reply once.
+
+        Calls start in the order given and at most ``max_concurrent_tools``
+        run at a time; calls in the same conflict group wait for each other.
+        The turn takes about as long as its slowest call (or conflict group)
+        instead of the sum of all calls. Background tools only count with
+        their acknowledgement. Every call runs as a task keyed by its
+        function-call ID (see ``cancel_tool_calls``). Responses keep the
+        order and IDs of the calls; calls the server cancelled are left out.
+        """
+        responded = asyncio.Event()
+        entries = []
+        try:
+            for fc in tool_call.function_calls:
+                if fc.name not in self.tool_mapping:
+                    continue
+                call_id = fc.id or uuid.uuid4().hex[:8]
+                outcome = await self._start_call(
+                    session, fc, call_id, event_queue, responded
+                )
+                entries.append((fc, call_id, outcome))
+
+            await asyncio.gather(
+                *(o for _, _, o in entries if isinstance(o, asyncio.Task)),
+                return_exceptions=True,
+            )
+            function_responses = []
+            for fc, call_id, outcome in entries:
+                response = self._function_response(fc, call_id, outcome)
+                if response is None:
+                    continue
+                if isinstance(outcome, asyncio.Task) and outcome.cancelled():
+                    await event_queue.put(
+                        {
+                            "type": "tool_cancelled",
+                            "name": fc.name,
+                            "result": response.response["result"],
+                        }
+                    )
+                function_responses.append(response)
+            if function_responses:
+                await session.send_tool_response(function_responses=function_responses)
+        except Exception as e:
+            logger.info("Tool call handling failed: %s\n%s", e, traceback.format_exc())
+        finally:
+            responded.set()
 
     async def _emit_server_content_events(
         self,
@@ -247,6 +528,7 @@ class GeminiLive:
             await event_queue.put({"type": "turn_complete"})
 
         if server_content.interrupted:
+            self.cancel_tool_calls(reason=_INTERRUPTED)
             await self._invoke_callback(audio_interrupt_callback)
             await event_queue.put({"type": "interrupted"})
 
@@ -279,7 +561,13 @@ class GeminiLive:
 
         tool_call = response.tool_call
         if tool_call:
-            await self._handle_tool_call(session, tool_call, event_queue)
+            # Runs as a task so cancellations and interruptions arriving
+            # meanwhile are still received.
+            self._spawn(self._handle_tool_call(session, tool_call, event_queue))
+
+        cancellation = response.tool_call_cancellation
+        if cancellation and cancellation.ids:
+            self.cancel_tool_calls(cancellation.ids, _SERVER_CANCELLED)
 
     async def _handle_receive_error(self, event_queue, error):
         if getattr(error, "code", None) == 1000:
@@ -345,6 +633,9 @@ class GeminiLive:
         audio_output_callback,
         audio_interrupt_callback=None,
     ):
+        system_instruction = self.system_instruction
+        if self.instruction_suffix is not None:
+            system_instruction += await self.instruction_suffix()
         config = types.LiveConnectConfig(
             response_modalities=[types.Modality.AUDIO],
             speech_config=types.SpeechConfig(
@@ -354,7 +645,7 @@ class GeminiLive:
                     )
                 )
             ),
-            system_instruction=self.system_instruction,
+            system_instruction=system_instruction,
             input_audio_transcription=types.AudioTranscriptionConfig(),
             output_audio_transcription=types.AudioTranscriptionConfig(),
             tools=self.tools,
@@ -404,6 +695,7 @@ class GeminiLive:
                         task.cancel()
                     try:
                         await asyncio.gather(*tasks, return_exceptions=True)
+                        await self._cancel_tool_work()
                     except Exception:
                         logger.info(
                             "Error while awaiting cancelled tasks", exc_info=True
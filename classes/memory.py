@@ -1,11 +1,273 @@
 """Multi-level memory system with SQLite backend."""
 
+import atexit
+import base64
+import hashlib
 import json
+import logging
+import math
+import re
 import sqlite3
-from datetime import datetime
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import closing, contextmanager
+from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import classes.memory_backup as memory_backup
+from classes.memory_cache import DataVersionWatch, QueryCache
+from classes.memory_writer import WriteBehindQueue, first_free_id
+from classes.near_duplicates import BANDS, best_match, lsh_keys
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> str:
+    """Current local time in the ISO format used by every timestamp column."""
+    return datetime.now().isoformat()
+
+
+# Words of at least this length are matched as prefixes ("taco" -> "tacos").
+_FTS_PREFIX_MIN_LEN = 3
+_FTS_TERM = re.compile(r"\w+", re.UNICODE)
+
+# Expands the JSON tag lists of ``{source}`` (a table or subquery with id and
+# tags columns) into normalized memory_tags rows. Malformed JSON is treated as
+# "no tags" instead of failing the write.
+_TAG_ROWS_SQL = """
+    INSERT OR IGNORE INTO memory_tags (memory_id, tag)
+    SELECT m.id, lower(trim(tag.value))
+    FROM {source} AS m,
+         json_each(CASE WHEN json_valid(m.tags) THEN m.tags ELSE '[]' END) AS tag
+    WHERE tag.type = 'text' AND trim(tag.value) <> ''
+"""
+_NEW_ROW = "(SELECT new.id AS id, new.tags AS tags)"
+
+
+def to_fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query.
+
+    Any term may match and longer terms also match as prefixes. Terms are
+    quoted so user input is never parsed as FTS syntax.
+    """
+    terms = []
+    for term in _FTS_TERM.findall(text.lower()):
+        suffix = "*" if len(term) >= _FTS_PREFIX_MIN_LEN else ""
+        terms.append(f'"{term}"{suffix}')
+    return " OR ".join(terms)
+
+
+# Fields of every memory returned by a read, in order.
+MEMORY_FIELDS = (
+    "id",
+    "type",
+    "content",
+    "tags",
+    "created_at",
+    "updated_at",
+    "importance",
+    "expires_at",
+)
+
+_COLUMNS = (
+    *MEMORY_FIELDS,
+    "content_hash",
+    *(f"lsh_{band}" for band in range(BANDS)),
+)
+
+# Near-duplicate fingerprint columns (see classes.near_duplicates).
+_LSH_COLUMNS = _COLUMNS[-BANDS:]
+
+# Most stored rows compared against a new memory sharing one of its LSH keys.
+_NEAR_DUPLICATE_CANDIDATES = 32
+
+_MAX_IMPORTANCE = 5
+
+# Columns supplied on insert (everything but the generated id).
+_INSERT_COLUMNS = ", ".join(_COLUMNS[1:])
+
+
+def encode_page_token(key) -> str:
+    """Encode a sort key (or offset) as an opaque, URL-safe page token."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+
+def decode_page_token(token: str, size: int) -> list:
+    """Decode a page token, rejecting anything not produced for this order."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid page token: {token!r}") from e
+    if not isinstance(key, list) or len(key) != size:
+        raise ValueError(f"Invalid page token: {token!r}")
+    return key
+
+
+def page_token_for(memory: dict, order: str = "recent") -> str:
+    """Return the token that resumes a ``fetch_page`` listing after ``memory``."""
+    return encode_page_token([memory[column] for column in PAGE_ORDERS[order]])
+
+
+def content_hash(content: str) -> str:
+    """Hash ``content`` with case and whitespace normalized, for de-duplication."""
+    normalized = " ".join(content.split()).casefold()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _merged_values(existing: dict, new: dict) -> dict:
+    """Column values after folding memory ``new`` into its near-duplicate ``existing``.
+
+    The more recently updated content wins, so a reworded correction ("likes
+    green" after "likes blue") replaces the old fact instead of being
+    dropped. Tags are combined, the later ``updated_at`` and expiry win (no
+    expiry beats any), and importance rises one level above the larger of
+    the two, since a fact saved twice is evidently worth remembering.
+    """
+    tags = json.loads(existing["tags"] or "[]")
+    seen = {str(tag).lower() for tag in tags}
+    tags += [
+        tag for tag in json.loads(new["tags"] or "[]") if str(tag).lower() not in seen
+    ]
+    expiries = (existing["expires_at"], new["expires_at"])
+    importance = max(existing["importance"] or 1, new["importance"] or 1)
+    latest = new if new["updated_at"] >= existing["updated_at"] else existing
+    return {
+        "content": latest["content"],
+        "content_hash": content_hash(latest["content"]),
+        **dict(zip(_LSH_COLUMNS, lsh_keys(latest["content"]))),
+        "tags": json.dumps(tags),
+        "importance": min(importance + 1, _MAX_IMPORTANCE),
+        "updated_at": max(existing["updated_at"], new["updated_at"]),
+        "expires_at": None if None in expiries else max(expiries),
+    }
+
+
+# Dimensions aggregated in ``memory_stats`` and the row expression keying each.
+_STAT_DIMENSIONS = (
+    ("total", "''"),
+    ("type", "{row}.type"),
+    ("importance", "ifnull({row}.importance, 1)"),
+)
+
+
+def _stat_delta_sql(row: str, sign: str) -> str:
+    """Statements adding (``+``) or removing (``-``) one row from ``memory_stats``."""
+    return ";\n".join(f"""
+        INSERT INTO memory_stats (dimension, key, count, content_bytes)
+        VALUES ('{dimension}', {key.format(row=row)}, {sign}1,
+                {sign}length(CAST({row}.content AS BLOB)))
+        ON CONFLICT (dimension, key) DO UPDATE SET
+            count = count + excluded.count,
+            content_bytes = content_bytes + excluded.content_bytes
+        """ for dimension, key in _STAT_DIMENSIONS)
+
+
+# Reads only ever see live rows; the parameter is the current time.
+_NOT_EXPIRED = "(expires_at IS NULL OR expires_at > ?)"
+
+# Sort keys available to keyset pagination, most significant column first.
+# Every key ends in ``id`` so it is unique and pages never skip or repeat rows.
+PAGE_ORDERS = {
+    "recent": ("updated_at", "id"),
+    "importance": ("importance", "updated_at", "id"),
+}
+
+# Relevance ranking: score = e^(w_i * importance) * (1 + accesses)^w_a
+# * e^(-days since last use / tau). The ``relevance`` column stores ln(score)
+# without its ``-now / tau`` term, which is the same for every row, so it can
+# be indexed and rank order never changes as time passes.
+RELEVANCE_IMPORTANCE_WEIGHT = 1.0
+RELEVANCE_ACCESS_WEIGHT = 1.0
+RELEVANCE_DECAY_DAYS = 14.0
+_RELEVANCE_SQL = (
+    f"ifnull(importance, 1) * {RELEVANCE_IMPORTANCE_WEIGHT} + access_score"
+    " + julianday(max(updated_at, ifnull(last_accessed_at, updated_at)))"
+    f" / {RELEVANCE_DECAY_DAYS}"
+)
+
+# ORDER BY clauses accepted by ``fetch_memories``.
+FETCH_ORDERS = {
+    "recent": "updated_at DESC, id DESC",
+    "importance": "importance DESC, updated_at DESC, id DESC",
+    "relevance": "relevance DESC, id DESC",
+}
+
+
+class Memory(dict):
+    """One memory returned by a read: a read-only dict of its fields.
+
+    Records are built straight from the row tuple SQLite returned and a
+    field-to-position map shared by every record of the same query, with no
+    ``sqlite3.Row`` in between; ``tags`` is decoded from its JSON column
+    only when a ``columns`` projection selects it. They used to be lazy
+    ``Mapping`` objects, which ``json.dumps`` rejected; as dicts they
+    serialize like the plain dicts returned by ``semantic_search`` and
+    ``recall_memories``. Cached results are shared between callers, so
+    records cannot be modified; ``to_dict()`` returns a mutable copy.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, values: tuple, positions: dict[str, int]):
+        super().__init__(
+            (field, values[position]) for field, position in positions.items()
+        )
+        if "tags" in positions:
+            dict.__setitem__(self, "tags", json.loads(self["tags"] or "[]"))
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Memory records are read-only; use to_dict() for a copy")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        # Copies and pickles come back as plain dicts.
+        return dict, (dict(self),)
+
+    def __repr__(self) -> str:
+        return f"Memory({dict.__repr__(self)})"
+
+    def to_dict(self) -> dict:
+        """Return the record as a plain, modifiable dict."""
+        return dict(self)
+
+
+def _projection(columns: Optional[Iterable[str]]) -> tuple[str, ...]:
+    """Validate a ``columns`` projection and return the fields to select.
+
+    None selects every field. ``id`` and ``expires_at`` are always included,
+    so results stay identifiable and cached reads still expire on time.
+    """
+    if columns is None:
+        return MEMORY_FIELDS
+    wanted = set(columns)
+    unknown = wanted.difference(MEMORY_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown memory columns {sorted(unknown)}; expected some of {MEMORY_FIELDS}"
+        )
+    wanted.update(("id", "expires_at"))
+    return tuple(field for field in MEMORY_FIELDS if field in wanted)
+
+
+def _field_positions(names: Iterable[str], fields: tuple[str, ...]) -> dict[str, int]:
+    """Map each of ``fields`` to its position among the selected column ``names``."""
+    index = {name: position for position, name in enumerate(names)}
+    return {field: index[field] for field in fields}
+
+
+def _records(cursor: sqlite3.Cursor, fields: tuple[str, ...]) -> list[Memory]:
+    """Fetch every row of ``cursor`` (a tuple cursor) as ``Memory`` records."""
+    positions = _field_positions((column[0] for column in cursor.description), fields)
+    return [Memory(row, positions) for row in cursor]
+
+
+# Positions of the public fields in a write-behind row (``_COLUMNS`` order).
+_PENDING_POSITIONS = _field_positions(_COLUMNS, MEMORY_FIELDS)
 
 
 class MemoryType(Enum):
@@ -16,18 +278,332 @@ class MemoryType(Enum):
     QUICK_NOTE = "quick_note"  # Quick thoughts/reminders (1-3 days)
 
 
+# Default lifetime per memory type; None never expires.
+MEMORY_TTLS: dict[MemoryType, Optional[timedelta]] = {
+    MemoryType.SHORT_TERM: timedelta(days=7),
+    MemoryType.LONG_TERM: None,
+    MemoryType.QUICK_NOTE: timedelta(days=3),
+}
+
+
 class MemoryManager:
-    """Manages multi-level memories with SQLite persistence."""
+    """Manages multi-level memories with SQLite persistence.
+
+    Each thread that touches the manager gets one long-lived connection,
+    opened lazily and reused for every call made from that thread. The
+    database runs in WAL mode so readers (the live session) never wait on a
+    writer (e.g. the Streamlit dashboard) and vice versa. Call ``close()``
+    on shutdown to release every connection the manager has opened.
+
+    With ``write_behind`` enabled, ``store_memory`` only queues the row and
+    returns its ID at once; a background thread writes queued rows in a single
+    transaction every ``flush_interval_ms`` or as soon as ``flush_max_rows``
+    are waiting. IDs come from blocks reserved in ``sqlite_sequence``, so they
+    never collide with rows inserted by other processes (see
+    ``classes.memory_writer``). Every read flushes the queue first, and
+    ``close()`` (also run at interpreter exit) flushes whatever is left.
+
+    ``fetch_memories``, ``fetch_all_memories``, ``get_memory`` and
+    ``get_stats`` are served from a bounded LRU cache (entries expire after
+    ``cache_ttl_seconds``; see ``classes.memory_cache``). The cache is cleared on every store, update and
+    delete, and whenever ``PRAGMA data_version`` shows another connection or
+    process committed a change. Cached results are shared between callers,
+    which is safe because reads return immutable ``Memory`` records.
+    ``cache_info()`` reports hit/miss counters; ``cache_size=0`` disables
+    caching. The fetch and search methods take a ``columns`` projection for
+    callers that need only a few fields.
+
+    With ``vector_index`` enabled, ``semantic_search`` ranks memories by
+    similarity using a local hashed TF-IDF index (see
+    ``classes.vector_index``) stored next to the database in a ``.vec``
+    directory. The index catches up with the table lazily, only after a
+    change, by re-embedding rows updated since its last sync.
+
+    Short-term memories and quick notes get an ``expires_at`` from
+    ``MEMORY_TTLS`` (overridable per memory). Expired rows are hidden from
+    every read immediately; ``purge_expired`` deletes them in small batches
+    and ``run_maintenance`` reclaims the freed pages.
+
+    A new memory that rewords a live memory of the same type (MinHash
+    similarity of at least ``near_duplicate_threshold``; see
+    ``classes.near_duplicates``) is merged into it instead of stored again;
+    the newer wording is kept.
+    ``merge_near_duplicates`` does the same for rows already stored.
+
+    ``recall_memories`` ranks by a relevance score mixing importance, access
+    count and recency, read straight off an index. Reads through
+    ``get_memory``, ``search_memories``, ``semantic_search`` and
+    ``recall_memories`` are counted in memory and written in one batch every
+    ``access_flush_seconds``.
 
-    def __init__(self, db_path: str = "memories.db"):
+    ``backup``/``snapshot`` copy the database while it stays in use, a few
+    pages at a time, and ``restore`` brings a copy back.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "memories.db",
+        busy_timeout_ms: int = 5000,
+        cache_size_kib: int = 8192,
+        write_behind: bool = False,
+        flush_interval_ms: int = 250,
+        flush_max_rows: int = 64,
+        cache_size: int = 256,
+        cache_ttl_seconds: float = 30.0,
+        vector_index: bool = False,
+        access_flush_seconds: float = 30.0,
+        near_duplicate_threshold: Optional[float] = 0.8,
+    ):
         """Initialize memory manager with SQLite database."""
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kib = cache_size_kib
+        self._local = threading.local()
+        self._connections: dict[int, tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._connections_lock = threading.Lock()
+        self._closed = False
+        self._fts_enabled = False
         self._init_db()
+        self._init_fts()
+
+        self._cache = QueryCache(cache_size, cache_ttl_seconds)
+        self._watch = DataVersionWatch(self._open_connection())
+
+        self._vector_index = None
+        self._vector_lock = threading.Lock()
+        self._vector_generation: Optional[int] = None
+        if vector_index:
+            # Imported lazily so NumPy is only needed when the index is used.
+            from classes.vector_index import HashedVectorIndex
+
+            self._vector_index = HashedVectorIndex(self.db_path.with_suffix(".vec"))
+
+        self.access_flush_seconds = access_flush_seconds
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self._dedupe_after_id = 0
+        self._accesses: dict[int, tuple[int, str]] = {}
+        self._access_lock = threading.Lock()
+        self._accesses_flushed_at = time.monotonic()
+
+        self.write_behind = write_behind
+        self._pending = WriteBehindQueue(
+            self._transaction, _COLUMNS, flush_interval_ms, flush_max_rows
+        )
+        if write_behind:
+            self._pending.start()
+            atexit.register(self.close)
+
+    def __enter__(self) -> "MemoryManager":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open and configure a new connection to the memory database."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,  # close() may run on another thread
+            isolation_level=None,  # transactions are managed by _transaction()
+        )
+        conn.row_factory = sqlite3.Row
+        # Only takes effect on a brand-new database, before the first table.
+        # Setting it needs the write lock, so a new thread's connection would
+        # otherwise wait out a running write transaction.
+        if not conn.execute("PRAGMA page_count").fetchone()[0]:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        with self._connections_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("MemoryManager has been closed")
+            self._prune_dead_connections()
+            conn = self._open_connection()
+            thread = threading.current_thread()
+            self._connections[thread.ident] = (thread, conn)  # type: ignore
+
+        self._local.conn = conn
+        return conn
+
+    def _prune_dead_connections(self) -> None:
+        """Close connections owned by threads that have exited (lock held)."""
+        for ident, (thread, conn) in list(self._connections.items()):
+            if not thread.is_alive():
+                conn.close()
+                del self._connections[ident]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction, committing on success.
+
+        ``BEGIN IMMEDIATE`` takes the write lock up front so a concurrent
+        writer is handled by the busy timeout instead of failing mid-way.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Flush queued writes, then close every connection opened by this manager."""
+        self._pending.stop()
+        if self._pending and not self._closed:
+            self.flush()
+        if self._accesses and not self._closed:
+            self.flush_access()
+        # Registered for write-behind managers; otherwise pins this one in memory.
+        atexit.unregister(self.close)
+        if self._vector_index is not None:
+            with self._vector_lock:
+                self._vector_index.close()
+                self._vector_index = None
+
+        with self._connections_lock:
+            self._closed = True
+            for _, conn in self._connections.values():
+                try:
+                    conn.execute("PRAGMA optimize")
+                except sqlite3.Error:
+                    pass
+                conn.close()
+            self._connections.clear()
+        self._watch.close()
+
+    # ------------------------------------------------------------------
+    # Read cache
+    # ------------------------------------------------------------------
+
+    def _check_external_changes(self) -> None:
+        """Clear the cache if any other connection committed since last check."""
+        if self._watch.changed():
+            self._cache.clear()
+
+    def _cached(self, key: tuple, load: Callable[[], Any]) -> Any:
+        """Return ``load()``'s result for ``key``, serving repeats from cache."""
+        if self._cache.max_entries <= 0:
+            return load()
+        self._check_external_changes()
+        return self._cache.load(key, load)
+
+    def cache_info(self) -> dict:
+        """Return read cache counters (hits, misses, hit_rate, size, ...)."""
+        return self._cache.info()
+
+    # ------------------------------------------------------------------
+    # Write-behind queue
+    # ------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """Write all queued memories in one transaction. Returns rows written."""
+        if not self.write_behind:
+            return 0
+        return self._pending.flush()
+
+    # ------------------------------------------------------------------
+    # Access tracking
+    # ------------------------------------------------------------------
+
+    def _record_access(self, memories: list[Mapping]) -> None:
+        """Count a read of each memory; counts are written in batches.
+
+        Reads only touch an in-memory dict. ``flush_access`` runs at most
+        every ``access_flush_seconds`` (and on ``close()``), so the write
+        lock is taken once per interval rather than once per read.
+        """
+        if not memories:
+            return
+        now = _now()
+        with self._access_lock:
+            for memory in memories:
+                count, _ = self._accesses.get(memory["id"], (0, now))
+                self._accesses[memory["id"]] = (count + 1, now)
+            due = (
+                time.monotonic() - self._accesses_flushed_at
+                >= self.access_flush_seconds
+            )
+        if due:
+            self.flush_access()
+
+    def flush_access(self) -> int:
+        """Write buffered access counts in one transaction. Returns rows updated."""
+        self.flush()
+        with self._access_lock:
+            accesses, self._accesses = self._accesses, {}
+            self._accesses_flushed_at = time.monotonic()
+        if not accesses:
+            return 0
+        try:
+            with self._transaction() as conn:
+                rows = conn.execute(
+                    "SELECT id, access_count FROM memories"
+                    " WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(list(accesses)),),
+                ).fetchall()
+                updates = []
+                for memory_id, access_count in rows:
+                    reads, accessed_at = accesses[memory_id]
+                    total = access_count + reads
+                    score = RELEVANCE_ACCESS_WEIGHT * math.log1p(total)
+                    updates.append((total, score, accessed_at, memory_id))
+                conn.executemany(
+                    "UPDATE memories SET access_count = ?, access_score = ?,"
+                    " last_accessed_at = ? WHERE id = ?",
+                    updates,
+                )
+        except sqlite3.Error as e:
+            # Keep the counts for the next attempt.
+            logger.warning("Access count flush failed: %s", e)
+            with self._access_lock:
+                for memory_id, (reads, accessed_at) in accesses.items():
+                    count, _ = self._accesses.get(memory_id, (0, accessed_at))
+                    self._accesses[memory_id] = (count + reads, accessed_at)
+            return 0
+        if updates:
+            self._cache.clear()
+        return len(updates)
+
+    # ------------------------------------------------------------------
+    # Schema
+    # ------------------------------------------------------------------
+
+    def _table_exists(self, name: str) -> bool:
+        """Check whether a table (or virtual table) exists in the database."""
+        row = (
+            self._connect()
+            .execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (name,),
+            )
+            .fetchone()
+        )
+        return row is not None
 
     def _init_db(self) -> None:
         """Initialize database schema if it doesn't exist."""
-        with sqlite3.connect(self.db_path) as conn:
+        tags_existed = self._table_exists("memory_tags")
+        stats_existed = self._table_exists("memory_stats")
+        with self._transaction() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS memories (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -36,17 +612,295 @@ class MemoryManager:
                     tags TEXT,
                     created_at TEXT NOT NULL,
                     updated_at TEXT NOT NULL,
-                    importance INTEGER DEFAULT 1
+                    importance INTEGER DEFAULT 1,
+                    expires_at TEXT,
+                    content_hash TEXT,
+                    lsh_0 INTEGER,
+                    lsh_1 INTEGER,
+                    lsh_2 INTEGER,
+                    lsh_3 INTEGER
                 )
             """)
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_type ON memories(type)")
+            self._migrate_expires_at(conn)
+            self._migrate_content_hash(conn)
+            self._migrate_relevance(conn)
+            self._migrate_lsh(conn)
+            # idx_type_updated serves type filters; a separate type index
+            # only slowed every insert down.
+            conn.execute("DROP INDEX IF EXISTS idx_type")
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_created ON memories(created_at)"
             )
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_importance ON memories(importance)"
             )
-            conn.commit()
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_updated ON memories(updated_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_expires ON memories(expires_at)"
+                " WHERE expires_at IS NOT NULL"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_content_hash ON memories(content_hash)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_type_updated"
+                " ON memories(type, updated_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_type_importance"
+                " ON memories(type, importance, updated_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_relevance ON memories(relevance)"
+            )
+            for column in _LSH_COLUMNS:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{column} ON memories({column})"
+                )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_type_relevance"
+                " ON memories(type, relevance)"
+            )
+            self._init_tag_index(conn, backfill=not tags_existed)
+            self._init_stats(conn, backfill=not stats_existed)
+
+    @staticmethod
+    def _migrate_expires_at(conn: sqlite3.Connection) -> None:
+        """Add ``expires_at`` to databases created before expiry existed.
+
+        Existing short-term memories and quick notes get the default lifetime
+        counted from their creation time.
+        """
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(memories)")}
+        if "expires_at" in columns:
+            return
+        conn.execute("ALTER TABLE memories ADD COLUMN expires_at TEXT")
+        updates = []
+        for row in conn.execute("SELECT id, type, created_at FROM memories"):
+            ttl = MEMORY_TTLS.get(MemoryType(row["type"]))
+            if ttl is not None:
+                created = datetime.fromisoformat(row["created_at"])
+                updates.append(((created + ttl).isoformat(), row["id"]))
+        conn.executemany("UPDATE memories SET expires_at = ? WHERE id = ?", updates)
+
+    @staticmethod
+    def _migrate_content_hash(conn: sqlite3.Connection) -> None:
+        """Add and backfill ``content_hash`` on databases created before it existed."""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(memories)")}
+        if "content_hash" in columns:
+            return
+        conn.execute("ALTER TABLE memories ADD COLUMN content_hash TEXT")
+        conn.executemany(
+            "UPDATE memories SET content_hash = ? WHERE id = ?",
+            (
+                (content_hash(row["content"]), row["id"])
+                for row in conn.execute("SELECT id, content FROM memories").fetchall()
+            ),
+        )
+
+    @staticmethod
+    def _migrate_relevance(conn: sqlite3.Connection) -> None:
+        """Add the access counters and the generated ``relevance`` column.
+
+        ``relevance`` is VIRTUAL: it takes no space in the table and is only
+        materialized by its indexes, which SQLite keeps current on every
+        insert and update.
+        """
+        columns = {row["name"] for row in conn.execute("PRAGMA table_xinfo(memories)")}
+        for name, definition in (
+            ("access_count", "INTEGER NOT NULL DEFAULT 0"),
+            ("access_score", "REAL NOT NULL DEFAULT 0"),
+            ("last_accessed_at", "TEXT"),
+            ("relevance", f"REAL GENERATED ALWAYS AS ({_RELEVANCE_SQL}) VIRTUAL"),
+        ):
+            if name not in columns:
+                conn.execute(f"ALTER TABLE memories ADD COLUMN {name} {definition}")
+
+    @staticmethod
+    def _migrate_lsh(conn: sqlite3.Connection) -> None:
+        """Add the near-duplicate LSH keys to older databases.
+
+        Existing rows are left without keys; ``merge_near_duplicates``
+        fingerprints them a batch at a time.
+        """
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(memories)")}
+        for column in _LSH_COLUMNS:
+            if column not in columns:
+                conn.execute(f"ALTER TABLE memories ADD COLUMN {column} INTEGER")
+
+    @staticmethod
+    def _init_tag_index(conn: sqlite3.Connection, backfill: bool) -> None:
+        """Create the normalized ``memory_tags`` table and its sync triggers.
+
+        ``memories.tags`` stays the display copy (a JSON list); ``memory_tags``
+        holds one lower-cased row per tag so tag filters are exact, indexed
+        lookups. Triggers keep it in sync with every writer, including other
+        processes. ``backfill`` migrates tags of pre-existing rows.
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS memory_tags (
+                memory_id INTEGER NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (memory_id, tag)
+            ) WITHOUT ROWID
+        """)
+        # Covering index: tag filters never touch the table itself.
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_memory_tags_tag ON memory_tags(tag, memory_id)"
+        )
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS memory_tags_ai AFTER INSERT ON memories BEGIN
+                {_TAG_ROWS_SQL.format(source=_NEW_ROW)};
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS memory_tags_au AFTER UPDATE OF tags ON memories BEGIN
+                DELETE FROM memory_tags WHERE memory_id = old.id;
+                {_TAG_ROWS_SQL.format(source=_NEW_ROW)};
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS memory_tags_ad AFTER DELETE ON memories BEGIN
+                DELETE FROM memory_tags WHERE memory_id = old.id;
+            END
+        """)
+        if backfill:
+            conn.execute(_TAG_ROWS_SQL.format(source="memories"))
+
+    @staticmethod
+    def _init_stats(conn: sqlite3.Connection, backfill: bool) -> None:
+        """Create the ``memory_stats`` counters and the triggers maintaining them.
+
+        One row per (dimension, key) holds a row count and total content bytes
+        for all memories, each type and each importance level; the ``total``
+        row also tracks the oldest and newest ``created_at``. Triggers update
+        them on every write, so reading statistics never scans ``memories``.
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS memory_stats (
+                dimension TEXT NOT NULL,
+                key NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                content_bytes INTEGER NOT NULL DEFAULT 0,
+                oldest TEXT,
+                newest TEXT,
+                PRIMARY KEY (dimension, key)
+            ) WITHOUT ROWID
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS memory_stats_ai AFTER INSERT ON memories BEGIN
+                {_stat_delta_sql("new", "+")};
+                UPDATE memory_stats SET
+                    oldest = CASE WHEN oldest IS NULL OR new.created_at < oldest
+                             THEN new.created_at ELSE oldest END,
+                    newest = CASE WHEN newest IS NULL OR new.created_at > newest
+                             THEN new.created_at ELSE newest END
+                WHERE dimension = 'total';
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS memory_stats_au
+            AFTER UPDATE OF type, importance, content ON memories BEGIN
+                {_stat_delta_sql("old", "-")};
+                {_stat_delta_sql("new", "+")};
+            END
+        """)
+        # Only deleting the current oldest/newest row needs a new min/max, and
+        # idx_created answers that with a single index probe.
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS memory_stats_ad AFTER DELETE ON memories BEGIN
+                {_stat_delta_sql("old", "-")};
+                UPDATE memory_stats SET
+                    oldest = (SELECT MIN(created_at) FROM memories),
+                    newest = (SELECT MAX(created_at) FROM memories)
+                WHERE dimension = 'total' AND old.created_at IN (oldest, newest);
+            END
+        """)
+        if backfill:
+            MemoryManager._add_row_stats(conn)
+
+    @staticmethod
+    def _add_row_stats(conn: sqlite3.Connection, after_id: int = 0) -> None:
+        """Count every memory with ``id > after_id`` into ``memory_stats`` at once."""
+        for dimension, key in _STAT_DIMENSIONS:
+            column = key.format(row="m")
+            conn.execute(
+                f"""
+                INSERT INTO memory_stats (dimension, key, count, content_bytes)
+                SELECT '{dimension}', {column}, COUNT(*),
+                       SUM(length(CAST(m.content AS BLOB)))
+                FROM memories AS m WHERE m.id > ? GROUP BY {column}
+                ON CONFLICT (dimension, key) DO UPDATE SET
+                    count = count + excluded.count,
+                    content_bytes = content_bytes + excluded.content_bytes
+                """,
+                (after_id,),
+            )
+        conn.execute("""
+            UPDATE memory_stats SET
+                oldest = (SELECT MIN(created_at) FROM memories),
+                newest = (SELECT MAX(created_at) FROM memories)
+            WHERE dimension = 'total'
+        """)
+
+    def _init_fts(self) -> None:
+        """Create the FTS5 index over content/tags and keep it synced by triggers.
+
+        The index is an external-content table, so it stores only the token
+        index and reads text back from ``memories``. A freshly created index
+        is backfilled from existing rows. If the SQLite build lacks FTS5,
+        search falls back to substring matching.
+        """
+        existed = self._table_exists("memories_fts")
+        try:
+            with self._transaction() as conn:
+                conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+                        content, tags,
+                        content='memories', content_rowid='id',
+                        tokenize='unicode61 remove_diacritics 2',
+                        prefix='2 3'
+                    )
+                """)
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS memories_fts_ai AFTER INSERT ON memories BEGIN
+                        INSERT INTO memories_fts(rowid, content, tags)
+                        VALUES (new.id, new.content, new.tags);
+                    END
+                """)
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS memories_fts_ad AFTER DELETE ON memories BEGIN
+                        INSERT INTO memories_fts(memories_fts, rowid, content, tags)
+                        VALUES ('delete', old.id, old.content, old.tags);
+                    END
+                """)
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS memories_fts_au
+                    AFTER UPDATE OF content, tags ON memories BEGIN
+                        INSERT INTO memories_fts(memories_fts, rowid, content, tags)
+                        VALUES ('delete', old.id, old.content, old.tags);
+                        INSERT INTO memories_fts(rowid, content, tags)
+                        VALUES (new.id, new.content, new.tags);
+                    END
+                """)
+                if not existed:
+                    conn.execute(
+                        "INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')"
+                    )
+        except sqlite3.OperationalError:
+            return
+        self._fts_enabled = True
+
+    @staticmethod
+    def _normalize_tags(tags: Optional[list[str]]) -> list[str]:
+        """Lower-case, trim and de-duplicate tags the way memory_tags stores them."""
+        return list(dict.fromkeys(t.strip().lower() for t in tags or [] if t.strip()))
+
+    # ------------------------------------------------------------------
+    # Memory operations
+    # ------------------------------------------------------------------
 
     def store_memory(
         self,
@@ -54,100 +908,432 @@ class MemoryManager:
         memory_type: MemoryType,
         tags: Optional[list[str]] = None,
         importance: int = 1,
+        expires_at: Optional[datetime] = None,
     ) -> int:
-        """Store a new memory. Returns memory ID."""
-        now = datetime.now().isoformat()
-        tags_json = json.dumps(tags or [])
+        """Store a new memory. Returns memory ID.
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                """
-                INSERT INTO memories (type, content, tags, created_at, updated_at, importance)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (memory_type.value, content, tags_json, now, now, importance),
+        ``expires_at`` overrides the default lifetime from ``MEMORY_TTLS``.
+        A near-duplicate of a live memory of the same type (see
+        ``near_duplicate_threshold``) is merged into it instead, and the
+        existing memory's ID is returned.
+        """
+        values = dict(
+            zip(
+                _COLUMNS[1:],
+                self._new_row(content, memory_type, tags, importance, expires_at),
+            )
+        )
+        if self.write_behind:
+            return self._queue_memory(values)
+
+        with self._transaction() as conn:
+            duplicate = self._stored_near_duplicate(conn, values)
+            if duplicate:
+                self._merge_into(conn, duplicate, values)
+                memory_id = duplicate["id"]
+            else:
+                memory_id = conn.execute(
+                    f"INSERT INTO memories ({_INSERT_COLUMNS})"
+                    f" VALUES ({', '.join('?' * len(values))})",
+                    tuple(values.values()),
+                ).lastrowid
+        self._cache.clear()
+        return memory_id  # type: ignore
+
+    def _queue_memory(self, values: dict) -> int:
+        """Queue a new memory for the write-behind flusher. Returns its ID."""
+        # Merging into a queued row holds the flush lock, so a flush that
+        # is writing that row cannot drop the merged values afterwards.
+        with self._pending.locked() as queued:
+            pending = (dict(zip(_COLUMNS, row)) for row in queued.values())
+            duplicate = self._near_duplicate(pending, values)
+            if duplicate:
+                merged = {**duplicate, **_merged_values(duplicate, values)}
+                queued[duplicate["id"]] = tuple(merged.values())
+        if not duplicate:
+            duplicate = self._stored_near_duplicate(self._connect(), values)
+            if duplicate:
+                with self._transaction() as conn:
+                    self._merge_into(conn, duplicate, values)
+        if duplicate:
+            self._cache.clear()
+            return duplicate["id"]
+
+        memory_id = self._pending.add(tuple(values.values()))
+        self._cache.clear()
+        return memory_id
+
+    def _new_row(
+        self,
+        content: str,
+        memory_type: MemoryType,
+        tags: Optional[list[str]] = None,
+        importance: int = 1,
+        expires_at: Optional[datetime] = None,
+    ) -> tuple:
+        """Build the ``_INSERT_COLUMNS`` values for a memory created now.
+
+        The LSH keys are only computed while the near-duplicate check is on;
+        ``merge_near_duplicates`` fills them in for rows stored without.
+        """
+        created = datetime.now()
+        now = created.isoformat()
+        if expires_at is None and MEMORY_TTLS.get(memory_type) is not None:
+            expires_at = created + MEMORY_TTLS[memory_type]  # type: ignore
+        return (
+            memory_type.value,
+            content,
+            json.dumps(tags or []),
+            now,
+            now,
+            importance,
+            expires_at.isoformat() if expires_at else None,
+            content_hash(content),
+            *(
+                (None,) * BANDS
+                if self.near_duplicate_threshold is None
+                else lsh_keys(content)
+            ),
+        )
+
+    def store_memories(self, memories: list[dict]) -> list[int]:
+        """Store several memories in one transaction. Returns their IDs in order.
+
+        Each item takes the keyword arguments of ``store_memory``
+        (``content``, ``memory_type``, optional ``tags``, ``importance``,
+        ``expires_at``). Near-duplicates, of stored memories or of earlier
+        items, are merged as in ``store_memory``. IDs of new rows are
+        assigned up front from the AUTOINCREMENT counter, so they are
+        written with a single ``executemany``.
+        """
+        if not memories:
+            return []
+        rows = [self._new_row(**memory) for memory in memories]
+        self.flush()
+        with self._transaction() as conn:
+            start = first_free_id(conn)
+            ids = []
+            batch: dict[int, dict] = {}
+            for row in rows:
+                values = dict(zip(_COLUMNS[1:], row))
+                duplicate = self._near_duplicate(batch.values(), values)
+                if duplicate:
+                    duplicate.update(_merged_values(duplicate, values))
+                else:
+                    duplicate = self._stored_near_duplicate(conn, values)
+                    if duplicate:
+                        self._merge_into(conn, duplicate, values)
+                if duplicate:
+                    ids.append(duplicate["id"])
+                    continue
+                memory_id = start + len(batch)
+                batch[memory_id] = {"id": memory_id, **values}
+                ids.append(memory_id)
+            conn.executemany(
+                f"INSERT INTO memories ({', '.join(_COLUMNS)})"
+                f" VALUES ({', '.join('?' * len(_COLUMNS))})",
+                [tuple(values.values()) for values in batch.values()],
+            )
+        self._cache.clear()
+        return ids
+
+    # ------------------------------------------------------------------
+    # Near-duplicates
+    # ------------------------------------------------------------------
+
+    def _near_duplicate(self, candidates: Iterable[dict], values: dict):
+        """Return the candidate that memory ``values`` nearly duplicates, if any.
+
+        Only candidates of the same type sharing an LSH key are compared.
+        """
+        if self.near_duplicate_threshold is None:
+            return None
+        matches = [
+            candidate
+            for candidate in candidates
+            if candidate["type"] == values["type"]
+            and any(
+                values[column] is not None and candidate[column] == values[column]
+                for column in _LSH_COLUMNS
             )
-            conn.commit()
-            return cursor.lastrowid  # type: ignore
+        ]
+        return best_match(values["content"], matches, self.near_duplicate_threshold)
+
+    def _stored_near_duplicate(
+        self, conn: sqlite3.Connection, values: dict, before_id: Optional[int] = None
+    ) -> Optional[dict]:
+        """Find a live stored memory that ``values`` nearly duplicates.
+
+        Candidates come from the indexed LSH key columns, so this costs a few
+        index lookups regardless of table size. ``before_id`` restricts the
+        search to older rows.
+        """
+        keys = [values[column] for column in _LSH_COLUMNS]
+        if self.near_duplicate_threshold is None or keys[0] is None:
+            return None
+        query = f"""
+            SELECT id, type, content, tags, importance, updated_at, expires_at,
+                   {", ".join(_LSH_COLUMNS)}
+            FROM memories
+            WHERE ({" OR ".join(f"{column} = ?" for column in _LSH_COLUMNS)})
+              AND +type = ? AND {_NOT_EXPIRED}
+        """
+        # The unary + keeps the planner off the type indexes, which would
+        # scan every memory of that type instead of the few sharing a key.
+        params = [*keys, values["type"], _now()]
+        if before_id is not None:
+            query += " AND id < ?"
+            params.append(before_id)
+        query += f" LIMIT {_NEAR_DUPLICATE_CANDIDATES}"
+        candidates = [dict(row) for row in conn.execute(query, params)]
+        return self._near_duplicate(candidates, values)
+
+    @staticmethod
+    def _merge_into(conn: sqlite3.Connection, existing: dict, values: dict) -> None:
+        """Fold memory ``values`` into the stored row ``existing``."""
+        merged = _merged_values(existing, values)
+        conn.execute(
+            f"UPDATE memories SET {', '.join(f'{column} = ?' for column in merged)}"
+            " WHERE id = ?",
+            (*merged.values(), existing["id"]),
+        )
+
+    def merge_near_duplicates(self, batch_size: int = 500) -> int:
+        """Merge near-duplicate memories into their oldest copy. Returns rows merged.
+
+        Each call checks the next ``batch_size`` memories in ID order,
+        continuing where the previous call stopped and starting over after
+        the last row, so an existing database is cleaned up gradually by
+        calling this periodically. It first fingerprints up to
+        ``batch_size`` memories stored without LSH keys (bulk imports and
+        older databases), which only then become merge candidates.
+        """
+        if self.near_duplicate_threshold is None:
+            return 0
+        self.flush()
+        merged = 0
+        with self._transaction() as conn:
+            self._fingerprint_missing(conn, batch_size)
+            rows = conn.execute(
+                f"""
+                SELECT id, type, content, tags, importance, updated_at, expires_at,
+                       {", ".join(_LSH_COLUMNS)}
+                FROM memories WHERE {_NOT_EXPIRED} AND id > ?
+                ORDER BY id LIMIT ?
+                """,
+                (_now(), self._dedupe_after_id, batch_size),
+            ).fetchall()
+            for row in rows:
+                values = dict(row)
+                duplicate = self._stored_near_duplicate(conn, values, values["id"])
+                if duplicate:
+                    self._merge_into(conn, duplicate, values)
+                    conn.execute("DELETE FROM memories WHERE id = ?", (values["id"],))
+                    merged += 1
+        self._dedupe_after_id = rows[-1]["id"] if len(rows) == batch_size else 0
+        if merged:
+            self._cache.clear()
+        return merged
+
+    @staticmethod
+    def _fingerprint_missing(conn: sqlite3.Connection, limit: int) -> int:
+        """Compute the LSH keys of up to ``limit`` memories stored without them."""
+        rows = conn.execute(
+            f"SELECT id, content FROM memories WHERE {_LSH_COLUMNS[0]} IS NULL LIMIT ?",
+            (limit,),
+        ).fetchall()
+        assignments = ", ".join(f"{column} = ?" for column in _LSH_COLUMNS)
+        conn.executemany(
+            f"UPDATE memories SET {assignments} WHERE id = ?",
+            [(*lsh_keys(row["content"]), row["id"]) for row in rows],
+        )
+        return len(rows)
+
+    def _execute_tuples(self, query: str, params) -> sqlite3.Cursor:
+        """Execute ``query`` on a cursor returning plain tuples, not Rows."""
+        cursor = self._connect().cursor()
+        cursor.row_factory = None
+        return cursor.execute(query, params)
+
+    def _query_memories(
+        self, query: str, params, fields: tuple[str, ...] = MEMORY_FIELDS
+    ) -> list[Memory]:
+        """Run a SELECT over memories and wrap every row in a ``Memory``.
+
+        The first placeholder of ``query`` must be the ``_NOT_EXPIRED``
+        filter; the current time is bound to it here, at load time, so cache
+        keys stay independent of the clock.
+        """
+        return _records(self._execute_tuples(query, [_now(), *params]), fields)
 
     def fetch_memories(
         self,
         memory_type: Optional[MemoryType] = None,
         tags: Optional[list[str]] = None,
         limit: Optional[int] = None,
-        order_by: str = "updated_at DESC",
-    ) -> list[dict]:
-        """Fetch memories with optional filtering. Returns list of memory dicts."""
-        query = "SELECT * FROM memories WHERE 1=1"
+        order: str = "recent",
+        match_all_tags: bool = False,
+        columns: Optional[Iterable[str]] = None,
+    ) -> list[Memory]:
+        """Fetch memories with optional filtering. Returns list of memories.
+
+        Tags match exactly (case-insensitive). By default a memory matches if
+        it has any of ``tags``; with ``match_all_tags`` it must have all of them.
+        ``order`` is a key of ``FETCH_ORDERS``. ``columns`` limits the fields
+        read and returned (see ``MEMORY_FIELDS``).
+        """
+        if order not in FETCH_ORDERS:
+            raise ValueError(
+                f"Unknown order {order!r}; expected one of {sorted(FETCH_ORDERS)}"
+            )
+        fields = _projection(columns)
+        query = f"SELECT {', '.join(fields)} FROM memories WHERE {_NOT_EXPIRED}"
         params = []
 
         if memory_type:
             query += " AND type = ?"
             params.append(memory_type.value)
 
-        if tags:
-            # Simple tag matching (any tag present)
-            for tag in tags:
-                query += " AND tags LIKE ?"
-                params.append(f"%{tag}%")
+        wanted = self._normalize_tags(tags)
+        if wanted:
+            placeholders = ", ".join("?" * len(wanted))
+            query += (
+                " AND id IN (SELECT memory_id FROM memory_tags"
+                f" WHERE tag IN ({placeholders})"
+            )
+            params.extend(wanted)
+            if match_all_tags:
+                query += " GROUP BY memory_id HAVING COUNT(*) = ?"
+                params.append(len(wanted))
+            query += ")"
 
-        query += f" ORDER BY {order_by}"
+        query += f" ORDER BY {FETCH_ORDERS[order]}"
 
         if limit:
-            query += f" LIMIT {limit}"
+            query += " LIMIT ?"
+            params.append(int(limit))
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
+        self.flush()
+        return self._cached(
+            ("query", query, tuple(params)),
+            lambda: self._query_memories(query, params, fields),
+        )
 
-        return [
-            {
-                "id": row["id"],
-                "type": row["type"],
-                "content": row["content"],
-                "tags": json.loads(row["tags"]),
-                "created_at": row["created_at"],
-                "updated_at": row["updated_at"],
-                "importance": row["importance"],
-            }
-            for row in rows
-        ]
+    def fetch_all_memories(
+        self, columns: Optional[Iterable[str]] = None
+    ) -> list[Memory]:
+        """Fetch all memories of all types.
 
-    def fetch_all_memories(self) -> list[dict]:
-        """Fetch all memories of all types."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("SELECT * FROM memories ORDER BY updated_at DESC")
-            rows = cursor.fetchall()
+        Loads the whole table; prefer ``fetch_page``/``iter_memories`` for
+        anything that may grow large. ``columns`` limits the fields read and
+        returned.
+        """
+        fields = _projection(columns)
+        query = (
+            f"SELECT {', '.join(fields)} FROM memories WHERE {_NOT_EXPIRED}"
+            " ORDER BY updated_at DESC"
+        )
+        self.flush()
+        return self._cached(
+            ("query", query, ()), lambda: self._query_memories(query, (), fields)
+        )
 
-        return [
-            {
-                "id": row["id"],
-                "type": row["type"],
-                "content": row["content"],
-                "tags": json.loads(row["tags"]),
-                "created_at": row["created_at"],
-                "updated_at": row["updated_at"],
-                "importance": row["importance"],
-            }
-            for row in rows
-        ]
+    def fetch_page(
+        self,
+        memory_type: Optional[MemoryType] = None,
+        page_size: int = 50,
+        page_token: Optional[str] = None,
+        order: str = "recent",
+        columns: Optional[Iterable[str]] = None,
+    ) -> tuple[list[Memory], Optional[str]]:
+        """Fetch one page of memories, newest (or most important) first.
 
-    def update_memory(
+        Uses keyset pagination: the token encodes the sort key of the last
+        row returned, and the next page starts strictly after it through an
+        index. Each page costs the same however deep it is, and rows written
+        in between never shift page boundaries.
+
+        ``columns`` limits the fields read and returned; the sort key's
+        fields are always included.
+
+        Returns:
+            tuple: ``(memories, next_page_token)``; the token is None on the
+            last page.
+
+        Raises:
+            ValueError: ``order`` is not a key of ``PAGE_ORDERS``, or
+                ``page_token`` was not issued for it.
+        """
+        if order not in PAGE_ORDERS:
+            raise ValueError(
+                f"Unknown order {order!r}; expected one of {sorted(PAGE_ORDERS)}"
+            )
+        key_columns = PAGE_ORDERS[order]
+        fields = _projection(None if columns is None else (*columns, *key_columns))
+        page_size = max(1, int(page_size))
+        query = f"SELECT {', '.join(fields)} FROM memories WHERE {_NOT_EXPIRED}"
+        params: list = []
+
+        if memory_type:
+            query += " AND type = ?"
+            params.append(memory_type.value)
+
+        if page_token:
+            placeholders = ", ".join("?" * len(key_columns))
+            query += f" AND ({', '.join(key_columns)}) < ({placeholders})"
+            params.extend(decode_page_token(page_token, len(key_columns)))
+
+        query += f" ORDER BY {', '.join(f'{c} DESC' for c in key_columns)} LIMIT ?"
+        # One extra row tells us whether another page exists.
+        params.append(page_size + 1)
+
+        self.flush()
+        rows = self._cached(
+            ("query", query, tuple(params)),
+            lambda: self._query_memories(query, params, fields),
+        )
+        page = rows[:page_size]
+        next_token = None
+        if len(rows) > page_size:
+            next_token = page_token_for(page[-1], order)
+        return page, next_token
+
+    def iter_memories(
         self,
-        memory_id: int,
+        memory_type: Optional[MemoryType] = None,
+        page_size: int = 200,
+        order: str = "recent",
+        columns: Optional[Iterable[str]] = None,
+    ) -> Iterator[list[Memory]]:
+        """Yield every memory page by page, holding one page in memory at a time."""
+        token = None
+        while True:
+            page, token = self.fetch_page(memory_type, page_size, token, order, columns)
+            if page:
+                yield page
+            if token is None:
+                return
+
+    @staticmethod
+    def _update_assignments(
         content: Optional[str] = None,
         tags: Optional[list[str]] = None,
         importance: Optional[int] = None,
-    ) -> bool:
-        """Update a memory. Returns True if successful."""
+    ) -> tuple[str, list]:
+        """Build the SET clause and its parameters for the given changes.
+
+        Returns an empty clause when nothing would change.
+        """
         updates = []
-        params = []
+        params: list = []
 
         if content is not None:
             updates.append("content = ?")
             params.append(content)
+            updates.append("content_hash = ?")
+            params.append(content_hash(content))
+            updates.extend(f"{column} = ?" for column in _LSH_COLUMNS)
+            params.extend(lsh_keys(content))
 
         if tags is not None:
             updates.append("tags = ?")
@@ -158,89 +1344,535 @@ class MemoryManager:
             params.append(importance)
 
         if not updates:
-            return False
+            return "", []
 
         updates.append("updated_at = ?")
         params.append(datetime.now().isoformat())
-        params.append(memory_id)
+        return ", ".join(updates), params
 
-        with sqlite3.connect(self.db_path) as conn:
+    def update_memory(
+        self,
+        memory_id: int,
+        content: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        importance: Optional[int] = None,
+    ) -> bool:
+        """Update a memory. Returns True if successful."""
+        assignments, params = self._update_assignments(content, tags, importance)
+        if not assignments:
+            return False
+
+        self.flush()
+        with self._transaction() as conn:
             cursor = conn.execute(
-                f"UPDATE memories SET {', '.join(updates)} WHERE id = ?",
-                params,
+                f"UPDATE memories SET {assignments} WHERE id = ?",
+                [*params, memory_id],
             )
-            conn.commit()
-            return cursor.rowcount > 0
+        self._cache.clear()
+        return cursor.rowcount > 0
+
+    def update_memories(self, updates: list[dict]) -> list[bool]:
+        """Apply several updates in one transaction. Returns per-item success.
+
+        Each item takes the arguments of ``update_memory`` (``memory_id`` plus
+        any of ``content``, ``tags``, ``importance``). Items changing the same
+        fields share one ``executemany``. An item fails if its memory does
+        not exist or it changes nothing.
+        """
+        statements: dict[str, list] = {}
+        changes = []
+        for update in updates:
+            fields = {k: v for k, v in update.items() if k != "memory_id"}
+            assignments, params = self._update_assignments(**fields)
+            changes.append(bool(assignments))
+            if assignments:
+                statements.setdefault(assignments, []).append(
+                    [*params, update["memory_id"]]
+                )
+        if not statements:
+            return changes
+
+        self.flush()
+        with self._transaction() as conn:
+            existing = self._existing_ids(conn, [u["memory_id"] for u in updates])
+            for assignments, rows in statements.items():
+                conn.executemany(
+                    f"UPDATE memories SET {assignments} WHERE id = ?", rows
+                )
+        self._cache.clear()
+        return [
+            changed and update["memory_id"] in existing
+            for changed, update in zip(changes, updates)
+        ]
 
     def delete_memory(self, memory_id: int) -> bool:
         """Delete a memory. Returns True if successful."""
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self._transaction() as conn:
             cursor = conn.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+        self._cache.clear()
+        return cursor.rowcount > 0
 
-    def get_memory(self, memory_id: int) -> Optional[dict]:
-        """Get a specific memory by ID."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("SELECT * FROM memories WHERE id = ?", (memory_id,))
-            row = cursor.fetchone()
+    def delete_memories(self, memory_ids: list[int]) -> list[bool]:
+        """Delete several memories in one transaction. Returns per-ID success.
 
-        if not row:
-            return None
+        An ID listed more than once is deleted once: only its first
+        occurrence reports True.
+        """
+        if not memory_ids:
+            return []
+        self.flush()
+        with self._transaction() as conn:
+            existing = self._existing_ids(conn, memory_ids)
+            conn.executemany(
+                "DELETE FROM memories WHERE id = ?",
+                [(memory_id,) for memory_id in existing],
+            )
+        self._cache.clear()
+        deleted = []
+        for memory_id in memory_ids:
+            deleted.append(memory_id in existing)
+            existing.discard(memory_id)
+        return deleted
 
+    @staticmethod
+    def _existing_ids(conn: sqlite3.Connection, memory_ids: list[int]) -> set[int]:
+        """Return which of ``memory_ids`` are stored, in one query."""
+        unique = list(set(memory_ids))
         return {
-            "id": row["id"],
-            "type": row["type"],
-            "content": row["content"],
-            "tags": json.loads(row["tags"]),
-            "created_at": row["created_at"],
-            "updated_at": row["updated_at"],
-            "importance": row["importance"],
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM memories WHERE id IN"
+                " (SELECT value FROM json_each(?))",
+                (json.dumps(unique),),
+            )
         }
 
-    def search_memories(self, query: str) -> list[dict]:
-        """Search memories by content."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
-                """
-                SELECT * FROM memories
-                WHERE content LIKE ? OR tags LIKE ?
+    def get_memory(self, memory_id: int) -> Optional[Memory]:
+        """Get a specific memory by ID."""
+        pending = self._pending.get(memory_id)
+        if pending:
+            memory = Memory(pending, _PENDING_POSITIONS)
+            self._record_access([memory])
+            return memory
+
+        def load() -> Optional[Memory]:
+            memories = _records(
+                self._execute_tuples(
+                    f"SELECT {', '.join(MEMORY_FIELDS)} FROM memories"
+                    f" WHERE id = ? AND {_NOT_EXPIRED}",
+                    (memory_id, _now()),
+                ),
+                MEMORY_FIELDS,
+            )
+            return memories[0] if memories else None
+
+        memory = self._cached(("memory", memory_id), load)
+        if memory:
+            self._record_access([memory])
+        return memory
+
+    def search_memories(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        columns: Optional[Iterable[str]] = None,
+    ) -> list[Memory]:
+        """Search memories by content and tags, best matches first.
+
+        Multi-word queries match memories containing any of the words and are
+        ranked by BM25, so memories matching more (and rarer) words come
+        first. Words of three or more letters also match as prefixes.
+        ``offset`` skips that many of the best matches. ``columns`` limits
+        the fields returned.
+        """
+        self.flush()
+        fields = _projection(columns)
+        if self._fts_enabled:
+            fts_query = to_fts_query(query)
+            if not fts_query:
+                return []
+            cursor = self._execute_tuples(
+                f"""
+                SELECT {', '.join(f'm.{field}' for field in fields)}
+                FROM memories_fts
+                JOIN memories m ON m.id = memories_fts.rowid
+                WHERE memories_fts MATCH ?
+                  AND (m.expires_at IS NULL OR m.expires_at > ?)
+                ORDER BY bm25(memories_fts, 1.0, 2.0)
+                LIMIT ? OFFSET ?
+                """,
+                (fts_query, _now(), limit, offset),
+            )
+        else:
+            cursor = self._execute_tuples(
+                f"""
+                SELECT {', '.join(fields)} FROM memories
+                WHERE (content LIKE ? OR tags LIKE ?) AND {_NOT_EXPIRED}
                 ORDER BY updated_at DESC
+                LIMIT ? OFFSET ?
                 """,
-                (f"%{query}%", f"%{query}%"),
+                (f"%{query}%", f"%{query}%", _now(), limit, offset),
             )
-            rows = cursor.fetchall()
 
-        return [
+        memories = _records(cursor, fields)
+        self._record_access(memories)
+        return memories
+
+    def _sync_vector_index(self) -> None:
+        """Bring the similarity index up to date with the memories table.
+
+        Skipped entirely unless something was written since the last sync.
+        New and edited rows are found through the indexed ``updated_at``
+        column; deletions only when the row counts disagree.
+        """
+        index = self._vector_index
+        self._check_external_changes()
+        generation = self._cache.generation
+        if generation == self._vector_generation:
+            return
+
+        conn = self._connect()
+        rows = conn.execute(
+            """
+            SELECT id, content, tags, updated_at FROM memories
+            WHERE updated_at >= ? ORDER BY updated_at
+            """,
+            (index.watermark,),
+        ).fetchall()
+        for row in rows:
+            index.upsert(row["id"], f"{row['content']} {row['tags'] or ''}")
+        if rows:
+            index.watermark = rows[-1]["updated_at"]
+
+        total = conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+        if total != len(index):
+            live = {row[0] for row in conn.execute("SELECT id FROM memories")}
+            indexed = index.ids()
+            for memory_id in indexed - live:
+                index.remove(memory_id)
+            # Rows imported with old timestamps sit below the watermark.
+            for memory_id in live - indexed:
+                row = conn.execute(
+                    "SELECT content, tags FROM memories WHERE id = ?", (memory_id,)
+                ).fetchone()
+                index.upsert(memory_id, f"{row['content']} {row['tags'] or ''}")
+
+        index.save()
+        self._vector_generation = generation
+
+    def semantic_search(
+        self, query: str, limit: int = 5, offset: int = 0
+    ) -> list[dict]:
+        """Find memories similar in meaning to ``query``, most similar first.
+
+        Matches on shared words and word fragments weighted by rarity, so
+        "what food does the user like" finds "favorite_foods: tacos". Each
+        result carries a ``similarity`` score in [0, 1]. Falls back to
+        ``search_memories`` when the vector index is disabled. ``offset``
+        skips that many of the closest matches.
+        """
+        if self._vector_index is None:
+            return self.search_memories(query, limit, offset)
+
+        self.flush()
+        with self._vector_lock:
+            self._sync_vector_index()
+            hits = self._vector_index.search(query, offset + limit)[offset:]
+        if not hits:
+            return []
+
+        placeholders = ", ".join("?" * len(hits))
+        memories = {
+            m["id"]: m
+            for m in self._query_memories(
+                f"SELECT {', '.join(MEMORY_FIELDS)} FROM memories"
+                f" WHERE {_NOT_EXPIRED} AND id IN ({placeholders})",
+                [memory_id for memory_id, _ in hits],
+            )
+        }
+        results = [
+            {**memories[memory_id], "similarity": round(score, 3)}
+            for memory_id, score in hits
+            if memory_id in memories
+        ]
+        self._record_access(results)
+        return results
+
+    def recall_memories(
+        self,
+        limit: int = 10,
+        memory_type: Optional[MemoryType] = None,
+        offset: int = 0,
+        record_access: bool = True,
+    ) -> list[dict]:
+        """Return the most relevant memories, best first.
+
+        Relevance combines importance, how often a memory has been read and
+        an exponential decay since it was last written or read (see
+        ``RELEVANCE_DECAY_DAYS``). Rows are walked in order of the indexed
+        ``relevance`` column, so only the top ``offset + limit`` are read.
+        Each result carries its ``score``; recalled memories count as read
+        unless ``record_access`` is False.
+        """
+        self.flush()
+        now = _now()
+        query = (
+            f"SELECT {', '.join(MEMORY_FIELDS)}, relevance, julianday(?)"
+            f" FROM memories WHERE {_NOT_EXPIRED}"
+        )
+        params = [now, now]
+        if memory_type:
+            query += " AND type = ?"
+            params.append(memory_type.value)
+        query += " ORDER BY relevance DESC, id DESC LIMIT ? OFFSET ?"
+        params.extend((limit, offset))
+
+        cursor = self._execute_tuples(query, params)
+        positions = _field_positions(
+            (column[0] for column in cursor.description), MEMORY_FIELDS
+        )
+        # Rows end with relevance and the current julian day.
+        results = [
             {
-                "id": row["id"],
-                "type": row["type"],
-                "content": row["content"],
-                "tags": json.loads(row["tags"]),
-                "created_at": row["created_at"],
-                "updated_at": row["updated_at"],
-                "importance": row["importance"],
+                **Memory(row, positions),
+                "score": round(math.exp(row[-2] - row[-1] / RELEVANCE_DECAY_DAYS), 3),
             }
-            for row in rows
+            for row in cursor
         ]
+        if record_access:
+            self._record_access(results)
+        return results
+
+    def revision(self, memory_type: Optional[MemoryType] = None) -> str:
+        """Return a token that changes whenever memories are added, edited or removed.
+
+        Built from the ``memory_stats`` counters and the newest ``updated_at``
+        (an index lookup), so it is cheap enough to check on every startup.
+        With ``memory_type``, only memories of that type are considered.
+        """
+        self.flush()
+        conn = self._connect()
+        dimension, key = ("type", memory_type.value) if memory_type else ("total", "")
+        counts = conn.execute(
+            "SELECT count, content_bytes FROM memory_stats"
+            " WHERE dimension = ? AND key = ?",
+            (dimension, key),
+        ).fetchone()
+        newest = conn.execute(
+            "SELECT MAX(updated_at) FROM memories"
+            + (" WHERE type = ?" if memory_type else ""),
+            (memory_type.value,) if memory_type else (),
+        ).fetchone()[0]
+        count, content_bytes = tuple(counts) if counts else (0, 0)
+        return f"{count}:{content_bytes}:{newest or ''}"
 
     def get_stats(self) -> dict:
-        """Get memory statistics."""
-        with sqlite3.connect(self.db_path) as conn:
-            counts = {}
-            for mem_type in MemoryType:
-                cursor = conn.execute(
-                    "SELECT COUNT(*) as count FROM memories WHERE type = ?",
-                    (mem_type.value,),
-                )
-                counts[mem_type.value] = cursor.fetchone()[0]
+        """Get memory statistics.
 
-            cursor = conn.execute("SELECT COUNT(*) as count FROM memories")
-            total = cursor.fetchone()[0]
+        Returns:
+            dict: ``total``, ``content_bytes``, ``oldest``/``newest`` creation
+            times, and counts ``by_type`` and ``by_importance``.
+        """
+        self.flush()
+        return self._cached(("stats",), self._load_stats)
 
-        return {
-            "total": total,
-            "by_type": counts,
+    def _load_stats(self) -> dict:
+        conn = self._connect()
+        stats = {
+            "total": 0,
+            "content_bytes": 0,
+            "oldest": None,
+            "newest": None,
+            "by_type": {mem_type.value: 0 for mem_type in MemoryType},
+            "by_importance": {},
+        }
+        for row in conn.execute("SELECT * FROM memory_stats"):
+            if row["dimension"] == "total":
+                stats["total"] = row["count"]
+                stats["content_bytes"] = row["content_bytes"]
+                stats["oldest"] = row["oldest"]
+                stats["newest"] = row["newest"]
+            elif row["dimension"] == "type":
+                stats["by_type"][row["key"]] = row["count"]
+            elif row["count"]:
+                stats["by_importance"][row["key"]] = row["count"]
+
+        # The counters include rows that expired but are not purged yet; the
+        # partial expiry index finds those few directly.
+        expired = conn.execute(
+            """
+            SELECT type, ifnull(importance, 1) AS importance, COUNT(*) AS count,
+                   SUM(length(CAST(content AS BLOB))) AS content_bytes
+            FROM memories
+            WHERE expires_at IS NOT NULL AND expires_at <= ?
+            GROUP BY 1, 2
+            """,
+            (_now(),),
+        )
+        any_expired = False
+        for row in expired:
+            any_expired = True
+            stats["total"] -= row["count"]
+            stats["content_bytes"] -= row["content_bytes"]
+            stats["by_type"][row["type"]] -= row["count"]
+            stats["by_importance"][row["importance"]] -= row["count"]
+        if any_expired:
+            # The stored bounds may belong to expired rows; walk idx_created
+            # from each end to the first live row instead.
+            for key, order in (("oldest", "ASC"), ("newest", "DESC")):
+                row = conn.execute(
+                    f"SELECT created_at FROM memories WHERE {_NOT_EXPIRED}"
+                    f" ORDER BY created_at {order} LIMIT 1",
+                    (_now(),),
+                ).fetchone()
+                stats[key] = row[0] if row else None
+        stats["by_importance"] = {
+            level: count
+            for level, count in sorted(stats["by_importance"].items())
+            if count
         }
+        return stats
+
+    # NDJSON export and bulk import live in ``classes.memory_transfer``,
+    # imported on use because that module imports this one.
+
+    def export_ndjson(
+        self, destination, memory_type: Optional[MemoryType] = None
+    ) -> int:
+        """Write live memories to ``destination`` as NDJSON, one memory per line.
+
+        ``destination`` is a path or a writable text file. Returns the number
+        of memories written.
+        """
+        from classes import memory_transfer
+
+        return memory_transfer.export_ndjson(self, destination, memory_type)
+
+    def import_ndjson(
+        self, source, batch_size: int = 50_000, on_duplicate: str = "skip"
+    ) -> dict[str, int]:
+        """Bulk-load memories from NDJSON written by ``export_ndjson``.
+
+        Memories whose normalized content already exists are skipped, or with
+        ``on_duplicate="update"`` overwrite the stored copy when the imported
+        one was updated more recently.
+
+        Returns:
+            dict: ``inserted``, ``updated`` and ``skipped`` counts.
+        """
+        from classes import memory_transfer
+
+        return memory_transfer.import_ndjson(self, source, batch_size, on_duplicate)
+
+    def import_legacy_json(
+        self, path="json_files/memory.json", memory_type=MemoryType.LONG_TERM
+    ) -> dict[str, int]:
+        """Import the legacy ``{key: value}`` memory file; safe to run again."""
+        from classes import memory_transfer
+
+        return memory_transfer.import_legacy_json(self, path, memory_type)
+
+    def purge_expired(self, batch_size: int = 200) -> int:
+        """Delete up to ``batch_size`` expired memories. Returns rows deleted.
+
+        Kept small so each call holds the write lock only briefly; call it
+        repeatedly until it returns less than ``batch_size``.
+        """
+        self.flush()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                DELETE FROM memories WHERE id IN (
+                    SELECT id FROM memories
+                    WHERE expires_at IS NOT NULL AND expires_at <= ?
+                    LIMIT ?
+                )
+                """,
+                (_now(), batch_size),
+            )
+        if cursor.rowcount:
+            self._cache.clear()
+        return cursor.rowcount
+
+    def run_maintenance(self, vacuum_pages: int = 256) -> None:
+        """Reclaim up to ``vacuum_pages`` free pages and refresh planner stats.
+
+        Incremental vacuum only applies to databases created with
+        ``auto_vacuum=INCREMENTAL`` (every database this class creates);
+        older files simply skip that step.
+        """
+        conn = self._connect()
+        conn.execute(f"PRAGMA incremental_vacuum({int(vacuum_pages)})").fetchall()
+        conn.execute("PRAGMA optimize")
+
+    # ------------------------------------------------------------------
+    # Backups
+    # ------------------------------------------------------------------
+
+    def backup(
+        self, destination, pages_per_step: int = 64, step_sleep_ms: float = 1.0
+    ) -> Path:
+        """Copy the live database to ``destination`` without pausing other work.
+
+        Buffered writes and access counts are written first. The copy uses
+        SQLite's online backup API on a connection of its own,
+        ``pages_per_step`` pages at a time with ``step_sleep_ms`` between
+        steps, from a single read snapshot, so the backup is consistent and
+        in WAL mode never blocks readers or writers. The copy is written to a
+        ``.partial`` file and renamed over ``destination`` once complete, so
+        a backup is never half written, and is a single file in
+        rollback-journal mode. Returns the destination path.
+        """
+        self.flush_access()
+        return memory_backup.backup_database(
+            self.db_path,
+            destination,
+            pages_per_step,
+            step_sleep_ms,
+            timeout=self.busy_timeout_ms / 1000,
+        )
+
+    def snapshot(self, backup_dir, keep: int = 7, pages_per_step: int = 64) -> Path:
+        """Back up into a new timestamped file in ``backup_dir``; keep the newest ``keep``.
+
+        Snapshots are named ``<database name>-YYYYmmdd-HHMMSS.db``. Older ones
+        are deleted only after the new one is complete. Returns its path.
+        """
+        path = self.backup(
+            memory_backup.snapshot_path(self.db_path, backup_dir), pages_per_step
+        )
+        memory_backup.prune_snapshots(self.db_path, backup_dir, keep)
+        return path
+
+    def snapshots(self, backup_dir) -> list[Path]:
+        """Snapshots of this database in ``backup_dir``, newest first."""
+        return memory_backup.list_snapshots(self.db_path, backup_dir)
+
+    def restore(self, source) -> None:
+        """Replace every memory with the contents of the backup at ``source``.
+
+        The backup is integrity-checked, then copied over the live database
+        with the online backup API, so other connections and processes see
+        the restored memories on their next read. Older backups are migrated
+        to the current schema. Buffered writes are written before and thus
+        overwritten; caches and the similarity index start over.
+
+        Raises:
+            FileNotFoundError: ``source`` does not exist.
+            ValueError: ``source`` is damaged or not a memory database.
+        """
+        with closing(memory_backup.open_backup(source)) as backup:
+            self.flush_access()
+            backup.backup(self._connect())
+
+        self._init_db()
+        self._init_fts()
+        self._pending.reset_ids()
+        self._dedupe_after_id = 0
+        self._cache.clear()
+        if self._vector_index is not None:
+            with self._vector_lock:
+                self._vector_index.watermark = ""
+                self._vector_generation = None
@@ -0,0 +1,117 @@
+"""
+memory_backup.py: Online backups and snapshots of a memory database.
+
+``backup_database`` copies a live database with SQLite's online backup API
+a few pages at a time from a single read snapshot, so the copy is
+consistent and in WAL mode neither blocks nor is restarted by writers.
+Snapshots are backups named ``<database name>-YYYYmmdd-HHMMSS.db`` in a
+backup directory, of which only the newest few are kept. ``open_backup``
+checks that a file is an intact memory database before it is restored.
+"""
+
+import re
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+
+def copy_database(
+    source: sqlite3.Connection, target: sqlite3.Connection, pages: int, sleep: float
+) -> None:
+    """Copy ``source`` into ``target`` with SQLite's online backup API.
+
+    Copies ``pages`` pages per step and sleeps ``sleep`` seconds between
+    steps, leaving the disk and the GIL to other threads. ``source`` (an
+    autocommit connection) keeps one read transaction open throughout, so in
+    WAL mode every step reads the same snapshot: writes through other
+    connections neither wait for the copy nor restart it.
+    """
+    source.execute("BEGIN")
+    source.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+    try:
+        source.backup(
+            target, pages=max(1, pages), progress=lambda *_: time.sleep(sleep)
+        )
+    finally:
+        source.execute("ROLLBACK")
+    # The snapshot held back checkpoints; catch up here rather than in the
+    # next writer's automatic checkpoint.
+    source.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+
+
+def backup_database(
+    db_path: Path,
+    destination,
+    pages_per_step: int = 64,
+    step_sleep_ms: float = 1.0,
+    timeout: float = 5.0,
+) -> Path:
+    """Copy the database at ``db_path`` to ``destination``; returns its path.
+
+    The copy is written to a ``.partial`` file and renamed over
+    ``destination`` once complete, so a backup is never half written, and
+    is a single file in rollback-journal mode.
+    """
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    partial = destination.with_name(f"{destination.name}.partial")
+    partial.unlink(missing_ok=True)
+    with closing(
+        sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+    ) as source:
+        with closing(sqlite3.connect(partial, timeout=timeout)) as target:
+            copy_database(source, target, pages_per_step, step_sleep_ms / 1000)
+            # A single self-contained file, without -wal/-shm companions.
+            target.execute("PRAGMA journal_mode=DELETE")
+    partial.replace(destination)
+    return destination
+
+
+def snapshot_path(db_path: Path, backup_dir) -> Path:
+    """Path for a new snapshot of ``db_path`` in ``backup_dir``."""
+    return Path(backup_dir) / f"{db_path.stem}-{datetime.now():%Y%m%d-%H%M%S}.db"
+
+
+def list_snapshots(db_path: Path, backup_dir) -> list[Path]:
+    """Snapshots of ``db_path`` in ``backup_dir``, newest first."""
+    pattern = re.compile(rf"{re.escape(db_path.stem)}-\d{{8}}-\d{{6}}\.db")
+    return sorted(
+        (
+            path
+            for path in Path(backup_dir).glob(f"{db_path.stem}-*.db")
+            if pattern.fullmatch(path.name)
+        ),
+        reverse=True,
+    )
+
+
+def prune_snapshots(db_path: Path, backup_dir, keep: int) -> None:
+    """Delete all but the newest ``keep`` (at least one) snapshots."""
+    for stale in list_snapshots(db_path, backup_dir)[max(1, keep) :]:
+        stale.unlink(missing_ok=True)
+
+
+def open_backup(source) -> sqlite3.Connection:
+    """Open the backup at ``source`` after checking it can be restored.
+
+    Raises:
+        FileNotFoundError: ``source`` does not exist.
+        ValueError: ``source`` is damaged or not a memory database.
+    """
+    source = Path(source)
+    if not source.is_file():
+        raise FileNotFoundError(source)
+    backup = sqlite3.connect(source)
+    try:
+        status = backup.execute("PRAGMA quick_check").fetchone()[0]
+        has_memories = backup.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memories'"
+        ).fetchone()
+    except sqlite3.DatabaseError as e:
+        status, has_memories = str(e), None
+    if status != "ok" or not has_memories:
+        backup.close()
+        raise ValueError(f"Not a usable memory backup: {source} ({status})")
+    return backup
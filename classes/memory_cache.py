@@ -0,0 +1,154 @@
+"""
+memory_cache.py: Read-through cache for MemoryManager queries.
+
+``QueryCache`` is a bounded LRU map from query to result whose entries
+expire after a TTL, or earlier when a memory in the result expires. Every
+write clears it; ``generation`` counts the clears so a read that loaded its
+result before a clear cannot store it afterwards. ``DataVersionWatch``
+notices commits made through any other connection, including other
+processes such as the dashboard, so the cache can be cleared for those
+too.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+
+def seconds_until_expiry(value: Any) -> Optional[float]:
+    """Seconds until the first memory in a read result expires, if any."""
+    memories = value if isinstance(value, list) else [value]
+    expiries = [
+        m["expires_at"]
+        for m in memories
+        if isinstance(m, Mapping) and m.get("expires_at")
+    ]
+    if not expiries:
+        return None
+    return (datetime.fromisoformat(min(expiries)) - datetime.now()).total_seconds()
+
+
+class QueryCache:
+    """Bounded LRU cache with a per-entry TTL for MemoryManager reads.
+
+    ``generation`` increases on every ``clear()``; a result loaded before a
+    clear is dropped by ``put()`` so a read racing a write can't re-insert
+    stale data.
+    """
+
+    MISS = object()
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Any:
+        """Return the cached value for ``key`` or ``MISS``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return self.MISS
+
+    def put(
+        self,
+        key: tuple,
+        value: Any,
+        generation: int,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        """Cache ``value`` unless the cache was cleared since ``generation``.
+
+        ``ttl_seconds`` shortens the entry's lifetime below the default, e.g.
+        so a result is dropped the moment one of its memories expires.
+        """
+        with self._lock:
+            if generation != self.generation or self.max_entries <= 0:
+                return
+            ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+            if ttl <= 0:
+                return
+            ttl = min(ttl, self.ttl_seconds)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def load(self, key: tuple, load: Callable[[], Any]) -> Any:
+        """Return ``load()``'s result for ``key``, serving repeats from cache.
+
+        The entry expires when the first memory in the result does.
+        """
+        value = self.get(key)
+        if value is not self.MISS:
+            return value
+        generation = self.generation
+        value = load()
+        self.put(key, value, generation, seconds_until_expiry(value))
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._entries.clear()
+
+    def info(self) -> dict:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "invalidations": self.invalidations,
+            }
+
+
+class DataVersionWatch:
+    """Tells whether another connection committed since the last check.
+
+    ``PRAGMA data_version`` on a dedicated connection changes whenever a
+    different connection commits, covering other processes as well as the
+    owner's own per-thread connections.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        """
+        Args:
+            conn (sqlite3.Connection): Connection used for nothing else;
+                closed by ``close()``.
+        """
+        self._conn = conn
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+
+    def changed(self) -> bool:
+        """True if the database changed since the previous call."""
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            changed = self._version is not None and version != self._version
+            self._version = version
+        return changed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,93 @@
+"""
+memory_digest.py: Compact digest of long-term memories for the session prompt.
+
+A new Gemini Live session otherwise starts knowing nothing and spends its
+first turn on a fetch_all_memories round trip. The digest lists the most
+relevant long-term memories (see ``MemoryManager.recall_memories``) as short
+lines within a byte budget, ready to append to the system instruction.
+
+The digest is cached in a JSON file next to the database together with the
+memory revision it was built from. At each session start only the revision
+is checked (two index lookups); the digest is rebuilt only when long-term
+memories changed, and a rebuild reads just the top of the relevance index,
+never the whole table.
+"""
+
+import json
+import logging
+from pathlib import Path
+
+from classes.memory import MemoryManager, MemoryType
+
+logger = logging.getLogger(__name__)
+
+DIGEST_HEADER = (
+    "\n\nWhat you already remember (long-term memories, most relevant first;"
+    " use the memory tools for details or anything not listed):"
+)
+
+# Memories fetched from the relevance index per round while filling the budget.
+_DIGEST_BATCH = 50
+
+
+def _digest_line(memory: dict) -> str:
+    """One digest line: id, content on a single line, and tags."""
+    content = " ".join(memory["content"].split())
+    tags = f" [{', '.join(memory['tags'])}]" if memory["tags"] else ""
+    return f"\n- #{memory['id']} {content}{tags}"
+
+
+def render_digest(manager: MemoryManager, budget_bytes: int) -> str:
+    """Render the digest of the most relevant long-term memories.
+
+    Lines are added best first until the next one would exceed
+    ``budget_bytes`` (header included). Returns "" when there is nothing to
+    list or the budget cannot hold a single line.
+    """
+    lines = []
+    used = len(DIGEST_HEADER.encode("utf-8"))
+    offset = 0
+    while True:
+        memories = manager.recall_memories(
+            _DIGEST_BATCH, MemoryType.LONG_TERM, offset, record_access=False
+        )
+        for memory in memories:
+            line = _digest_line(memory)
+            size = len(line.encode("utf-8"))
+            if used + size > budget_bytes:
+                return DIGEST_HEADER + "".join(lines) if lines else ""
+            lines.append(line)
+            used += size
+        if len(memories) < _DIGEST_BATCH:
+            return DIGEST_HEADER + "".join(lines) if lines else ""
+        offset += _DIGEST_BATCH
+
+
+def memory_digest(manager: MemoryManager, budget_bytes: int = 2000) -> str:
+    """Return the cached digest, rebuilding it only if memories changed.
+
+    The cache lives at ``<db_path>.digest.json``. A budget of 0 disables
+    the digest.
+    """
+    if budget_bytes <= 0:
+        return ""
+    cache_path = Path(f"{manager.db_path}.digest.json")
+    revision = manager.revision(MemoryType.LONG_TERM)
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cached["revision"] == revision and cached["budget"] == budget_bytes:
+            return cached["digest"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    digest = render_digest(manager, budget_bytes)
+    try:
+        cache_path.write_text(
+            json.dumps(
+                {"revision": revision, "budget": budget_bytes, "digest": digest}
+            ),
+            encoding="utf-8",
+        )
+    except OSError as e:
+        logger.warning("Could not cache memory digest: %s", e)
+    return digest
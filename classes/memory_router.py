@@ -0,0 +1,235 @@
+"""
+memory_router.py: Route memories to per-context SQLite shards.
+
+One avatar visits many worlds and meets many people; keeping all of that in
+one database makes every fetch return everyone's memories. ``MemoryRouter``
+keeps one database file per context (a world, a speaker, an instance, ...)
+and forwards the ``MemoryManager`` API to the shard of the current context,
+so code written against a single manager (the memory tools, the digest,
+``AsyncMemoryManager``) targets the current shard without changes.
+
+Shards are opened lazily and at most ``max_open`` stay open; the least
+recently used one is closed when another is needed, unless a call is still
+using it. ``search_shards`` searches every shard in parallel and merges the
+results.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import chain, zip_longest
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from classes.memory import MemoryManager
+
+DEFAULT_CONTEXT = "default"
+
+# Operations that apply to every open shard rather than only the current one.
+_ALL_OPEN_SHARDS = ("flush", "purge_expired", "merge_near_duplicates")
+
+
+def _shard_filename(context: str) -> str:
+    """Readable, collision-free file name for a context key."""
+    slug = re.sub(r"[^\w.-]+", "_", context).strip("._")[:48] or "shard"
+    digest = hashlib.blake2b(context.encode("utf-8"), digest_size=4).hexdigest()
+    return f"{slug}-{digest}.db"
+
+
+class MemoryRouter:
+    """Routes MemoryManager calls to the shard of the current context."""
+
+    def __init__(
+        self,
+        db_path: str = "memories.db",
+        shard_dir: str = "memory_shards",
+        max_open: int = 8,
+        **manager_kwargs,
+    ):
+        """
+        Set up the router; no shard is opened until it is first used.
+
+        Args:
+            db_path (str): Database of the default context, so an existing
+                single-file setup keeps its memories.
+            shard_dir (str): Directory holding the other contexts' databases
+                and ``shards.json``, the context-to-file manifest.
+            max_open (int): Most shards kept open at once.
+            **manager_kwargs: Passed to every shard's ``MemoryManager``.
+        """
+        self.default_db_path = Path(db_path)
+        self.shard_dir = Path(shard_dir)
+        self.max_open = max(1, max_open)
+        self._manager_kwargs = manager_kwargs
+        self._manifest_path = self.shard_dir / "shards.json"
+        try:
+            self._manifest: dict[str, str] = json.loads(
+                self._manifest_path.read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError):
+            self._manifest = {}
+        self._context = DEFAULT_CONTEXT
+        self._open: OrderedDict[str, MemoryManager] = OrderedDict()
+        self._leases: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            self.max_open, thread_name_prefix="memory-shard"
+        )
+
+    def __enter__(self) -> "MemoryRouter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Contexts
+    # ------------------------------------------------------------------
+
+    @property
+    def context(self) -> str:
+        """Context whose shard receives MemoryManager calls."""
+        return self._context
+
+    def set_context(self, context: Optional[str]) -> str:
+        """Switch the current context (None or "" selects the default one)."""
+        self._context = (context or "").strip() or DEFAULT_CONTEXT
+        return self._context
+
+    @property
+    def db_path(self) -> Path:
+        """Database path of the current context's shard."""
+        with self._lock:
+            return self._shard_path(self._context)
+
+    def contexts(self) -> list[str]:
+        """Every context that has a shard, the default one first."""
+        with self._lock:
+            return [DEFAULT_CONTEXT, *sorted(self._manifest)]
+
+    def _shard_path(self, context: str) -> Path:
+        """Database path of ``context``, registering new contexts (lock held)."""
+        if context == DEFAULT_CONTEXT:
+            return self.default_db_path
+        if context not in self._manifest:
+            self._manifest[context] = _shard_filename(context)
+            self.shard_dir.mkdir(parents=True, exist_ok=True)
+            self._manifest_path.write_text(
+                json.dumps(self._manifest, indent=2), encoding="utf-8"
+            )
+        return self.shard_dir / self._manifest[context]
+
+    # ------------------------------------------------------------------
+    # Shard handles
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def lease(self, context: Optional[str] = None) -> Iterator[MemoryManager]:
+        """Yield the manager of ``context`` (default: current), kept open meanwhile."""
+        context = (context or "").strip() or self._context
+        evicted = []
+        with self._lock:
+            manager = self._open.get(context)
+            if manager is None:
+                manager = MemoryManager(
+                    str(self._shard_path(context)), **self._manager_kwargs
+                )
+                self._open[context] = manager
+            self._open.move_to_end(context)
+            self._leases[context] = self._leases.get(context, 0) + 1
+            evicted = self._evict()
+        for stale in evicted:
+            stale.close()
+        try:
+            yield manager
+        finally:
+            with self._lock:
+                self._leases[context] -= 1
+                evicted = self._evict()
+            for stale in evicted:
+                stale.close()
+
+    def _evict(self) -> list[MemoryManager]:
+        """Detach least recently used idle shards beyond ``max_open`` (lock held)."""
+        evicted = []
+        for context in list(self._open):
+            if len(self._open) <= self.max_open:
+                break
+            if not self._leases.get(context):
+                evicted.append(self._open.pop(context))
+        return evicted
+
+    def close(self) -> None:
+        """Close every open shard."""
+        self._pool.shutdown(wait=True)
+        with self._lock:
+            managers = list(self._open.values())
+            self._open.clear()
+        for manager in managers:
+            manager.close()
+
+    # ------------------------------------------------------------------
+    # MemoryManager API
+    # ------------------------------------------------------------------
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_") or not hasattr(MemoryManager, name):
+            raise AttributeError(name)
+        if name in _ALL_OPEN_SHARDS:
+            return lambda *args, **kwargs: self._on_open_shards(name, *args, **kwargs)
+
+        def call(*args, **kwargs):
+            with self.lease() as manager:
+                return getattr(manager, name)(*args, **kwargs)
+
+        return call
+
+    def _on_open_shards(self, name: str, *args, **kwargs) -> int:
+        """Run a maintenance method on every open shard and sum the results."""
+        with self._lock:
+            contexts = list(self._open)
+        total = 0
+        for context in contexts:
+            with self.lease(context) as manager:
+                total += getattr(manager, name)(*args, **kwargs) or 0
+        return total
+
+    def run_maintenance(self, vacuum_pages: int = 256) -> None:
+        """Run ``MemoryManager.run_maintenance`` on every open shard."""
+        self._on_open_shards("run_maintenance", vacuum_pages)
+
+    def search_shards(
+        self,
+        query: str,
+        limit: int = 10,
+        method: str = "search_memories",
+        contexts: Optional[list[str]] = None,
+    ) -> list[dict]:
+        """Run a search on every shard in parallel and merge the best results.
+
+        ``method`` is ``search_memories``, ``semantic_search`` or
+        ``recall_memories`` (which ignores ``query``). Results scored by
+        ``similarity`` or ``score`` are merged by that score; keyword results
+        are interleaved rank by rank. Each result carries its ``context``.
+        """
+        if method not in ("search_memories", "semantic_search", "recall_memories"):
+            raise ValueError(f"Unknown search method: {method!r}")
+
+        def search(context: str) -> list[dict]:
+            with self.lease(context) as manager:
+                if method == "recall_memories":
+                    results = manager.recall_memories(limit)
+                else:
+                    results = getattr(manager, method)(query, limit)
+            return [{**memory, "context": context} for memory in results]
+
+        per_shard = list(self._pool.map(search, contexts or self.contexts()))
+        merged = [m for m in chain.from_iterable(zip_longest(*per_shard)) if m]
+        score = "similarity" if method == "semantic_search" else "score"
+        if method != "search_memories":
+            merged.sort(key=lambda memory: memory.get(score, 0), reverse=True)
+        return merged[:limit]
@@ -0,0 +1,268 @@
+"""
+memory_transfer.py: NDJSON export and bulk import for MemoryManager.
+
+``export_ndjson`` streams live memories to a file, one JSON object per
+line. ``import_ndjson`` loads such a file back in large transactions:
+each batch is staged in a temporary table, collapsed to one row per
+content hash and merged into ``memories`` with set-based statements, so
+importing a million rows costs a handful of statements per batch rather
+than a trigger cascade per row. ``import_legacy_json`` feeds the old
+``{key: value}`` memory file through the same path.
+"""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Optional
+
+import classes.memory as memory
+from classes.near_duplicates import BANDS
+
+# Per-row insert triggers that bulk imports replace with set-based statements.
+_BULK_TRIGGERS = ("memories_fts_ai", "memory_tags_ai", "memory_stats_ai")
+
+
+def _legacy_text(value: Any) -> str:
+    """Text of a legacy memory value: strings as-is, anything else as JSON."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+@contextmanager
+def _open_text(target, mode: str) -> Iterator[Any]:
+    """Open ``target`` as UTF-8 text if it is a path; pass file objects through."""
+    if hasattr(target, "read" if mode == "r" else "write"):
+        yield target
+        return
+    with open(target, mode, encoding="utf-8", newline="\n") as f:
+        yield f
+
+
+def export_ndjson(
+    manager: memory.MemoryManager,
+    destination,
+    memory_type: Optional[memory.MemoryType] = None,
+) -> int:
+    """Write live memories to ``destination`` as NDJSON, one memory per line.
+
+    ``destination`` is a path or a writable text file. Rows are streamed
+    from the cursor, so memory use does not grow with the table. Returns
+    the number of memories written.
+    """
+    fields = memory.MEMORY_FIELDS
+    query = f"SELECT {', '.join(fields)} FROM memories WHERE {memory._NOT_EXPIRED}"
+    params: list = [memory._now()]
+    if memory_type:
+        query += " AND type = ?"
+        params.append(memory_type.value)
+    query += " ORDER BY id"
+
+    manager.flush()
+    count = 0
+    positions = memory._field_positions(fields, fields)
+    with _open_text(destination, "w") as out:
+        for row in manager._execute_tuples(query, params):
+            out.write(json.dumps(memory.Memory(row, positions), ensure_ascii=False))
+            out.write("\n")
+            count += 1
+    return count
+
+
+def _import_row(record: dict) -> tuple:
+    """Turn one exported memory dict into a row for ``_INSERT_COLUMNS``.
+
+    The LSH keys are left empty: MinHash would dominate the import, so
+    ``merge_near_duplicates`` computes them later.
+    """
+    memory_type = memory.MemoryType(record["type"])
+    content = record["content"]
+    created = record.get("created_at") or memory._now()
+    expires = record.get("expires_at")
+    ttl = memory.MEMORY_TTLS.get(memory_type)
+    if "expires_at" not in record and ttl is not None:
+        expires = (datetime.fromisoformat(created) + ttl).isoformat()
+    return (
+        memory_type.value,
+        content,
+        json.dumps(record.get("tags") or []),
+        created,
+        record.get("updated_at") or created,
+        record.get("importance") or 1,
+        expires,
+        memory.content_hash(content),
+        *(None,) * BANDS,
+    )
+
+
+def _import_records(
+    manager: memory.MemoryManager,
+    records: Iterable[dict],
+    batch_size: int,
+    on_duplicate: str,
+) -> dict[str, int]:
+    """Insert ``records`` in ``batch_size`` transactions, de-duplicating by hash."""
+    if on_duplicate not in ("skip", "update"):
+        raise ValueError(
+            f"on_duplicate must be 'skip' or 'update', not {on_duplicate!r}"
+        )
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+    manager.flush()
+    batch: list[tuple] = []
+
+    def write_batch():
+        with manager._transaction() as conn:
+            inserted, updated = _bulk_insert(manager, conn, batch, on_duplicate)
+        counts["inserted"] += inserted
+        counts["updated"] += updated
+        counts["skipped"] += len(batch) - inserted - updated
+        batch.clear()
+
+    try:
+        for record in records:
+            batch.append(_import_row(record))
+            if len(batch) >= batch_size:
+                write_batch()
+        if batch:
+            write_batch()
+    finally:
+        manager._cache.clear()
+    return counts
+
+
+def _bulk_insert(
+    manager: memory.MemoryManager,
+    conn: sqlite3.Connection,
+    rows: list[tuple],
+    on_duplicate: str,
+) -> tuple[int, int]:
+    """Merge import rows into ``memories`` with set-based statements.
+
+    Rows are staged in a temporary table and collapsed to the most
+    recently updated copy per content hash. Existing memories are
+    refreshed (``on_duplicate="update"``) and the rest inserted by one
+    ``INSERT ... SELECT``. The per-row FTS, tag and statistics insert
+    triggers are dropped around that insert and recreated afterwards,
+    all inside the caller's transaction so other connections never see
+    them missing; the new rows (every ``id`` above the previous maximum)
+    are indexed with one statement per derived table instead.
+
+    Returns:
+        tuple: ``(inserted, updated)`` row counts.
+    """
+    conn.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS memory_import ({memory._INSERT_COLUMNS})"
+    )
+    conn.execute("DELETE FROM memory_import")
+    conn.executemany(
+        f"INSERT INTO memory_import VALUES ({', '.join('?' * len(rows[0]))})",
+        rows,
+    )
+    # With MAX(), SQLite takes the bare rowid from the row holding the max.
+    conn.execute("""
+        DELETE FROM memory_import WHERE rowid NOT IN (
+            SELECT rowid FROM (
+                SELECT rowid, MAX(updated_at) FROM memory_import
+                GROUP BY content_hash
+            )
+        )
+    """)
+
+    updated = 0
+    if on_duplicate == "update":
+        updated = conn.execute("""
+            UPDATE memories
+            SET type = s.type, content = s.content, tags = s.tags,
+                updated_at = s.updated_at, importance = s.importance,
+                expires_at = s.expires_at
+            FROM memory_import AS s
+            WHERE memories.content_hash = s.content_hash
+              AND memories.updated_at < s.updated_at
+        """).rowcount
+
+    after_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM memories").fetchone()[0]
+    triggers = conn.execute(
+        f"""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'trigger' AND name IN ({", ".join("?" * len(_BULK_TRIGGERS))})
+        """,
+        _BULK_TRIGGERS,
+    ).fetchall()
+    for trigger in triggers:
+        conn.execute(f"DROP TRIGGER {trigger['name']}")
+
+    inserted = conn.execute(f"""
+        INSERT INTO memories ({memory._INSERT_COLUMNS})
+        SELECT {memory._INSERT_COLUMNS} FROM memory_import AS s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM memories AS m WHERE m.content_hash = s.content_hash
+        )
+        ORDER BY s.rowid
+    """).rowcount
+
+    if manager._fts_enabled:
+        conn.execute(
+            "INSERT INTO memories_fts(rowid, content, tags)"
+            " SELECT id, content, tags FROM memories WHERE id > ?",
+            (after_id,),
+        )
+    conn.execute(
+        memory._TAG_ROWS_SQL.format(
+            source="(SELECT id, tags FROM memories WHERE id > ?)"
+        ),
+        (after_id,),
+    )
+    manager._add_row_stats(conn, after_id)
+    for trigger in triggers:
+        conn.execute(trigger["sql"])
+    conn.execute("DELETE FROM memory_import")
+    return inserted, updated
+
+
+def import_ndjson(
+    manager: memory.MemoryManager,
+    source,
+    batch_size: int = 50_000,
+    on_duplicate: str = "skip",
+) -> dict[str, int]:
+    """Bulk-load memories from NDJSON written by ``export_ndjson``.
+
+    ``source`` is a path or a readable text file; it is read line by line
+    and written with ``executemany`` in transactions of ``batch_size``
+    rows. Memories whose normalized content already exists are skipped,
+    or with ``on_duplicate="update"`` overwrite the stored copy when the
+    imported one was updated more recently. Imported memories get new IDs
+    and are fingerprinted for near-duplicate merging afterwards, by
+    ``merge_near_duplicates``.
+
+    Returns:
+        dict: ``inserted``, ``updated`` and ``skipped`` counts.
+    """
+    with _open_text(source, "r") as f:
+        records = (json.loads(line) for line in f if line.strip())
+        return _import_records(manager, records, batch_size, on_duplicate)
+
+
+def import_legacy_json(
+    manager: memory.MemoryManager,
+    path="json_files/memory.json",
+    memory_type: memory.MemoryType = memory.MemoryType.LONG_TERM,
+) -> dict[str, int]:
+    """Import the legacy ``{key: value}`` memory file.
+
+    Each entry becomes ``"key: value"`` tagged with the key; values that
+    are not strings are written as JSON. Safe to run again: entries
+    already imported are skipped as duplicates.
+    """
+    with _open_text(path, "r") as f:
+        legacy = json.load(f)
+    records = (
+        {
+            "type": memory_type.value,
+            "content": f"{key}: {_legacy_text(value)}",
+            "tags": [key],
+        }
+        for key, value in legacy.items()
+    )
+    return _import_records(manager, records, batch_size=50_000, on_duplicate="skip")
@@ -0,0 +1,170 @@
+"""
+memory_writer.py: Write-behind queue for MemoryManager.
+
+``WriteBehindQueue`` holds new memory rows in a dict keyed by ID and a
+background thread writes them with one ``executemany`` every
+``flush_interval_ms``, or as soon as ``flush_max_rows`` are waiting. Rows
+get their IDs when queued, from blocks reserved by advancing the
+``memories`` AUTOINCREMENT counter in ``sqlite_sequence``; SQLite never
+hands out an ID at or below that counter, so queued IDs can't collide with
+rows inserted by other connections or processes.
+"""
+
+import logging
+import sqlite3
+import threading
+from contextlib import AbstractContextManager, contextmanager
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def first_free_id(conn: sqlite3.Connection) -> int:
+    """Return the lowest ID AUTOINCREMENT could still hand out (in a transaction)."""
+    row = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'memories'"
+    ).fetchone()
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM memories").fetchone()[0]
+    return max(row[0] if row else 0, max_id) + 1
+
+
+def reserve_ids(conn: sqlite3.Connection, count: int) -> tuple[int, int]:
+    """Reserve ``count`` IDs by advancing the AUTOINCREMENT counter.
+
+    Must run inside a write transaction. Returns the half-open range
+    ``[start, end)``.
+    """
+    start = first_free_id(conn)
+    end = start + count
+    updated = conn.execute(
+        "UPDATE sqlite_sequence SET seq = ? WHERE name = 'memories'",
+        (end - 1,),
+    ).rowcount
+    if not updated:
+        conn.execute(
+            "INSERT INTO sqlite_sequence (name, seq) VALUES ('memories', ?)",
+            (end - 1,),
+        )
+    return start, end
+
+
+class WriteBehindQueue:
+    """Queued memory rows and the thread that writes them in batches.
+
+    Rows are tuples in ``columns`` order, starting with the ID. The lock
+    order is ``flush_lock`` before the queue's condition; ``flush()`` holds
+    ``flush_lock`` while writing, so code that rewrites a queued row under
+    ``locked()`` cannot lose its change to a flush already in progress.
+    """
+
+    def __init__(
+        self,
+        transaction: Callable[[], AbstractContextManager[sqlite3.Connection]],
+        columns: tuple[str, ...],
+        flush_interval_ms: int = 250,
+        flush_max_rows: int = 64,
+    ):
+        """
+        Args:
+            transaction (Callable): Returns a context manager that yields a
+                connection inside a write transaction and commits on exit.
+            columns (tuple[str, ...]): Column names of a queued row.
+            flush_interval_ms (int): Longest time a row stays queued.
+            flush_max_rows (int): Queue length that triggers an early flush;
+                also the size of each reserved ID block.
+        """
+        self._transaction = transaction
+        self._insert_sql = (
+            f"INSERT INTO memories ({', '.join(columns)})"
+            f" VALUES ({', '.join('?' * len(columns))})"
+        )
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_max_rows = max(1, flush_max_rows)
+        self._rows: dict[int, tuple] = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._next_id = 0
+        self._reserved_end = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def start(self) -> None:
+        """Start the background flusher thread."""
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._flush_loop, name="memory-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher thread after one last flush."""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        thread.join()
+
+    def get(self, memory_id: int) -> Optional[tuple]:
+        """Return the queued row for ``memory_id``, if it hasn't been written."""
+        with self._cond:
+            return self._rows.get(memory_id)
+
+    @contextmanager
+    def locked(self) -> Iterator[dict[int, tuple]]:
+        """Hold off flushes and yield the queued rows for rewriting in place."""
+        with self._flush_lock, self._cond:
+            yield self._rows
+
+    def add(self, values: tuple) -> int:
+        """Queue a row (without its ID) and return the ID it was given."""
+        with self._cond:
+            if self._next_id >= self._reserved_end:
+                with self._transaction() as conn:
+                    self._next_id, self._reserved_end = reserve_ids(
+                        conn, self.flush_max_rows
+                    )
+            memory_id = self._next_id
+            self._next_id += 1
+            self._rows[memory_id] = (memory_id, *values)
+            if len(self._rows) >= self.flush_max_rows:
+                self._cond.notify_all()
+        return memory_id
+
+    def reset_ids(self) -> None:
+        """Forget the reserved ID block, e.g. after the database was replaced."""
+        with self._cond:
+            self._next_id = self._reserved_end = 0
+
+    def flush(self) -> int:
+        """Write all queued rows in one transaction. Returns rows written."""
+        with self._flush_lock:
+            with self._cond:
+                rows = list(self._rows.values())
+            if not rows:
+                return 0
+            with self._transaction() as conn:
+                conn.executemany(self._insert_sql, rows)
+            with self._cond:
+                for row in rows:
+                    self._rows.pop(row[0], None)
+            return len(rows)
+
+    def _flush_loop(self) -> None:
+        """Background thread: flush queued rows on an interval or when full."""
+        while True:
+            with self._cond:
+                if not self._stopping:
+                    self._cond.wait(self.flush_interval_ms / 1000)
+                stopping = self._stopping
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                # Rows stay queued and are retried on the next pass.
+                logger.warning("Memory flush failed: %s", e)
+            if stopping:
+                return
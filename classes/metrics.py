@@ -0,0 +1,68 @@
+"""
+metrics.py: In-process counters and latency summaries.
+
+``Metrics`` keeps named counters and, for timings, the most recent samples
+of each series, so it can report percentiles over a sliding window without
+growing for as long as the assistant runs. It is thread-safe; tool code on
+worker threads and the event loop can record into the same instance.
+"""
+
+import math
+import threading
+from collections import defaultdict, deque
+
+
+class Metrics:
+    """Named counters and sliding-window summaries of observed values."""
+
+    def __init__(self, window: int = 1024):
+        """
+        Args:
+            window (int): Most recent samples kept per observed series.
+        """
+        self.window = max(1, window)
+        self._counters: dict[str, int] = defaultdict(int)
+        self._samples: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, by: int = 1) -> None:
+        """Add ``by`` to the counter ``name``."""
+        with self._lock:
+            self._counters[name] += by
+
+    def observe(self, name: str, value: float) -> None:
+        """Record one sample (e.g. a latency in ms) of the series ``name``."""
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(value)
+
+    def summary(self, name: str) -> dict:
+        """Count, mean, p50, p95 and max of the recent samples of ``name``."""
+        with self._lock:
+            values = sorted(self._samples.get(name, ()))
+        if not values:
+            return {"count": 0}
+        return {
+            "count": len(values),
+            "mean": sum(values) / len(values),
+            "p50": _percentile(values, 0.50),
+            "p95": _percentile(values, 0.95),
+            "max": values[-1],
+        }
+
+    def snapshot(self) -> dict:
+        """All counters and series summaries, keyed by name."""
+        with self._lock:
+            counters = dict(self._counters)
+            names = list(self._samples)
+        return {
+            "counters": counters,
+            "series": {name: self.summary(name) for name in names},
+        }
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted ``values``."""
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
@@ -0,0 +1,104 @@
+"""
+near_duplicates.py: MinHash fingerprints for spotting reworded memories.
+
+A memory's text is reduced to a set of features: its content words
+(lower-cased, common function words and plural/possessive endings dropped)
+and every pair of adjacent content words. MinHash estimates how much two
+such sets overlap (their Jaccard similarity); splitting the signature into
+bands (locality-sensitive hashing) turns it into a few integer keys that two
+similar texts very likely share and two unrelated texts almost never do.
+
+With ``BANDS`` bands of ``ROWS_PER_BAND`` hashes, texts with a Jaccard
+similarity of 0.8 share at least one key 99.8% of the time, at 0.6 83% of
+the time, and at 0.1 only 4%. Keys live in indexed columns, so finding
+candidates costs a few index lookups however large the table is; candidates
+are then confirmed with the exact similarity.
+"""
+
+import hashlib
+import re
+from typing import Iterable, Optional
+
+BANDS = 4
+ROWS_PER_BAND = 2
+
+# Underscores split words too, so "favorite_foods" reads as two words.
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+_PRIME = (1 << 61) - 1  # Mersenne prime modulus of the hash permutations
+_KEY_MASK = (1 << 63) - 1  # keys must fit SQLite's signed 64-bit INTEGER
+
+# Words that carry no meaning on their own. Negations are kept on purpose:
+# "likes cats" and "never likes cats" must not look alike.
+_STOPWORDS = frozenset("""
+    a an and are as at be been being but by can could did do does for from
+    had has have he her him his i if in into is it its me my of on or our
+    s she so than that the their them then there these they this those to
+    too us very was we were what when which who will with would you your
+""".split())
+
+
+def _permutation(seed: int) -> tuple[int, int]:
+    digest = hashlib.blake2b(f"minhash-{seed}".encode("ascii"), digest_size=16)
+    value = int.from_bytes(digest.digest(), "little")
+    return (value >> 64) % (_PRIME - 1) + 1, (value & _KEY_MASK) % _PRIME
+
+
+# Fixed coefficients, so fingerprints stay comparable across runs and processes.
+_PERMUTATIONS = tuple(_permutation(i) for i in range(BANDS * ROWS_PER_BAND))
+
+
+def _stem(word: str) -> str:
+    """Drop a plural ending so "tacos" and "taco" compare equal."""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def features(text: str) -> frozenset[str]:
+    """Return the content words of ``text`` and its adjacent word pairs."""
+    words = [
+        _stem(word) for word in _WORD.findall(text.casefold()) if word not in _STOPWORDS
+    ]
+    return frozenset(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def lsh_keys(text: str) -> tuple[Optional[int], ...]:
+    """Return the ``BANDS`` LSH keys of ``text`` (all None if it has no words)."""
+    feature_set = features(text)
+    if not feature_set:
+        return (None,) * BANDS
+    hashes = [
+        int.from_bytes(
+            hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        for feature in feature_set
+    ]
+    signature = [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+    keys = []
+    for band in range(BANDS):
+        key = 0
+        for value in signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]:
+            key = (key * _PRIME + value) & _KEY_MASK
+        keys.append(key)
+    return tuple(keys)
+
+
+def similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    """Jaccard similarity of two feature sets."""
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def best_match(text: str, candidates: Iterable[dict], threshold: float):
+    """Return the candidate whose ``content`` is most similar to ``text``.
+
+    Only candidates with a similarity of at least ``threshold`` qualify;
+    returns None when none does.
+    """
+    wanted = features(text)
+    best, best_score = None, threshold
+    for candidate in candidates:
+        score = similarity(wanted, features(candidate["content"]))
+        if score >= best_score:
+            best, best_score = candidate, score
+    return best
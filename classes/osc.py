@@ -68,6 +68,21 @@ class VRChatOSC:
             self.send_message(page)
             await asyncio.sleep(delay_seconds)
 
+    async def _hold(self, address: str, seconds: float):
+        """
+        Holds an input for a number of seconds, then releases it. The input
+        is released even if the call is cancelled part-way.
+        Args:
+            address (str): The OSC input address.
+            seconds (float): How long to hold the input.
+        """
+
+        self.client.send_message(address, 1)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self.client.send_message(address, 0)
+
     async def look_left(self, seconds: float):
         """
         Sends a command to make the avatar look left by a specified angle.
@@ -75,9 +90,7 @@ class VRChatOSC:
             seconds (float): The amount of time in seconds to look left.
         """
 
-        self.client.send_message("/input/LookLeft", 1)
-        await asyncio.sleep(min(seconds, 3))
-        self.client.send_message("/input/LookLeft", 0)
+        await self._hold("/input/LookLeft", min(seconds, 3))
 
     async def look_right(self, seconds: float):
         """
@@ -86,18 +99,14 @@ class VRChatOSC:
             seconds (float): The amount of time in seconds to look right.
         """
 
-        self.client.send_message("/input/LookRight", 1)
-        await asyncio.sleep(min(seconds, 3))
-        self.client.send_message("/input/LookRight", 0)
+        await self._hold("/input/LookRight", min(seconds, 3))
 
     async def jump(self):
         """
         Sends a command to make the avatar jump.
         """
 
-        self.client.send_message("/input/Jump", 1)
-        await asyncio.sleep(0.1)
-        self.client.send_message("/input/Jump", 0)
+        await self._hold("/input/Jump", 0.1)
 
     def send_osc(self, address: str, value):
         """
@@ -115,9 +124,7 @@ class VRChatOSC:
             seconds (float): The amount of time in seconds to move forward.
         """
 
-        self.client.send_message("/input/MoveForward", 1)
-        await asyncio.sleep(min(seconds, 10))
-        self.client.send_message("/input/MoveForward", 0)
+        await self._hold("/input/MoveForward", min(seconds, 10))
 
     async def move_backward(self, seconds: float):
         """
@@ -126,9 +133,7 @@ class VRChatOSC:
             seconds (float): The amount of time in seconds to move backward.
         """
 
-        self.client.send_message("/input/MoveBackward", 1)
-        await asyncio.sleep(min(seconds, 10))
-        self.client.send_message("/input/MoveBackward", 0)
+        await self._hold("/input/MoveBackward", min(seconds, 10))
 
     async def move_left(self, seconds: float):
         """
@@ -137,9 +142,7 @@ class VRChatOSC:
             seconds (float): The amount of time in seconds to strafe left.
         """
 
-        self.client.send_message("/input/MoveLeft", 1)
-        await asyncio.sleep(min(seconds, 5))
-        self.client.send_message("/input/MoveLeft", 0)
+        await self._hold("/input/MoveLeft", min(seconds, 5))
 
     async def move_right(self, seconds: float):
         """
@@ -148,6 +151,4 @@ class VRChatOSC:
             seconds (float): The amount of time in seconds to strafe right.
         """
 
-        self.client.send_message("/input/MoveRight", 1)
-        await asyncio.sleep(min(seconds, 5))
-        self.client.send_message("/input/MoveRight", 0)
+        await self._hold("/input/MoveRight", min(seconds, 5))
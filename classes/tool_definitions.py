@@ -4,17 +4,25 @@ tool_definitions.py: Tool calling definitions for Gemini Live.
 Defines all available tools for Gemini to call, including VRChat avatar control
 and interaction methods. Provides tool creation and function mappings.
 
-The google-genai SDK introspects function signatures to generate tool schemas,
-so we define actual Python functions with proper signatures and docstrings.
+The tools are declared as Python functions with typed signatures and
+Google-style docstrings; get_tool_schema turns them into explicit, cached
+function declarations (see classes/tool_schema.py).
 """
 
 # Standard library
+import functools
 import json
+from datetime import datetime, timedelta
+from typing import Optional, Required, TypedDict
 
+import classes.memory as memory
+from classes.async_memory import AsyncMemoryManager
 from classes.memory import MemoryManager, MemoryType
+from classes.memory_router import DEFAULT_CONTEXT, MemoryRouter
+from classes.tool_schema import ToolSchema
 
 # ==============================================================================
-# Tool Functions (Gemini will introspect these for tool schemas)
+# Tool Functions (declared to Gemini from their signatures and docstrings)
 # ==============================================================================
 # ==============================================================================
 # VRChat Control Tools (Avatar control via OSC)
@@ -31,6 +39,9 @@ def look_left(seconds: float):
     """
     Sends a command to make your avatar look left for a specified duration.
 
+    Runs in the background: the result only confirms it started, and you are
+    told separately when it finishes.
+
     Args:
         seconds: The amount of time in seconds to look left.
     """
@@ -40,6 +51,9 @@ def look_right(seconds: float):
     """
     Sends a command to make your avatar look right for a specified duration.
 
+    Runs in the background: the result only confirms it started, and you are
+    told separately when it finishes.
+
     Args:
         seconds: The amount of time in seconds to look right.
     """
@@ -65,6 +79,9 @@ def move_forward(seconds: float):
     """
     Sends a command to make your avatar move forward for a specified duration.
 
+    Runs in the background: the result only confirms it started, and you are
+    told separately when it finishes.
+
     Args:
         seconds: The amount of time in seconds to move forward.
     """
@@ -74,6 +91,9 @@ def move_backward(seconds: float):
     """
     Sends a command to make your avatar move backward for a specified duration.
 
+    Runs in the background: the result only confirms it started, and you are
+    told separately when it finishes.
+
     Args:
         seconds: The amount of time in seconds to move backward.
     """
@@ -83,6 +103,9 @@ def move_left(seconds: float):
     """
     Sends a command to make your avatar strafe left for a specified duration.
 
+    Runs in the background: the result only confirms it started, and you are
+    told separately when it finishes.
+
     Args:
         seconds: The amount of time in seconds to strafe left.
     """
@@ -92,6 +115,9 @@ def move_right(seconds: float):
     """
     Sends a command to make your avatar strafe right for a specified duration.
 
+    Runs in the background: the result only confirms it started, and you are
+    told separately when it finishes.
+
     Args:
         seconds: The amount of time in seconds to strafe right.
     """
@@ -102,17 +128,43 @@ def move_right(seconds: float):
 # ==============================================================================
 
 
-def save_short_term_memory(content: str, tags: list[str] = None):
+class NewMemory(TypedDict, total=False):
+    """One memory of a save_memories call."""
+
+    content: Required[str]
+    type: str
+    tags: list[str]
+    importance: int
+    expires_in_days: float
+
+
+class MemoryUpdate(TypedDict, total=False):
+    """One change of an update_memories call."""
+
+    memory_id: Required[int]
+    content: str
+    tags: list[str]
+    importance: int
+
+
+def save_short_term_memory(
+    content: str,
+    tags: Optional[list[str]] = None,
+    expires_in_days: Optional[float] = None,
+):
     """
     Save a short-term memory (temporary, 1-7 days). Use for session-specific info.
 
     Args:
         content: The memory content to store.
         tags: Optional list of tags for organization (e.g., ['user', 'preference']).
+        expires_in_days: Optional lifetime in days (default 7).
     """
 
 
-def save_long_term_memory(content: str, tags: list[str] = None, importance: int = 1):
+def save_long_term_memory(
+    content: str, tags: Optional[list[str]] = None, importance: int = 1
+):
     """
     Save a long-term memory (persistent, indefinite). Use for important info to retain.
 
@@ -123,37 +175,71 @@ def save_long_term_memory(content: str, tags: list[str] = None, importance: int
     """
 
 
-def save_quick_note(content: str, tags: list[str] = None):
+def save_quick_note(
+    content: str,
+    tags: Optional[list[str]] = None,
+    expires_in_days: Optional[float] = None,
+):
     """
     Save a quick note/reminder (1-3 days). Use for quick thoughts and reminders.
 
     Args:
         content: The quick note content.
         tags: Optional list of tags (e.g., ['reminder', 'todo']).
+        expires_in_days: Optional lifetime in days (default 3).
+    """
+
+
+def fetch_all_memories(page_token: Optional[str] = None, page_size: int = 50):
+    """
+    Fetch stored memories across all types (short-term, long-term, quick notes),
+    most recently updated first, one page at a time.
+    Returns JSON with "columns", one array per memory in "rows", and a
+    next_page_token; call again with that token to continue. The token is null
+    when there are no more memories.
+
+    Args:
+        page_token: Token from the previous page, or omit for the first page.
+        page_size: Number of memories per page (default 50).
     """
 
 
-def fetch_all_memories():
+def fetch_short_term_memories(page_token: Optional[str] = None, page_size: int = 50):
     """
-    Fetch all stored memories across all types (short-term, long-term, quick notes).
-    Returns a JSON summary of all memories for reference and context building.
+    Fetch short-term memories, one page at a time. Use to recall session-specific information.
+
+    Args:
+        page_token: Token from the previous page, or omit for the first page.
+        page_size: Number of memories per page (default 50).
     """
 
 
-def fetch_short_term_memories():
-    """Fetch all short-term memories. Use to recall session-specific information."""
+def fetch_long_term_memories(page_token: Optional[str] = None, page_size: int = 50):
+    """
+    Fetch long-term memories, one page at a time. Use to recall important persistent information.
 
+    Args:
+        page_token: Token from the previous page, or omit for the first page.
+        page_size: Number of memories per page (default 50).
+    """
 
-def fetch_long_term_memories():
-    """Fetch all long-term memories. Use to recall important persistent information."""
 
+def fetch_quick_notes(page_token: Optional[str] = None, page_size: int = 50):
+    """
+    Fetch quick notes, one page at a time. Use to recall recent quick reminders and thoughts.
 
-def fetch_quick_notes():
-    """Fetch all quick notes. Use to recall recent quick reminders and thoughts."""
+    Args:
+        page_token: Token from the previous page, or omit for the first page.
+        page_size: Number of memories per page (default 50).
+    """
 
 
 def update_memory(
-    memory_id: int, content: str = None, tags: list[str] = None, importance: int = None
+    memory_id: int,
+    content: Optional[str] = None,
+    tags: Optional[list[str]] = None,
+    importance: Optional[int] = None,
+    context: Optional[str] = None,
 ):
     """
     Update an existing memory.
@@ -163,24 +249,134 @@ def update_memory(
         content: New content (optional).
         tags: New tags (optional).
         importance: New importance level 1-5 (optional, only for long-term).
+        context: Memory set the ID belongs to, as reported by
+            search_all_memory_contexts (optional; default the current set).
     """
 
 
-def delete_memory(memory_id: int):
+def delete_memory(memory_id: int, context: Optional[str] = None):
     """
     Delete a memory by ID.
 
     Args:
         memory_id: The ID of the memory to delete.
+        context: Memory set the ID belongs to, as reported by
+            search_all_memory_contexts (optional; default the current set).
+    """
+
+
+def save_memories(memories: list[NewMemory]):
+    """
+    Save several memories in one call. Prefer this over repeated single saves when
+    a turn produces more than one fact. Returns the new IDs in the same order.
+
+    Args:
+        memories: List of objects, each with "content" (required), "type"
+            ("short_term", "long_term" or "quick_note"; default "long_term"),
+            and optional "tags" (list of strings), "importance" (1-5) and
+            "expires_in_days" (number).
+    """
+
+
+def update_memories(updates: list[MemoryUpdate], context: Optional[str] = None):
+    """
+    Update several existing memories in one call. Returns whether each one was updated.
+
+    Args:
+        updates: List of objects, each with "memory_id" (required) and any of
+            "content", "tags" (list of strings) or "importance" (1-5).
+        context: Memory set the IDs belong to, as reported by
+            search_all_memory_contexts (optional; default the current set).
+    """
+
+
+def delete_memories(memory_ids: list[int], context: Optional[str] = None):
+    """
+    Delete several memories by ID in one call. Returns whether each one was deleted.
+
+    Args:
+        memory_ids: The IDs of the memories to delete.
+        context: Memory set the IDs belong to, as reported by
+            search_all_memory_contexts (optional; default the current set).
+    """
+
+
+def search_memories(query: str, limit: int = 10, page_token: Optional[str] = None):
+    """
+    Search all memories by keywords or tags. Results are ranked best match first.
+
+    Args:
+        query: One or more words to find in memory content or tags.
+        limit: Maximum number of memories to return (default 10).
+        page_token: Token from a previous result to get the next matches.
+    """
+
+
+def semantic_search_memories(
+    query: str, limit: int = 5, page_token: Optional[str] = None
+):
+    """
+    Find memories related in meaning to a question or phrase, even when the exact
+    words differ (e.g. "what food does the user like" finds "favorite_foods: tacos").
+
+    Args:
+        query: A question or phrase describing what to recall.
+        limit: Maximum number of memories to return (default 5).
+        page_token: Token from a previous result to get the next matches.
     """
 
 
-def search_memories(query: str):
+def recall_relevant_memories(
+    memory_type: Optional[str] = None, limit: int = 10, page_token: Optional[str] = None
+):
+    """
+    Recall the memories most worth knowing right now: important ones, ones that
+    are often used, and recent ones, best first. Use this at the start of a
+    conversation or when unsure what you already know.
+
+    Args:
+        memory_type: Only recall "short_term", "long_term" or "quick_note"
+            memories (default: all types).
+        limit: Maximum number of memories to return (default 10).
+        page_token: Token from a previous result to get the next memories.
+    """
+
+
+def switch_memory_context(context: str):
+    """
+    Switch to the separate memory set for a world, group or person, e.g.
+    "world:The Black Cat" or "user:Alice". Every other memory tool then saves
+    to and reads from that set. Use "default" for the shared set.
+
+    Args:
+        context: Name of the memory set to use.
+    """
+
+
+def search_all_memory_contexts(query: str, limit: int = 10):
+    """
+    Search the memory sets of every world, group and person at once. Each
+    result says which context it came from; pass that context to update or
+    delete it, since IDs are only unique within one memory set.
+
+    Args:
+        query: A question or phrase describing what to recall.
+        limit: Maximum number of memories to return (default 10).
+    """
+
+
+def search_conversation_history(
+    query: str, limit: int = 10, page_token: Optional[str] = None
+):
     """
-    Search all memories by keyword or tag.
+    Search what was said in past conversations (by the user and by you), best
+    match first. Use this to recall earlier discussions that were not saved
+    as memories.
 
     Args:
-        query: Search term to find in content or tags.
+        query: Words to find in what was said.
+        limit: Maximum number of utterances to return (default 10).
+        page_token: Token from a previous result to get the next matches.
     """
 
 
@@ -200,8 +396,8 @@ def get_tool_definitions():
     """
     Returns the list of tool functions for Gemini Live.
 
-    The google-genai SDK will introspect these functions to generate tool schemas
-    automatically from their signatures and docstrings.
+    This is the tool registry; get_tool_schema declares these functions to
+    Gemini from their signatures and docstrings.
 
     Returns:
         list: List of tool functions t to Gemini
@@ -225,11 +421,447 @@ def get_tool_definitions():
         fetch_quick_notes,
         update_memory,
         delete_memory,
+        save_memories,
+        update_memories,
+        delete_memories,
         search_memories,
+        semantic_search_memories,
+        recall_relevant_memories,
+        switch_memory_context,
+        search_all_memory_contexts,
+        search_conversation_history,
     ]
 
 
-def get_tool_mapping(vrchat_osc, memory_manager=None):
+def get_tool_schema(cache_path=None):
+    """
+    Returns the validated function declarations of every tool.
+
+    They are built once from get_tool_definitions and reused while this
+    module is unchanged, so connecting and reconnecting skip introspection.
+
+    Args:
+        cache_path (str): JSON file keeping the declarations between runs
+            (optional; in memory only when omitted).
+
+    Returns:
+        ToolSchema: Declarations (``.tool`` for LiveConnectConfig) and
+            argument checking for tool calls.
+    """
+    return ToolSchema.load(get_tool_definitions(), cache_path)
+
+
+# Tools whose calls must not overlap, by conflict group. Calls in one group run
+# one at a time, in the order the model made them; all other calls of a tool
+# turn run concurrently. Movement tools share a group per axis, since opposite
+# inputs held at once cancel out. Memory tools share one, so a save is always
+# visible to a fetch made after it in the same turn and a context switch never
+# lands between two calls that expect the same shard.
+TOOL_CONFLICT_GROUPS = {
+    "toggle_voice": "voice",
+    "look_left": "look",
+    "look_right": "look",
+    "jump": "jump",
+    "move_forward": "move_forward_backward",
+    "move_backward": "move_forward_backward",
+    "move_left": "move_left_right",
+    "move_right": "move_left_right",
+    **{
+        name: "memory"
+        for name in (
+            "save_short_term_memory",
+            "save_long_term_memory",
+            "save_quick_note",
+            "fetch_all_memories",
+            "fetch_short_term_memories",
+            "fetch_long_term_memories",
+            "fetch_quick_notes",
+            "update_memory",
+            "delete_memory",
+            "save_memories",
+            "update_memories",
+            "delete_memories",
+            "search_memories",
+            "semantic_search_memories",
+            "recall_relevant_memories",
+            "switch_memory_context",
+            "search_all_memory_contexts",
+        )
+    },
+}
+
+
+# Long-running tools run in the background: the model gets a "started"
+# acknowledgement with an action ID at once and is told when they finish.
+BACKGROUND_TOOLS = frozenset(
+    {
+        "look_left",
+        "look_right",
+        "move_forward",
+        "move_backward",
+        "move_left",
+        "move_right",
+    }
+)
+
+
+# Worker pool of each sync tool (see ToolExecutor): screen capture has its own
+# so a slow capture never holds up database work, and avatar input has its
+# own. Tools not listed (memory and history lookups) use the "io" pool.
+# Pools only apply to sync tools; async tools (look, jump, move) run on the
+# event loop and are not listed.
+TOOL_POOLS = {
+    "capture_screenshot": "cpu",
+    "toggle_voice": "osc",
+}
+
+
+# Columns of a memory tool result, then the extras some tools append (ranking
+# scores, and the shard each cross-context result came from).
+_RESULT_COLUMNS = ("id", "type", "content", "tags", "importance")
+_EXTRA_COLUMNS = ("similarity", "score", "context")
+
+# Columns of a conversation history result.
+_UTTERANCE_COLUMNS = ("started_at", "speaker", "text")
+
+# Bytes kept free in every result for the continuation token and bookkeeping.
+_RESULT_RESERVE_BYTES = 128
+
+# Default per-call size limit of a memory tool result (about 4 bytes per token).
+DEFAULT_RESULT_BUDGET_BYTES = 6000
+
+
+def _compact_json(value) -> str:
+    """Serialize without indentation or padding; keep UTF-8 text unescaped."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _format_memories(memories, budget_bytes, resume=None, next_page_token=None):
+    """
+    Format memories for Gemini as compact columnar JSON within a byte budget.
+
+    ``memories`` must already be in priority order (relevance, recency or
+    importance): rows are kept from the front until the next one would
+    exceed ``budget_bytes``. A memory too large to fit on its own has its
+    content shortened instead. When rows are dropped, ``resume(i)`` supplies
+    the token that continues at ``memories[i]``; otherwise the result
+    carries ``next_page_token`` unchanged.
+
+    Returns:
+        str: ``{"columns": [...], "rows": [[...], ...], "next_page_token": ...}``
+        plus ``"omitted"`` (rows left out) when the budget was hit.
+    """
+    columns = list(_RESULT_COLUMNS)
+    if memories:
+        columns.extend(c for c in _EXTRA_COLUMNS if c in memories[0])
+    return _format_rows(memories, columns, 2, budget_bytes, resume, next_page_token)
+
+
+def _format_rows(items, columns, text_index, budget_bytes, resume, next_page_token):
+    """Columnar, budgeted formatting shared by the memory and transcript tools.
+
+    ``columns[text_index]`` is the text column shortened when a single row
+    does not fit; see ``_format_memories`` for the rest.
+    """
+    rows = []
+    remaining = budget_bytes - _RESULT_RESERVE_BYTES - len(_compact_json(columns))
+    for item in items:
+        row = [item.get(column) for column in columns]
+        encoded = _compact_json(row)
+        size = len(encoded.encode("utf-8")) + 1
+        if size > remaining:
+            if not rows:
+                excess = size - max(remaining, 0)
+                text = row[text_index].encode("utf-8")
+                row[text_index] = (
+                    text[: max(len(text) - excess - 3, 0)].decode(
+                        "utf-8", errors="ignore"
+                    )
+                    + "…"
+                )
+                rows.append(_compact_json(row))
+            break
+        rows.append(encoded)
+        remaining -= size
+
+    # Rows are already serialized for sizing; splice them in, don't re-encode.
+    tail = {"next_page_token": next_page_token}
+    if len(rows) < len(items):
+        tail["next_page_token"] = resume(len(rows)) if resume else None
+        tail["omitted"] = len(items) - len(rows)
+    return (
+        f'{{"columns":{_compact_json(columns)},"rows":[{",".join(rows)}],'
+        f"{_compact_json(tail)[1:]}"
+    )
+
+
+def _fetch_page(memory_manager, memory_type, page_token, page_size, budget_bytes):
+    """Fetch one page of memories and format it with its continuation token."""
+    try:
+        memories, next_token = memory_manager.fetch_page(
+            memory_type, page_size, page_token
+        )
+    except ValueError as e:
+        return _compact_json({"error": str(e)})
+    return _format_memories(
+        memories,
+        budget_bytes,
+        resume=lambda i: memory.page_token_for(memories[i - 1]) if i else page_token,
+        next_page_token=next_token,
+    )
+
+
+def _search_page(
+    search, query, limit, page_token, budget_bytes, formatter=_format_memories
+):
+    """Run a ranked search from the offset in ``page_token`` and format the page."""
+    try:
+        offset = memory.decode_page_token(page_token, 1)[0] if page_token else 0
+    except ValueError as e:
+        return _compact_json({"error": str(e)})
+    limit = max(1, int(limit))
+    memories = search(query, limit, offset)
+    next_token = (
+        memory.encode_page_token([offset + limit]) if len(memories) == limit else None
+    )
+    return formatter(
+        memories,
+        budget_bytes,
+        resume=lambda i: memory.encode_page_token([offset + i]),
+        next_page_token=next_token,
+    )
+
+
+def _recall_page(memory_manager, memory_type, limit, page_token, budget_bytes):
+    """Recall the most relevant memories from the offset in ``page_token``."""
+    try:
+        memory_type = MemoryType(memory_type) if memory_type else None
+    except ValueError:
+        return _compact_json({"error": f"Unknown memory type: {memory_type!r}"})
+    return _search_page(
+        lambda _, limit, offset: memory_manager.recall_memories(
+            limit, memory_type, offset
+        ),
+        None,
+        limit,
+        page_token,
+        budget_bytes,
+    )
+
+
+def _switch_memory_context(memory_manager, context):
+    """Point the memory tools at another shard, if memories are sharded."""
+    if not isinstance(memory_manager, MemoryRouter):
+        return _compact_json({"error": "Memory contexts are not enabled"})
+    return _compact_json({"context": memory_manager.set_context(context)})
+
+
+def _search_all_contexts(memory_manager, query, limit, budget_bytes):
+    """Search every shard in parallel and format the merged results."""
+    if not isinstance(memory_manager, MemoryRouter):
+        return _compact_json({"error": "Memory contexts are not enabled"})
+    memories = memory_manager.search_shards(
+        query, max(1, int(limit)), "semantic_search"
+    )
+    return _format_memories(memories, budget_bytes)
+
+
+def _format_utterances(utterances, budget_bytes, resume=None, next_page_token=None):
+    """Format transcript search results like ``_format_memories``."""
+    return _format_rows(
+        utterances, _UTTERANCE_COLUMNS, 2, budget_bytes, resume, next_page_token
+    )
+
+
+def _search_transcript(transcript, query, limit, page_token, budget_bytes):
+    """Search the conversation transcript from the offset in ``page_token``."""
+    if transcript is None:
+        return _compact_json({"error": "Conversation history is not enabled"})
+    return _search_page(
+        transcript.search, query, limit, page_token, budget_bytes, _format_utterances
+    )
+
+
+def _expires_at(days):
+    """Turn an optional lifetime in days into an absolute expiry time."""
+    if days is None:
+        return None
+    return datetime.now() + timedelta(days=float(days))
+
+
+def _save_memories(memory_manager, memories):
+    """Validate a batch of memories from Gemini and store it in one transaction."""
+    batch = []
+    for index, item in enumerate(memories):
+        try:
+            memory_type = MemoryType(item.get("type") or "long_term")
+        except ValueError:
+            raise ValueError(
+                f"memories[{index}]: unknown type {item.get('type')!r}"
+            ) from None
+        if not item.get("content"):
+            raise ValueError(f"memories[{index}]: content is required")
+        batch.append(
+            {
+                "content": item["content"],
+                "memory_type": memory_type,
+                "tags": item.get("tags"),
+                "importance": int(item.get("importance") or 1),
+                "expires_at": _expires_at(item.get("expires_in_days")),
+            }
+        )
+    return json.dumps({"ids": memory_manager.store_memories(batch)})
+
+
+def _update_memories(memory_manager, updates):
+    """Apply a batch of updates from Gemini and report each item's outcome."""
+    batch = [
+        {
+            "memory_id": int(item["memory_id"]),
+            "content": item.get("content"),
+            "tags": item.get("tags"),
+            "importance": (
+                int(item["importance"]) if item.get("importance") is not None else None
+            ),
+        }
+        for item in updates
+    ]
+    results = memory_manager.update_memories(batch)
+    return json.dumps(
+        [
+            {"memory_id": item["memory_id"], "updated": ok}
+            for item, ok in zip(batch, results)
+        ]
+    )
+
+
+def _delete_memories(memory_manager, memory_ids):
+    """Delete a batch of memories and report each ID's outcome."""
+    memory_ids = [int(memory_id) for memory_id in memory_ids]
+    results = memory_manager.delete_memories(memory_ids)
+    return json.dumps(
+        [
+            {"memory_id": memory_id, "deleted": ok}
+            for memory_id, ok in zip(memory_ids, results)
+        ]
+    )
+
+
+def _shard_tool_mapping(memory_manager, budget_bytes):
+    """Return the memory tools that work on one database, bound to its manager."""
+    return {
+        "save_short_term_memory": lambda content, tags=None, expires_in_days=None: memory_manager.store_memory(
+            content,
+            MemoryType.SHORT_TERM,
+            tags,
+            expires_at=_expires_at(expires_in_days),
+        ),
+        "save_long_term_memory": lambda content, tags=None, importance=1: memory_manager.store_memory(
+            content, MemoryType.LONG_TERM, tags, importance
+        ),
+        "save_quick_note": lambda content, tags=None, expires_in_days=None: memory_manager.store_memory(
+            content,
+            MemoryType.QUICK_NOTE,
+            tags,
+            expires_at=_expires_at(expires_in_days),
+        ),
+        "fetch_all_memories": lambda page_token=None, page_size=50: _fetch_page(
+            memory_manager, None, page_token, page_size, budget_bytes
+        ),
+        "fetch_short_term_memories": lambda page_token=None, page_size=50: _fetch_page(
+            memory_manager, MemoryType.SHORT_TERM, page_token, page_size, budget_bytes
+        ),
+        "fetch_long_term_memories": lambda page_token=None, page_size=50: _fetch_page(
+            memory_manager, MemoryType.LONG_TERM, page_token, page_size, budget_bytes
+        ),
+        "fetch_quick_notes": lambda page_token=None, page_size=50: _fetch_page(
+            memory_manager, MemoryType.QUICK_NOTE, page_token, page_size, budget_bytes
+        ),
+        "update_memory": lambda memory_id, content=None, tags=None, importance=None: memory_manager.update_memory(
+            memory_id, content, tags, importance
+        ),
+        "delete_memory": lambda memory_id: memory_manager.delete_memory(memory_id),
+        "save_memories": lambda memories: _save_memories(memory_manager, memories),
+        "update_memories": lambda updates: _update_memories(memory_manager, updates),
+        "delete_memories": lambda memory_ids: _delete_memories(
+            memory_manager, memory_ids
+        ),
+        "search_memories": lambda query, limit=10, page_token=None: _search_page(
+            memory_manager.search_memories, query, limit, page_token, budget_bytes
+        ),
+        "semantic_search_memories": lambda query, limit=5, page_token=None: _search_page(
+            memory_manager.semantic_search, query, limit, page_token, budget_bytes
+        ),
+        "recall_relevant_memories": lambda memory_type=None, limit=10, page_token=None: _recall_page(
+            memory_manager, memory_type, limit, page_token, budget_bytes
+        ),
+    }
+
+
+def _single_database_tool(func):
+    """Accept the ``context`` argument of a shard tool without sharded memories."""
+
+    @functools.wraps(func)
+    def tool(*args, context=None, **kwargs):
+        if ((context or "").strip() or DEFAULT_CONTEXT) != DEFAULT_CONTEXT:
+            return _compact_json({"error": "Memory contexts are not enabled"})
+        return func(*args, **kwargs)
+
+    return tool
+
+
+def _routed_tool(router, name, budget_bytes):
+    """Run shard tool ``name`` on one shard, leased for the whole call.
+
+    The shard is the ``context`` argument's, else the current one when the
+    call starts, so a switch made meanwhile cannot split the call across
+    shards.
+    """
+
+    def tool(*args, context=None, **kwargs):
+        with router.lease(context) as manager:
+            return _shard_tool_mapping(manager, budget_bytes)[name](*args, **kwargs)
+
+    return tool
+
+
+def _memory_tool_mapping(memory_manager, budget_bytes):
+    """Return the memory tools, bound to a synchronous MemoryManager or router."""
+    if isinstance(memory_manager, MemoryRouter):
+        tools = {
+            name: _routed_tool(memory_manager, name, budget_bytes)
+            for name in _shard_tool_mapping(memory_manager, budget_bytes)
+        }
+    else:
+        tools = {
+            name: _single_database_tool(func)
+            for name, func in _shard_tool_mapping(memory_manager, budget_bytes).items()
+        }
+    tools["switch_memory_context"] = lambda context: _switch_memory_context(
+        memory_manager, context
+    )
+    tools["search_all_memory_contexts"] = lambda query, limit=10: _search_all_contexts(
+        memory_manager, query, limit, budget_bytes
+    )
+    return tools
+
+
+def _on_memory_thread(async_memory, func):
+    """Wrap a sync memory tool as a coroutine run on the memory worker thread."""
+
+    @functools.wraps(func)
+    async def tool(**kwargs):
+        return await async_memory.call(func, **kwargs)
+
+    return tool
+
+
+def get_tool_mapping(
+    vrchat_osc,
+    memory_manager=None,
+    result_budget_bytes=DEFAULT_RESULT_BUDGET_BYTES,
+    transcript=None,
+):
     """
     Returns a mapping of tool names to their corresponding functions.
 
@@ -238,7 +870,13 @@ def get_tool_mapping(vrchat_osc, memory_manager=None):
 
     Args:
         vrchat_osc (VRChatOSC): The VRChat OSC control instance
-        memory_manager (MemoryManager): The memory manager instance (optional)
+        memory_manager (MemoryManager | AsyncMemoryManager): The memory manager
+            instance (optional). With an AsyncMemoryManager the memory tools
+            are coroutines that run on its dedicated database thread.
+        result_budget_bytes (int): Size limit of each memory tool result;
+            longer results are cut and carry a continuation token.
+        transcript (TranscriptStore): Conversation history searched by
+            search_conversation_history (optional).
 
     Returns:
         dict: Mapping of tool name (str) to function (callable)
@@ -246,23 +884,15 @@ def get_tool_mapping(vrchat_osc, memory_manager=None):
     if memory_manager is None:
         memory_manager = MemoryManager()
 
-    def _format_memories(memories):
-        """Format memories as JSON string for Gemini."""
-        if not memories:
-            return json.dumps([])
-        return json.dumps(
-            [
-                {
-                    "id": m["id"],
-                    "type": m["type"],
-                    "content": m["content"],
-                    "tags": m["tags"],
-                    "importance": m.get("importance", 1),
-                }
-                for m in memories
-            ],
-            indent=2,
-        )
+    if isinstance(memory_manager, AsyncMemoryManager):
+        memory_tools = {
+            name: _on_memory_thread(memory_manager, func)
+            for name, func in _memory_tool_mapping(
+                memory_manager.manager, result_budget_bytes
+            ).items()
+        }
+    else:
+        memory_tools = _memory_tool_mapping(memory_manager, result_budget_bytes)
 
     def _capture_screenshot_impl():
         """Implementation of screenshot capture."""
@@ -284,32 +914,8 @@ def get_tool_mapping(vrchat_osc, memory_manager=None):
         "move_left": vrchat_osc.move_left,
         "move_right": vrchat_osc.move_right,
         "capture_screenshot": _capture_screenshot_impl,
-        "save_short_term_memory": lambda content, tags=None: memory_manager.store_memory(
-            content, MemoryType.SHORT_TERM, tags
-        ),
-        "save_long_term_memory": lambda content, tags=None, importance=1: memory_manager.store_memory(
-            content, MemoryType.LONG_TERM, tags, importance
-        ),
-        "save_quick_note": lambda content, tags=None: memory_manager.store_memory(
-            content, MemoryType.QUICK_NOTE, tags
-        ),
-        "fetch_all_memories": lambda: _format_memories(
-            memory_manager.fetch_all_memories()
-        ),
-        "fetch_short_term_memories": lambda: _format_memories(
-            memory_manager.fetch_memories(MemoryType.SHORT_TERM)
-        ),
-        "fetch_long_term_memories": lambda: _format_memories(
-            memory_manager.fetch_memories(MemoryType.LONG_TERM)
-        ),
-        "fetch_quick_notes": lambda: _format_memories(
-            memory_manager.fetch_memories(MemoryType.QUICK_NOTE)
-        ),
-        "update_memory": lambda memory_id, content=None, tags=None, importance=None: memory_manager.update_memory(
-            memory_id, content, tags, importance
-        ),
-        "delete_memory": lambda memory_id: memory_manager.delete_memory(memory_id),
-        "search_memories": lambda query: _format_memories(
-            memory_manager.search_memories(query)
+        "search_conversation_history": lambda query, limit=10, page_token=None: _search_transcript(
+            transcript, query, limit, page_token, result_budget_bytes
         ),
+        **memory_tools,
     }
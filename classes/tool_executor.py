@@ -0,0 +1,159 @@
+"""
+tool_executor.py: Bounded worker pools and timeouts for tool calls.
+
+Sync tools used to run on the event loop's shared default executor with no
+time limit, so one slow screenshot or a locked database could take every
+worker and hang the tool turn. ``ToolExecutor`` gives each tool class its
+own small thread pool (``io`` for database and file work, ``cpu`` for
+screen capture, ``osc`` for sync avatar input) and bounds every call, sync or
+async, with a per-tool timeout. A call that times out raises
+``ToolTimeoutError``, whose ``result`` is the structured error returned to
+the model. Queue depth, queue wait and call latency go to ``Metrics``.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from classes.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = {"io": 4, "cpu": 2, "osc": 1}
+DEFAULT_TIMEOUT_SECONDS = 15.0
+
+
+class ToolTimeoutError(Exception):
+    """A tool call did not finish within its timeout."""
+
+    def __init__(self, name: str, timeout: float):
+        super().__init__(f"{name} did not finish within {timeout:g} s")
+        self.name = name
+        self.timeout = timeout
+
+    @property
+    def result(self) -> dict:
+        """The error as returned to the model in place of a result."""
+        return {
+            "error": "timeout",
+            "tool": self.name,
+            "timeout_seconds": self.timeout,
+            "message": f"{self} and was abandoned; try again later",
+        }
+
+
+class ToolExecutor:
+    """Runs tool calls on per-class worker pools with per-tool timeouts."""
+
+    def __init__(
+        self,
+        workers: Optional[dict[str, int]] = None,
+        tool_pools: Optional[dict[str, str]] = None,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        timeouts: Optional[dict[str, float]] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Args:
+            workers (dict): Worker threads per pool, merged over
+                DEFAULT_WORKERS.
+            tool_pools (dict): Pool of each tool by name (see TOOL_POOLS);
+                tools not listed use ``io``.
+            timeout_seconds (float): Time limit of a call, including time
+                queued for a worker. 0 or less disables it.
+            timeouts (dict): Per-tool time limits overriding
+                ``timeout_seconds``.
+            metrics (Metrics): Where queue depth and latencies are recorded.
+        """
+        self.workers = {**DEFAULT_WORKERS, **(workers or {})}
+        self.tool_pools = dict(tool_pools or {})
+        self.timeout_seconds = timeout_seconds
+        self.timeouts = dict(timeouts or {})
+        self.metrics = metrics or Metrics()
+        self._pools: dict[str, ThreadPoolExecutor] = {}
+        self._queued = {pool: 0 for pool in self.workers}
+        self._lock = threading.Lock()
+
+    def pool_of(self, name: str) -> str:
+        """Pool that runs the sync tool ``name``."""
+        pool = self.tool_pools.get(name, "io")
+        return pool if pool in self.workers else "io"
+
+    def timeout_of(self, name: str) -> Optional[float]:
+        """Time limit of a call to ``name`` in seconds, or None for none."""
+        timeout = self.timeouts.get(name, self.timeout_seconds)
+        return timeout if timeout and timeout > 0 else None
+
+    def queue_depths(self) -> dict[str, int]:
+        """Calls waiting for a worker, per pool."""
+        with self._lock:
+            return dict(self._queued)
+
+    async def run(self, name: str, func: Callable, args: dict):
+        """Run ``func(**args)`` for tool ``name`` and return its result.
+
+        Coroutine functions run on the event loop, others on their pool.
+        Raises ToolTimeoutError when the call exceeds its timeout; a sync
+        call already running then keeps its worker until it returns.
+        """
+        timeout = self.timeout_of(name)
+        start = time.perf_counter()
+        if inspect.iscoroutinefunction(func):
+            call = func(**args)
+        else:
+            call = self._submit(name, func, args)
+        try:
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            self.metrics.increment("tool_timeouts")
+            logger.warning("Tool %s timed out after %g s", name, timeout)
+            raise ToolTimeoutError(name, timeout) from None
+        finally:
+            self.metrics.observe(
+                f"tool_ms.{name}", (time.perf_counter() - start) * 1000
+            )
+
+    def _submit(self, name: str, func: Callable, args: dict) -> asyncio.Future:
+        """Queue a sync call on its pool; a call cancelled while queued never runs."""
+        pool = self.pool_of(name)
+        executor = self._pools.get(pool)
+        if executor is None:
+            executor = self._pools[pool] = ThreadPoolExecutor(
+                max_workers=max(1, self.workers[pool]),
+                thread_name_prefix=f"tool-{pool}",
+            )
+        with self._lock:
+            self._queued[pool] += 1
+            depth = self._queued[pool]
+        self.metrics.observe(f"tool_queue_depth.{pool}", depth)
+        queued_at = time.perf_counter()
+
+        def call():
+            self._dequeue(pool)
+            self.metrics.observe(
+                f"tool_queue_wait_ms.{pool}", (time.perf_counter() - queued_at) * 1000
+            )
+            return func(**args)
+
+        def dropped(future):
+            # Cancelled before a worker picked it up: call() never ran.
+            if future.cancelled():
+                self._dequeue(pool)
+
+        future = executor.submit(call)
+        future.add_done_callback(dropped)
+        return asyncio.wrap_future(future)
+
+    def _dequeue(self, pool: str) -> None:
+        with self._lock:
+            self._queued[pool] -= 1
+
+    def shutdown(self) -> None:
+        """Drop queued calls and stop the pools without waiting for running ones."""
+        for executor in self._pools.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._pools.clear()
@@ -0,0 +1,350 @@
+"""
+tool_schema.py: Explicit, cached function declarations for the Gemini tools.
+
+Handed plain Python functions, the google-genai SDK rebuilds every tool
+schema by introspection each time a LiveConnectConfig is converted (every
+connect and reconnect), and it reads ``tags: list[str] = None`` as a
+required list. ``ToolSchema.load`` turns the tool registry into explicit
+``FunctionDeclaration`` objects once instead: parameter types come from the
+annotations, descriptions from the docstring (text before ``Args:`` for the
+tool, the ``Args:`` entries for its parameters), and parameters with a
+default are optional. The declarations are validated and cached, in memory
+and in a JSON file, keyed by a hash of the tool module, this module and the
+SDK version, so later starts skip the build. ``ToolSchema.coerce`` checks
+and coerces the model's arguments against the same declarations.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import re
+import sys
+import types as pytypes
+import typing
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from google.genai import __version__ as genai_version
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+_SCALARS = {
+    str: types.Type.STRING,
+    int: types.Type.INTEGER,
+    float: types.Type.NUMBER,
+    bool: types.Type.BOOLEAN,
+    dict: types.Type.OBJECT,
+}
+_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,63}$")
+_ARG = re.compile(r"^(\w+):\s*(.*)$")
+
+# Schemas loaded in this process, by cache key.
+_LOADED: dict[str, "ToolSchema"] = {}
+
+
+class ToolSchemaError(ValueError):
+    """A tool function cannot be turned into a valid declaration."""
+
+
+class ToolArgumentError(ValueError):
+    """A function call's arguments do not match the tool's declaration."""
+
+    def __init__(self, name: str, message: str):
+        super().__init__(f"{name}: {message}")
+        self.name = name
+        self.message = message
+
+    @property
+    def result(self) -> dict:
+        """The error as returned to the model in place of a result."""
+        return {
+            "error": "invalid_arguments",
+            "tool": self.name,
+            "message": self.message,
+        }
+
+
+# ------------------------------------------------------------------
+# Building declarations
+# ------------------------------------------------------------------
+
+
+def _parse_docstring(doc: str) -> tuple[str, dict[str, str]]:
+    """Split a Google-style docstring into its description and Args entries."""
+    description, _, args_section = doc.partition("\nArgs:")
+    arg_docs: dict[str, list[str]] = {}
+    current = arg_indent = None
+    for line in args_section.splitlines():
+        if not line.strip():
+            continue
+        indent = len(line) - len(line.lstrip())
+        match = _ARG.match(line.strip())
+        if match and indent == (arg_indent or indent):
+            current, arg_indent = match.group(1), indent
+            arg_docs[current] = [match.group(2)]
+        elif current is not None:
+            # Continuation of the entry above, indented further.
+            arg_docs[current].append(line.strip())
+    return description.strip(), {k: " ".join(v) for k, v in arg_docs.items()}
+
+
+def _schema_for(annotation, where: str) -> types.Schema:
+    """Schema of one parameter (or list item, or TypedDict field) type."""
+    origin = typing.get_origin(annotation)
+    if origin in (Union, pytypes.UnionType):
+        members = [a for a in typing.get_args(annotation) if a is not type(None)]
+        if len(members) != 1:
+            raise ToolSchemaError(f"{where}: unions are not supported")
+        return _schema_for(members[0], where)
+    if origin is list:
+        (item,) = typing.get_args(annotation) or (None,)
+        if item is None:
+            raise ToolSchemaError(f"{where}: list needs an item type")
+        return types.Schema(type=types.Type.ARRAY, items=_schema_for(item, where))
+    if typing.is_typeddict(annotation):
+        hints = typing.get_type_hints(annotation)
+        return types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                key: _schema_for(hint, f"{where}.{key}") for key, hint in hints.items()
+            },
+            required=[key for key in hints if key in annotation.__required_keys__],
+        )
+    if annotation in _SCALARS:
+        return types.Schema(type=_SCALARS[annotation])
+    raise ToolSchemaError(f"{where}: unsupported type {annotation!r}")
+
+
+def declare(func: Callable) -> types.FunctionDeclaration:
+    """Build the declaration of one tool function."""
+    description, arg_docs = _parse_docstring(inspect.getdoc(func) or "")
+    hints = typing.get_type_hints(func)
+    properties = {}
+    required = []
+    for param in inspect.signature(func).parameters.values():
+        where = f"{func.__name__}({param.name})"
+        if param.name not in hints:
+            raise ToolSchemaError(f"{where}: missing type annotation")
+        schema = _schema_for(hints[param.name], where)
+        schema.description = arg_docs.get(param.name)
+        properties[param.name] = schema
+        if param.default is inspect.Parameter.empty:
+            required.append(param.name)
+    parameters = None
+    if properties:
+        parameters = types.Schema(
+            type=types.Type.OBJECT, properties=properties, required=required or None
+        )
+    return types.FunctionDeclaration(
+        name=func.__name__, description=description, parameters=parameters
+    )
+
+
+def _declaration_problems(declaration: types.FunctionDeclaration) -> list[str]:
+    name = declaration.name or ""
+    problems = []
+    if not _NAME.match(name):
+        problems.append(f"invalid tool name {name!r}")
+    if not declaration.description:
+        problems.append(f"{name}: missing description")
+    parameters = declaration.parameters
+    if parameters is None:
+        return problems
+    properties = parameters.properties or {}
+    for param, schema in properties.items():
+        if not schema.description:
+            problems.append(f"{name}({param}): missing description in Args")
+    for param in parameters.required or ():
+        if param not in properties:
+            problems.append(f"{name}: required {param!r} is not a parameter")
+    return problems
+
+
+def validate_declarations(declarations: list[types.FunctionDeclaration]) -> None:
+    """Raise ToolSchemaError listing every problem found in ``declarations``."""
+    problems = []
+    seen = set()
+    for declaration in declarations:
+        if declaration.name in seen:
+            problems.append(f"{declaration.name}: declared twice")
+        seen.add(declaration.name)
+        problems.extend(_declaration_problems(declaration))
+    if problems:
+        raise ToolSchemaError("; ".join(problems))
+
+
+def _cache_key(functions: list[Callable]) -> str:
+    """Hash of the modules defining ``functions`` and of this builder."""
+    digest = hashlib.sha256(genai_version.encode())
+    modules = {sys.modules[f.__module__] for f in functions} | {sys.modules[__name__]}
+    for module in sorted(modules, key=lambda m: m.__name__):
+        digest.update(Path(module.__file__).read_bytes())
+    digest.update(",".join(f.__name__ for f in functions).encode())
+    return digest.hexdigest()
+
+
+# ------------------------------------------------------------------
+# Argument checking
+# ------------------------------------------------------------------
+
+
+def _coerce_number(value, schema_type, where: str):
+    """Coerce ``value`` to an int (INTEGER) or a float (NUMBER)."""
+    convert = int if schema_type == types.Type.INTEGER else float
+    if isinstance(value, str):
+        try:
+            value = float(value.strip())
+        except ValueError:
+            raise ValueError(f"{where}: expected a number, got {value!r}") from None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{where}: expected a number, got {value!r}")
+    if convert is int and not float(value).is_integer():
+        raise ValueError(f"{where}: expected a whole number, got {value!r}")
+    return convert(value)
+
+
+def _coerce_object(value, schema: types.Schema, where: str) -> dict:
+    if not isinstance(value, dict):
+        raise ValueError(f"{where}: expected an object, got {value!r}")
+    properties = schema.properties or {}
+    missing = [key for key in schema.required or () if value.get(key) is None]
+    if missing:
+        raise ValueError(f"{where}: missing {', '.join(missing)}")
+    return {
+        key: (
+            _coerce(item, properties[key], f"{where}.{key}")
+            if key in properties and item is not None
+            else item
+        )
+        for key, item in value.items()
+    }
+
+
+def _coerce(value, schema: types.Schema, where: str):
+    """Check ``value`` against ``schema``, converting near misses (e.g. "3" to 3)."""
+    schema_type = schema.type
+    if schema_type in (types.Type.INTEGER, types.Type.NUMBER):
+        return _coerce_number(value, schema_type, where)
+    if schema_type == types.Type.STRING:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        if not isinstance(value, str):
+            raise ValueError(f"{where}: expected a string, got {value!r}")
+        return value
+    if schema_type == types.Type.BOOLEAN:
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            return value.lower() == "true"
+        if not isinstance(value, bool):
+            raise ValueError(f"{where}: expected true or false, got {value!r}")
+        return value
+    if schema_type == types.Type.ARRAY:
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        return [
+            _coerce(item, schema.items, f"{where}[{i}]") for i, item in enumerate(value)
+        ]
+    return _coerce_object(value, schema, where)
+
+
+# ------------------------------------------------------------------
+# Schema
+# ------------------------------------------------------------------
+
+
+class ToolSchema:
+    """Validated function declarations of a tool registry."""
+
+    def __init__(self, declarations: list[types.FunctionDeclaration]):
+        """
+        Args:
+            declarations (list): The tools' declarations; validated here.
+        """
+        validate_declarations(declarations)
+        self.declarations = list(declarations)
+        self.tool = types.Tool(function_declarations=self.declarations)
+        self._parameters = {d.name: d.parameters for d in self.declarations}
+
+    @classmethod
+    def build(cls, functions: list[Callable]) -> "ToolSchema":
+        """Declare every tool function (introspection; see ``load``)."""
+        return cls([declare(func) for func in functions])
+
+    @classmethod
+    def load(
+        cls, functions: list[Callable], cache_path: Optional[str] = None
+    ) -> "ToolSchema":
+        """Schema of ``functions``, from the cache when their modules are unchanged.
+
+        Args:
+            functions (list): The tool functions (see get_tool_definitions).
+            cache_path (str): JSON file holding the declarations between
+                runs; None keeps them in memory only.
+        """
+        key = _cache_key(functions)
+        schema = _LOADED.get(key)
+        if schema is None:
+            schema = cls._read_cache(key, cache_path)
+        if schema is None:
+            schema = cls.build(functions)
+            if cache_path:
+                schema._write_cache(key, cache_path)
+        _LOADED[key] = schema
+        return schema
+
+    @classmethod
+    def _read_cache(cls, key: str, cache_path: Optional[str]) -> Optional["ToolSchema"]:
+        if not cache_path or not Path(cache_path).exists():
+            return None
+        try:
+            data = json.loads(Path(cache_path).read_text(encoding="utf-8"))
+            if data.get("key") != key:
+                return None
+            return cls(
+                [
+                    types.FunctionDeclaration.model_validate(d)
+                    for d in data["declarations"]
+                ]
+            )
+        except (OSError, ValueError, KeyError) as e:
+            logger.info("Ignoring tool declaration cache %s: %s", cache_path, e)
+            return None
+
+    def _write_cache(self, key: str, cache_path: str) -> None:
+        path = Path(cache_path)
+        data = {
+            "key": key,
+            "declarations": [
+                d.model_dump(mode="json", exclude_none=True) for d in self.declarations
+            ],
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            partial = path.with_name(path.name + ".partial")
+            partial.write_text(json.dumps(data, indent=1), encoding="utf-8")
+            partial.replace(path)
+        except OSError as e:
+            logger.info("Could not write tool declaration cache %s: %s", path, e)
+
+    def coerce(self, name: str, args: Optional[dict]) -> dict:
+        """Check a call's arguments against its declaration and coerce them.
+
+        Returns the arguments to call the tool with. Raises
+        ToolArgumentError for unknown tools or parameters, missing required
+        parameters and values that cannot be converted to the declared type.
+        """
+        if name not in self._parameters:
+            raise ToolArgumentError(name, "unknown tool")
+        args = dict(args or {})
+        parameters = self._parameters[name]
+        properties = parameters.properties if parameters else {}
+        unknown = [key for key in args if key not in properties]
+        if unknown:
+            raise ToolArgumentError(name, f"unknown parameter {', '.join(unknown)}")
+        try:
+            if parameters is None:
+                return args
+            return _coerce_object(args, parameters, "arguments")
+        except ValueError as e:
+            raise ToolArgumentError(name, str(e)) from None
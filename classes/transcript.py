@@ -0,0 +1,325 @@
+"""
+transcript.py: Searchable store of everything said during Gemini Live sessions.
+
+GeminiLive streams input and output transcriptions as small fragments.
+``TranscriptStore.handle_event`` joins them into one utterance per speaker
+and turn; an utterance ends when the other speaker starts, the turn
+completes or is interrupted, or it reaches ``max_utterance_chars``.
+Finished utterances go through a bounded queue to a writer thread that
+commits them in batches, so the event loop never touches SQLite and memory
+use stays flat however long a session runs. An FTS5 index makes the
+history searchable (``search``).
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from classes.memory import to_fts_query
+
+logger = logging.getLogger(__name__)
+
+SPEAKERS = {"user": "user", "gemini": "gemini"}  # event type -> speaker
+
+# Queue marker asking the writer to commit what it has without waiting.
+_FLUSH = object()
+
+
+class TranscriptStore:
+    """Aggregates transcription fragments into utterances and persists them."""
+
+    def __init__(
+        self,
+        db_path: str = "transcripts.db",
+        flush_interval_ms: int = 1000,
+        batch_size: int = 64,
+        max_queued: int = 1024,
+        max_utterance_chars: int = 4000,
+    ):
+        """
+        Open (or create) the transcript database and start the writer thread.
+
+        Args:
+            db_path (str): SQLite file holding the transcripts.
+            flush_interval_ms (int): Longest time a finished utterance waits
+                before it is committed.
+            batch_size (int): Utterances committed per transaction at most.
+            max_queued (int): Finished utterances buffered for the writer;
+                beyond that new ones are dropped (and counted) instead of
+                growing memory while the database is unavailable.
+            max_utterance_chars (int): Length at which an utterance still in
+                progress is cut and stored.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval_ms = flush_interval_ms
+        self.batch_size = max(1, batch_size)
+        self.max_utterance_chars = max_utterance_chars
+        self.session_id = uuid.uuid4().hex
+        self.dropped = 0
+        self._turn = 0
+        # speaker -> (started_at, fragments, length) of the utterance in progress
+        self._current: dict[str, tuple[str, list[str], int]] = {}
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queued)
+        self._read_lock = threading.Lock()
+        self._fts_enabled = False
+        self._taken = 0
+
+        self._read_conn = self._open_connection()
+        self._init_db()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="transcript-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path, timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_db(self) -> None:
+        """Create the utterance table and, where available, its FTS5 index."""
+        conn = self._read_conn
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS utterances (
+                id INTEGER PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                turn INTEGER NOT NULL,
+                speaker TEXT NOT NULL CHECK(speaker IN ('user', 'gemini')),
+                text TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                ended_at TEXT NOT NULL,
+                interrupted INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_utterances_started"
+            " ON utterances(started_at)"
+        )
+        try:
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS utterances_fts USING fts5(
+                    text, content='utterances', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+                )
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS utterances_fts_ai
+                AFTER INSERT ON utterances BEGIN
+                    INSERT INTO utterances_fts(rowid, text) VALUES (new.id, new.text);
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS utterances_fts_ad
+                AFTER DELETE ON utterances BEGIN
+                    INSERT INTO utterances_fts(utterances_fts, rowid, text)
+                    VALUES ('delete', old.id, old.text);
+                END
+            """)
+            self._fts_enabled = True
+        except sqlite3.OperationalError:
+            logger.info("FTS5 unavailable; transcript search uses substring matching")
+
+    # ------------------------------------------------------------------
+    # Event side (runs on the event loop; never blocks)
+    # ------------------------------------------------------------------
+
+    def handle_event(self, event: dict) -> None:
+        """Feed one GeminiLive event; only transcription and turn events matter."""
+        event_type = event.get("type")
+        speaker = SPEAKERS.get(event_type)
+        if speaker:
+            text = event.get("text") or ""
+            if text:
+                self._add_fragment(speaker, text)
+        elif event_type == "turn_complete":
+            self._end_turn(interrupted=False)
+        elif event_type == "interrupted":
+            self._end_turn(interrupted=True)
+
+    def _add_fragment(self, speaker: str, text: str) -> None:
+        for other in list(self._current):
+            if other != speaker:
+                self._finish(other, interrupted=False)
+        started_at, fragments, length = self._current.get(
+            speaker, (datetime.now().isoformat(), [], 0)
+        )
+        fragments.append(text)
+        length += len(text)
+        self._current[speaker] = (started_at, fragments, length)
+        if length >= self.max_utterance_chars:
+            self._finish(speaker, interrupted=False)
+
+    def _end_turn(self, interrupted: bool) -> None:
+        for speaker in list(self._current):
+            self._finish(speaker, interrupted=interrupted and speaker == "gemini")
+        self._turn += 1
+
+    def _finish(self, speaker: str, interrupted: bool) -> None:
+        """Queue the utterance in progress for ``speaker`` for writing."""
+        started_at, fragments, _ = self._current.pop(speaker)
+        text = " ".join("".join(fragments).split())
+        if not text:
+            return
+        row = (
+            self.session_id,
+            self._turn,
+            speaker,
+            text,
+            started_at,
+            datetime.now().isoformat(),
+            int(interrupted),
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning(
+                    "Transcript queue full; %d utterances dropped", self.dropped
+                )
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _write_loop(self) -> None:
+        conn = self._open_connection()
+        try:
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                if batch:
+                    self._write_batch(conn, batch)
+                for _ in range(self._taken):
+                    self._queue.task_done()
+        finally:
+            conn.close()
+
+    def _next_batch(self) -> tuple[list[tuple], bool]:
+        """Collect utterances until the batch is full, the interval ends or a marker.
+
+        Returns the batch and whether the stop marker was seen; the number
+        of queue items consumed is left in ``_taken``.
+        """
+        batch: list[tuple] = []
+        self._taken = 0
+        deadline = None
+        while len(batch) < self.batch_size:
+            try:
+                if deadline is None:
+                    item = self._queue.get()
+                    deadline = time.monotonic() + self.flush_interval_ms / 1000
+                else:
+                    item = self._queue.get(
+                        timeout=max(0.0, deadline - time.monotonic())
+                    )
+            except queue.Empty:
+                break
+            self._taken += 1
+            if item is None:
+                return batch, True
+            if item is _FLUSH:
+                break
+            batch.append(item)
+        return batch, False
+
+    @staticmethod
+    def _write_batch(conn: sqlite3.Connection, batch: list[tuple]) -> None:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO utterances (session_id, turn, speaker, text,"
+                " started_at, ended_at, interrupted) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.warning("Dropped %d transcript utterances: %s", len(batch), e)
+
+    def flush(self) -> None:
+        """Commit every finished utterance now and wait for it."""
+        if self._writer.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self) -> None:
+        """Store utterances still in progress, drain the queue and stop."""
+        for speaker in list(self._current):
+            self._finish(speaker, interrupted=False)
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        with self._read_lock:
+            self._read_conn.close()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> list[dict]:
+        """Find utterances matching ``query``, best matches first.
+
+        Any word may match and words of three or more letters also match as
+        prefixes. Each result has ``speaker``, ``text``, ``started_at`` and
+        ``session_id``.
+        """
+        self.flush()
+        with self._read_lock:
+            if self._fts_enabled:
+                fts_query = to_fts_query(query)
+                if not fts_query:
+                    return []
+                rows = self._read_conn.execute(
+                    """
+                    SELECT u.* FROM utterances_fts
+                    JOIN utterances u ON u.id = utterances_fts.rowid
+                    WHERE utterances_fts MATCH ?
+                    ORDER BY bm25(utterances_fts) LIMIT ? OFFSET ?
+                    """,
+                    (fts_query, limit, offset),
+                ).fetchall()
+            else:
+                rows = self._read_conn.execute(
+                    "SELECT * FROM utterances WHERE text LIKE ?"
+                    " ORDER BY started_at DESC LIMIT ? OFFSET ?",
+                    (f"%{query}%", limit, offset),
+                ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def recent(self, limit: int = 20, session_id: Optional[str] = None) -> list[dict]:
+        """Return the last ``limit`` utterances (of one session), oldest first."""
+        self.flush()
+        query = "SELECT * FROM utterances"
+        params: list = []
+        if session_id:
+            query += " WHERE session_id = ?"
+            params.append(session_id)
+        query += " ORDER BY started_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        with self._read_lock:
+            rows = self._read_conn.execute(query, params).fetchall()
+        return [self._row_to_dict(row) for row in reversed(rows)]
+
+    @staticmethod
+    def _row_to_dict(row) -> dict:
+        return {
+            "id": row["id"],
+            "session_id": row["session_id"],
+            "speaker": row["speaker"],
+            "text": row["text"],
+            "started_at": row["started_at"],
+            "interrupted": bool(row["interrupted"]),
+        }
@@ -64,5 +64,18 @@ def handle_event(event: dict) -> None:
         log("Response interrupted", "warning", prefix="├───")
     elif event_type == "tool_call":
         log(f"Tool: {event.get('name')} → {event.get('result')}", "info", prefix="├───")
+    elif event_type == "tool_done":
+        log(
+            f"Tool: {event.get('name')} ({event.get('action_id')}) {event.get('status')}"
+            f" → {event.get('result')}",
+            "info" if event.get("status") == "completed" else "warning",
+            prefix="├───",
+        )
+    elif event_type == "tool_cancelled":
+        log(
+            f"Tool: {event.get('name')} → {event.get('result')}",
+            "warning",
+            prefix="├───",
+        )
     elif event_type == "error":
         log(f"Error: {event.get('error')}", "error")
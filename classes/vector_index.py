@@ -0,0 +1,220 @@
+"""
+vector_index.py: Offline similarity index for memories.
+
+Embeds text with the hashing trick (character trigrams plus whole words,
+hashed into a fixed number of signed buckets) and keeps the vectors in a
+NumPy memory-mapped matrix on disk, so no model download or network access
+is needed. Queries are weighted by inverse document frequency and scored by
+cosine similarity against every stored vector.
+
+The matrix is stored dimension-major (one row per hash bucket, one column
+per memory). A query only touches the few dozen buckets its own text hashes
+into, so a search reads a small slice of the matrix instead of all of it.
+"""
+
+import json
+import os
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class HashedVectorIndex:
+    """Incrementally updated, on-disk hashed TF-IDF vector index."""
+
+    def __init__(self, path: Path, dim: int = 512, initial_capacity: int = 1024):
+        """
+        Open (or create) an index stored in the directory ``path``.
+
+        Args:
+            path (Path): Directory holding the matrix, id map and metadata.
+            dim (int): Number of hash buckets per vector. Fixed at creation.
+            initial_capacity (int): Columns to allocate for a new index.
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._matrix_path = self.path / "vectors.f32"
+        meta_path = self.path / "meta.json"
+
+        if meta_path.exists() and self._matrix_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            self.dim = meta["dim"]
+            self.watermark = meta.get("watermark", "")
+            self._count = meta["count"]
+            self._capacity = meta["capacity"]
+            self._ids = np.load(self.path / "ids.npy")
+            self._df = np.load(self.path / "df.npy")
+            self._matrix = np.memmap(
+                self._matrix_path,
+                dtype=np.float32,
+                mode="r+",
+                shape=(self.dim, self._capacity),
+            )
+        else:
+            self.dim = dim
+            self.watermark = ""
+            self._count = 0
+            self._capacity = max(1, initial_capacity)
+            self._ids = np.full(self._capacity, -1, dtype=np.int64)
+            self._df = np.zeros(self.dim, dtype=np.int64)
+            self._matrix = np.memmap(
+                self._matrix_path,
+                dtype=np.float32,
+                mode="w+",
+                shape=(self.dim, self._capacity),
+            )
+
+        live = np.flatnonzero(self._ids[: self._count] >= 0)
+        self._column_of = {int(self._ids[c]): int(c) for c in live}
+        self._free = [int(c) for c in np.flatnonzero(self._ids[: self._count] < 0)]
+
+    def __len__(self) -> int:
+        return len(self._column_of)
+
+    def __contains__(self, memory_id: int) -> bool:
+        return memory_id in self._column_of
+
+    def ids(self) -> set[int]:
+        """Return the IDs of every indexed memory."""
+        return set(self._column_of)
+
+    # ------------------------------------------------------------------
+    # Embedding
+    # ------------------------------------------------------------------
+
+    def _features(self, text: str) -> dict[int, float]:
+        """Hash words and their character trigrams into signed bucket counts."""
+        counts: dict[int, float] = {}
+        for word in _WORD.findall(text.lower()):
+            padded = f" {word} "
+            grams = [padded[i : i + 3] for i in range(len(padded) - 2)]
+            grams.append(word)
+            for gram in grams:
+                h = zlib.crc32(gram.encode("utf-8"))
+                bucket = h % self.dim
+                counts[bucket] = counts.get(bucket, 0.0) + (1.0 if h >> 31 else -1.0)
+        return counts
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Return the L2-normalized, sublinear-TF vector for ``text``."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for bucket, count in self._features(text).items():
+            vector[bucket] = np.sign(count) * np.log1p(abs(count))
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector /= norm
+        return vector
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def _grow(self) -> None:
+        """Double the column capacity, rewriting the matrix file once."""
+        capacity = self._capacity * 2
+        tmp_path = self._matrix_path.with_suffix(".tmp")
+        grown = np.memmap(
+            tmp_path, dtype=np.float32, mode="w+", shape=(self.dim, capacity)
+        )
+        grown[:, : self._capacity] = self._matrix
+        grown.flush()
+        del grown
+        self._matrix.flush()
+        del self._matrix
+        os.replace(tmp_path, self._matrix_path)
+        self._matrix = np.memmap(
+            self._matrix_path, dtype=np.float32, mode="r+", shape=(self.dim, capacity)
+        )
+        ids = np.full(capacity, -1, dtype=np.int64)
+        ids[: self._capacity] = self._ids
+        self._ids = ids
+        self._capacity = capacity
+
+    def upsert(self, memory_id: int, text: str) -> None:
+        """Index ``text`` under ``memory_id``, replacing any previous vector."""
+        vector = self._embed(text)
+        column = self._column_of.get(memory_id)
+        if column is not None:
+            self._df -= self._matrix[:, column] != 0
+        elif self._free:
+            column = self._free.pop()
+        else:
+            if self._count == self._capacity:
+                self._grow()
+            column = self._count
+            self._count += 1
+        self._matrix[:, column] = vector
+        self._ids[column] = memory_id
+        self._column_of[memory_id] = column
+        self._df += vector != 0
+
+    def remove(self, memory_id: int) -> None:
+        """Drop ``memory_id`` from the index if present."""
+        column = self._column_of.pop(memory_id, None)
+        if column is None:
+            return
+        self._df -= self._matrix[:, column] != 0
+        self._matrix[:, column] = 0.0
+        self._ids[column] = -1
+        self._free.append(column)
+
+    def save(self) -> None:
+        """Flush the matrix and persist the id map, counts and metadata."""
+        self._matrix.flush()
+        np.save(self.path / "ids.npy", self._ids)
+        np.save(self.path / "df.npy", self._df)
+        meta = {
+            "dim": self.dim,
+            "count": self._count,
+            "capacity": self._capacity,
+            "watermark": self.watermark,
+        }
+        tmp_path = self.path / "meta.json.tmp"
+        tmp_path.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_path, self.path / "meta.json")
+
+    def close(self) -> None:
+        """Save the index and unmap the matrix file; the index is unusable after."""
+        self.save()
+        # The mapping (and its file descriptor) lives as long as the memmap.
+        del self._matrix
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, text: str, k: int = 5) -> list[tuple[int, float]]:
+        """
+        Return up to ``k`` ``(memory_id, similarity)`` pairs, most similar first.
+
+        Query buckets are weighted by inverse document frequency so common
+        words ("the", "user") count for less than distinctive ones.
+        """
+        if not self._column_of or k <= 0:
+            return []
+        query = self._embed(text)
+        buckets = np.flatnonzero(query)
+        if not buckets.size:
+            return []
+
+        docs = len(self._column_of)
+        idf = np.log((1 + docs) / (1 + self._df[buckets])) + 1.0
+        weights = query[buckets] * idf * idf
+        weights /= np.linalg.norm(query[buckets] * idf)
+
+        n = self._count
+        scores = np.zeros(n, dtype=np.float32)
+        scratch = np.empty(n, dtype=np.float32)
+        for bucket, weight in zip(buckets, weights.astype(np.float32)):
+            np.multiply(self._matrix[bucket, :n], weight, out=scratch)
+            scores += scratch
+        scores[self._ids[:n] < 0] = -np.inf
+
+        k = min(k, len(self._column_of))
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(int(self._ids[c]), float(scores[c])) for c in top if scores[c] > 0]
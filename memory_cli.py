@@ -0,0 +1,69 @@
+"""
+memory_cli.py — bulk import/export of the memory database.
+
+Usage:
+    python memory_cli.py export <file.ndjson> [--type long_term]
+    python memory_cli.py import <file.ndjson> [--on-duplicate update]
+    python memory_cli.py import-legacy [json_files/memory.json]
+
+All commands accept ``--db`` to pick a database other than memories.db.
+"""
+
+import argparse
+import sys
+import time
+
+from classes.memory import MemoryManager, MemoryType
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Import or export NOVA memories.")
+    parser.add_argument("--db", default="memories.db", help="SQLite database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Write memories as NDJSON")
+    export.add_argument("path", help="Output file ('-' for stdout)")
+    export.add_argument(
+        "--type",
+        choices=[memory_type.value for memory_type in MemoryType],
+        help="Only export one memory type",
+    )
+
+    load = commands.add_parser("import", help="Load memories from NDJSON")
+    load.add_argument("path", help="Input file ('-' for stdin)")
+    load.add_argument(
+        "--on-duplicate",
+        choices=["skip", "update"],
+        default="skip",
+        help="Keep existing copies (skip) or take newer imported ones (update)",
+    )
+    load.add_argument("--batch-size", type=int, default=50_000)
+
+    legacy = commands.add_parser(
+        "import-legacy", help="Migrate the old key/value memory.json file"
+    )
+    legacy.add_argument("path", nargs="?", default="json_files/memory.json")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> None:
+    args = _parse_args(argv)
+    start = time.perf_counter()
+    with MemoryManager(args.db) as manager:
+        if args.command == "export":
+            memory_type = MemoryType(args.type) if args.type else None
+            target = sys.stdout if args.path == "-" else args.path
+            count = manager.export_ndjson(target, memory_type)
+            summary = f"Exported {count} memories"
+        elif args.command == "import":
+            source = sys.stdin if args.path == "-" else args.path
+            counts = manager.import_ndjson(source, args.batch_size, args.on_duplicate)
+            summary = ", ".join(f"{n} {what}" for what, n in counts.items())
+        else:
+            counts = manager.import_legacy_json(args.path)
+            summary = ", ".join(f"{n} {what}" for what, n in counts.items())
+    print(f"{summary} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
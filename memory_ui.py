@@ -1,10 +1,12 @@
 """Memory Dashboard UI - Live view and management of AI memories."""
 
+import io
 from datetime import datetime
 
 import streamlit as st
 
-from classes.memory import MemoryManager, MemoryType
+from classes.async_memory import AsyncMemoryManager
+from classes.memory import MemoryType
 
 st.set_page_config(page_title="Memory Dashboard", layout="wide")
 st.title("🧠 AI Memory Dashboard")
@@ -13,7 +15,9 @@ st.title("🧠 AI Memory Dashboard")
 # Initialize memory manager
 @st.cache_resource
 def get_memory_manager():
-    return MemoryManager()
+    # Every rerun runs in a fresh script thread; routing calls through the
+    # manager's worker thread reuses one connection instead of opening more.
+    return AsyncMemoryManager().blocking
 
 
 manager = get_memory_manager()
@@ -79,6 +83,11 @@ def display_memory(memory, col=None):
             tag_str = " ".join([f"🏷️ {tag}" for tag in memory["tags"]])
             st.caption(tag_str)
 
+        if memory.get("expires_at"):
+            st.caption(
+                f"⏳ Expires: {datetime.fromisoformat(memory['expires_at']).strftime('%Y-%m-%d %H:%M')}"
+            )
+
         col1, col2, col3 = st.columns([2, 2, 1])
         with col1:
             st.caption(
@@ -107,6 +116,31 @@ def render_memory_grid(memories, empty_message):
         st.info(empty_message)
 
 
+def render_paged_memories(
+    key, memory_type, empty_message, order="recent", page_size=20
+):
+    """Render one page of memories with Previous/Next controls.
+
+    The tokens of the pages visited so far are kept in the session state, so
+    going back re-runs a cheap keyset query instead of an OFFSET scan.
+    """
+    tokens = st.session_state.setdefault(f"{key}_page_tokens", [None])
+    memories, next_token = manager.fetch_page(memory_type, page_size, tokens[-1], order)
+    render_memory_grid(memories, empty_message)
+
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if len(tokens) > 1 and st.button("← Previous", key=f"{key}_prev"):
+            tokens.pop()
+            st.rerun()
+    with page_col:
+        st.caption(f"Page {len(tokens)}")
+    with next_col:
+        if next_token and st.button("Next →", key=f"{key}_next"):
+            tokens.append(next_token)
+            st.rerun()
+
+
 def render_overview():
     st.header("Memory Overview")
 
@@ -124,9 +158,9 @@ def render_overview():
     st.markdown("---")
     st.subheader("📋 Recent Memories")
 
-    all_memories = manager.fetch_all_memories()
-    if all_memories:
-        for memory in all_memories[:10]:  # Show 10 most recent
+    recent_memories, _ = manager.fetch_page(page_size=10)
+    if recent_memories:
+        for memory in recent_memories:
             display_memory(memory)
     else:
         st.info("No memories yet. Start by adding one!")
@@ -134,30 +168,28 @@ def render_overview():
 
 def render_short_term():
     st.header("📗 Short-Term Memories (1-7 days)")
-    memories = manager.fetch_memories(MemoryType.SHORT_TERM)
-    render_memory_grid(memories, "No short-term memories")
+    render_paged_memories("short_term", MemoryType.SHORT_TERM, "No short-term memories")
 
 
 def render_long_term():
     st.header("📕 Long-Term Memories (Persistent)")
-    memories = manager.fetch_memories(
-        MemoryType.LONG_TERM, order_by="importance DESC, updated_at DESC"
+    render_paged_memories(
+        "long_term", MemoryType.LONG_TERM, "No long-term memories", "importance"
     )
-    render_memory_grid(memories, "No long-term memories")
 
 
 def render_quick_notes():
     st.header("📙 Quick Notes (1-3 days)")
-    memories = manager.fetch_memories(MemoryType.QUICK_NOTE)
-    render_memory_grid(memories, "No quick notes")
+    render_paged_memories("quick_note", MemoryType.QUICK_NOTE, "No quick notes")
 
 
 def render_search():
     st.header("🔍 Search Memories")
     query = st.text_input("Search by content or tags")
+    limit = st.slider("Max results", 5, 100, 20, step=5)
 
     if query:
-        results = manager.search_memories(query)
+        results = manager.search_memories(query, limit)
         st.subheader(f"Found {len(results)} result(s)")
 
         if results:
@@ -181,24 +213,76 @@ def render_statistics():
         st.metric("Long-Term Memories", stats["by_type"].get("long_term", 0))
         st.metric("Quick Notes", stats["by_type"].get("quick_note", 0))
 
+    cache = manager.cache_info()
+    st.caption(
+        f"Query cache: {cache['hits']} hits / {cache['misses']} misses "
+        f"({cache['hit_rate']:.0%} hit rate, {cache['size']} entries)"
+    )
+
     st.markdown("---")
     st.subheader("📈 Memory Breakdown")
 
-    all_memories = manager.fetch_all_memories()
-    if all_memories:
-        memory_data = {
-            "Type": [m["type"] for m in all_memories],
-            "Importance": [m.get("importance", 1) for m in all_memories],
-        }
+    col1, col2 = st.columns(2)
+    with col1:
+        st.caption("By type")
+        st.table(
+            [
+                {"Type": mem_type.replace("_", " ").title(), "Count": count}
+                for mem_type, count in stats["by_type"].items()
+            ]
+        )
+    with col2:
+        st.caption("By importance")
+        st.table(
+            [
+                {"Importance": "★" * int(level), "Count": count}
+                for level, count in stats["by_importance"].items()
+            ]
+        )
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Content Size", f"{stats['content_bytes'] / 1024:.1f} KiB")
+    with col2:
+        if stats["oldest"]:
+            st.metric(
+                "Oldest",
+                datetime.fromisoformat(stats["oldest"]).strftime("%Y-%m-%d"),
+            )
+    with col3:
+        if stats["newest"]:
+            st.metric(
+                "Newest",
+                datetime.fromisoformat(stats["newest"]).strftime("%Y-%m-%d"),
+            )
+
+    render_transfer()
 
-        import pandas as pd
 
-        df = pd.DataFrame(memory_data)
-        st.write(df.value_counts("Type"))
+def render_transfer():
+    """Export to / import from NDJSON without rendering memories in the page."""
+    st.markdown("---")
+    st.subheader("💾 Import / Export (NDJSON)")
 
-        st.markdown("---")
-        st.subheader("📝 All Memories (JSON Export)")
-        st.json(all_memories)
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Prepare export"):
+            buffer = io.StringIO()
+            count = manager.export_ndjson(buffer)
+            st.download_button(
+                f"⬇️ Download {count} memories",
+                buffer.getvalue(),
+                file_name="memories.ndjson",
+                mime="application/x-ndjson",
+            )
+    with col2:
+        upload = st.file_uploader("Import memories", type=["ndjson", "jsonl"])
+        if upload is not None and st.button("⬆️ Import"):
+            counts = manager.import_ndjson(io.TextIOWrapper(upload, encoding="utf-8"))
+            st.success(
+                f"Imported {counts['inserted']} memories "
+                f"({counts['skipped']} duplicates skipped)"
+            )
 
 
 TAB_RENDERERS = {
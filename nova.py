@@ -1,15 +1,23 @@
 import asyncio
+import contextlib
 import os
+import signal
 import sys
+import time
 
 import classes.config as config
+import classes.tool_definitions as tool_definitions
+from classes.async_memory import AsyncMemoryManager
 from classes.audio import AudioManager
 from classes.gemini_live import GeminiLive
 from classes.input_handler import InputHandler
-from classes.memory import MemoryManager
+from classes.memory_digest import memory_digest
+from classes.memory_router import MemoryRouter
+from classes.metrics import Metrics
 from classes.osc import VRChatOSC
 from classes.sfx import play_sound_async, wait_for_all
-from classes.tool_definitions import get_tool_definitions, get_tool_mapping
+from classes.tool_executor import ToolExecutor
+from classes.transcript import TranscriptStore
 from classes.ui import handle_event, log, print_startup_logo
 
 # Force unbuffered output for real-time terminal updates
@@ -41,6 +49,113 @@ async def _banner_resend_loop(vrchat_osc: "VRChatOSC", is_talking: dict) -> None
             await asyncio.sleep(5.0)
 
 
+async def _memory_reaper_loop(
+    memory_manager: "AsyncMemoryManager",
+    interval: float,
+    batch_size: int = 200,
+    maintenance_every: int = 60,
+) -> None:
+    """Periodically delete expired memories in small batches on the memory thread.
+
+    Each pass also merges near-duplicates among the next batch of memories.
+    Every `maintenance_every` passes, also reclaims free pages and refreshes
+    the query planner statistics.
+    """
+    passes = 0
+    while True:
+        try:
+            while True:
+                deleted = await memory_manager.purge_expired(batch_size)
+                if deleted < batch_size:
+                    break
+                await asyncio.sleep(0)  # let other tasks run between batches
+
+            merged = await memory_manager.merge_near_duplicates()
+            if merged:
+                log(f"Merged {merged} near-duplicate memories", "info")
+
+            passes += 1
+            if passes % maintenance_every == 0:
+                await memory_manager.run_maintenance()
+        except Exception as e:
+            log(f"Memory reaper error: {e}", "error")
+        await asyncio.sleep(interval)
+
+
+def _snapshot_due_shards(
+    manager, backup_dir: str, keep: int, interval: float
+) -> tuple[list, float]:
+    """Snapshot each memory database whose newest snapshot is `interval` old.
+
+    With sharding on, `manager` is a MemoryRouter and every context's shard is
+    leased in turn. Returns the new snapshot paths and the seconds until the
+    next snapshot is due.
+    """
+    if isinstance(manager, MemoryRouter):
+        shards = (manager.lease(context) for context in manager.contexts())
+    else:
+        shards = [contextlib.nullcontext(manager)]
+    saved = []
+    wait = interval
+    for lease in shards:
+        with lease as shard:
+            snapshots = shard.snapshots(backup_dir)
+            age = time.time() - snapshots[0].stat().st_mtime if snapshots else interval
+            if age >= interval:
+                saved.append(shard.snapshot(backup_dir, keep))
+                age = 0.0
+        wait = min(wait, interval - age)
+    return saved, wait
+
+
+async def _memory_backup_loop(
+    memory_manager: "AsyncMemoryManager",
+    interval_hours: float,
+    backup_dir: str,
+    keep: int,
+) -> None:
+    """Snapshot the memory databases every `interval_hours`, keeping `keep` snapshots each.
+
+    A snapshot is due one interval after the newest existing one, so restarts
+    neither skip nor repeat backups. The copies run off the memory thread a
+    few pages at a time, so tool calls are not held up while they run.
+    """
+    interval = interval_hours * 3600
+    while True:
+        try:
+            saved, wait = await asyncio.to_thread(
+                _snapshot_due_shards,
+                memory_manager.manager,
+                backup_dir,
+                keep,
+                interval,
+            )
+            for path in saved:
+                log(f"Memory snapshot saved to {path}", "info")
+        except Exception as e:
+            log(f"Memory backup error: {e}", "error")
+            wait = interval
+        await asyncio.sleep(max(wait, 60.0))
+
+
+async def _session_digest(
+    memory_manager: "AsyncMemoryManager", budget_bytes: int
+) -> str:
+    """Digest of the current long-term memories, appended to the prompt on connect.
+
+    Built for every session rather than once per process, so a reconnect
+    sees memories stored, merged or expired since; unchanged memories are
+    served from the digest cache.
+    """
+    try:
+        return await memory_manager.call(
+            memory_digest, memory_manager.manager, budget_bytes
+        )
+    except Exception as e:
+        log(f"Memory digest error: {e}", "warning")
+        return ""
+
+
 async def _run_gemini_session(
     gemini_live,
     audio_manager,
@@ -74,6 +189,9 @@ async def _run_gemini_session(
         audio_interrupt_callback=audio_manager.interrupt_output,
     ):
         handle_event(event)
+        transcript = context.get("transcript")
+        if transcript:
+            transcript.handle_event(event)
 
         if not vrchat_osc:
             continue
@@ -170,21 +288,60 @@ def _try_play_startup_sound() -> None:
 def _init_resources(cfg: config.Config) -> dict:
     """Initialize optional resources (OSC, memory, tools) and return as a dict.
 
-    Returns a map with keys: `vrchat_osc`, `memory_manager`, `tools`, `tool_mapping`.
+    Returns a map with keys: `vrchat_osc`, `memory_manager`, `transcript`,
+    `tools`, `tool_schema`, `tool_mapping`.
     """
     vrchat_osc = (
         VRChatOSC(cfg.get_osc_ip, cfg.get_osc_port) if cfg.get_osc_enabled else None
     )
-    memory_manager = MemoryManager()
+    manager_options = {
+        "write_behind": cfg.get_memory_write_behind,
+        "flush_interval_ms": cfg.get_memory_flush_interval_ms,
+        "flush_max_rows": cfg.get_memory_flush_max_rows,
+        "cache_size": cfg.get_memory_cache_size,
+        "cache_ttl_seconds": cfg.get_memory_cache_ttl_seconds,
+        "vector_index": cfg.get_memory_vector_index,
+        "near_duplicate_threshold": cfg.get_memory_near_duplicate_threshold,
+    }
+    if cfg.get_memory_sharding:
+        memory_manager = AsyncMemoryManager(
+            MemoryRouter(
+                cfg.get_memory_db_path,
+                cfg.get_memory_shard_dir,
+                cfg.get_memory_max_open_shards,
+                **manager_options,
+            )
+        )
+    else:
+        memory_manager = AsyncMemoryManager(
+            db_path=cfg.get_memory_db_path, **manager_options
+        )
+    transcript = None
+    if cfg.get_transcript_enabled:
+        transcript = TranscriptStore(
+            db_path=cfg.get_transcript_db_path,
+            flush_interval_ms=cfg.get_transcript_flush_interval_ms,
+        )
     tools = None
+    tool_schema = None
     tool_mapping = None
     if vrchat_osc:
-        tools = get_tool_definitions()
-        tool_mapping = get_tool_mapping(vrchat_osc, memory_manager)
+        tool_schema = tool_definitions.get_tool_schema(
+            cfg.get_tools_schema_cache or None
+        )
+        tools = [tool_schema.tool]
+        tool_mapping = tool_definitions.get_tool_mapping(
+            vrchat_osc,
+            memory_manager,
+            cfg.get_memory_tool_result_max_bytes,
+            transcript,
+        )
     return {
         "vrchat_osc": vrchat_osc,
         "memory_manager": memory_manager,
+        "transcript": transcript,
         "tools": tools,
+        "tool_schema": tool_schema,
         "tool_mapping": tool_mapping,
     }
 
@@ -232,6 +389,14 @@ async def main() -> None:
     vrchat_osc = resources["vrchat_osc"]
 
     # Initialize Gemini Live for multimodal AI interaction
+    metrics = Metrics()
+    tool_executor = ToolExecutor(
+        workers=cfg.get_tools_workers,
+        tool_pools=tool_definitions.TOOL_POOLS,
+        timeout_seconds=cfg.get_tools_timeout_seconds,
+        timeouts=cfg.get_tools_timeouts,
+        metrics=metrics,
+    )
     gemini_live = GeminiLive(
         api_key=cfg.get_gemini_api_key,
         model=cfg.get_gemini_model,
@@ -240,6 +405,15 @@ async def main() -> None:
         voice_name=cfg.get_gemini_voice,
         tools=resources["tools"],
         tool_mapping=resources["tool_mapping"],
+        tool_conflicts=tool_definitions.TOOL_CONFLICT_GROUPS,
+        max_concurrent_tools=cfg.get_tools_max_concurrent,
+        background_tools=tool_definitions.BACKGROUND_TOOLS,
+        metrics=metrics,
+        tool_executor=tool_executor,
+        tool_schema=resources["tool_schema"],
+        instruction_suffix=lambda: _session_digest(
+            resources["memory_manager"], cfg.get_memory_digest_max_bytes
+        ),
     )
     # The heavy event-processing logic is moved to a helper to reduce
     # complexity of `main` for linting and readability.
@@ -251,6 +425,7 @@ async def main() -> None:
         "text_input_queue": text_input_queue,
         "is_talking": {"active": False},
         "is_typing": False,
+        "transcript": resources["transcript"],
     }
 
     # Start banner resend loop if OSC is enabled
@@ -260,6 +435,23 @@ async def main() -> None:
             _banner_resend_loop(vrchat_osc, context["is_talking"])
         )
 
+    reaper_task = asyncio.create_task(
+        _memory_reaper_loop(
+            resources["memory_manager"], cfg.get_memory_reaper_interval_seconds
+        )
+    )
+
+    backup_task = None
+    if cfg.get_memory_backup_interval_hours > 0:
+        backup_task = asyncio.create_task(
+            _memory_backup_loop(
+                resources["memory_manager"],
+                cfg.get_memory_backup_interval_hours,
+                cfg.get_memory_backup_dir,
+                cfg.get_memory_backup_keep,
+            )
+        )
+
     log("Starting Gemini Live session", "info")
 
     try:
@@ -285,7 +477,31 @@ async def main() -> None:
 
         traceback.print_exc()
     finally:
+        reaper_task.cancel()
+        if backup_task:
+            backup_task.cancel()
         audio_manager.cleanup()
+        memory_manager = resources["memory_manager"]
+        cache = memory_manager.cache_info()
+        log(
+            f"Memory cache: {cache['hits']} hits, {cache['misses']} misses "
+            f"({cache['hit_rate']:.0%} hit rate)",
+            "info",
+        )
+        cancel = metrics.summary("tool_cancel_ms")
+        if cancel["count"]:
+            log(
+                f"Tool cancellations: {cancel['count']}, time to cancel "
+                f"p50 {cancel['p50']:.1f} ms, max {cancel['max']:.1f} ms",
+                "info",
+            )
+        timeouts = metrics.snapshot()["counters"].get("tool_timeouts", 0)
+        if timeouts:
+            log(f"Tool calls timed out: {timeouts}", "warning")
+        tool_executor.shutdown()
+        memory_manager.close()
+        if resources["transcript"]:
+            resources["transcript"].close()
         # Wait briefly for any outstanding SFX playback to finish so
         # daemon/thread shutdown races don't trigger interpreter errors.
         try:
@@ -297,4 +513,7 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
+    # The main.py supervisor stops us with SIGTERM; turn it into SystemExit so
+    # the shutdown path (and the memory write-behind flush) still runs.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     asyncio.run(main())
@@ -23,8 +23,17 @@ echo "     - save_long_term_memory(content, tags, importance)"
 echo "     - save_quick_note(content, tags)"
 echo "     - fetch_all_memories()"
 echo "     - search_memories(query)"
+echo "     - semantic_search_memories(query)"
+echo "     - recall_relevant_memories(memory_type, limit)"
+echo "     - switch_memory_context / search_all_memory_contexts (memory.sharding)"
 echo "     - update_memory(memory_id, ...)"
 echo "     - delete_memory(memory_id)"
+echo "     - save_memories / update_memories / delete_memories (batches)"
+echo ""
+echo "  3. Move memories between hosts (NDJSON):"
+echo "     python memory_cli.py export memories.ndjson"
+echo "     python memory_cli.py import memories.ndjson"
+echo "     python memory_cli.py import-legacy   # json_files/memory.json"
 echo ""
 echo "📊 Memory system features:"
 echo "  - Short-term: Session-specific, 1-7 days"
@@ -0,0 +1,24 @@
+"""Regression tests for AsyncMemoryManager."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.async_memory import AsyncMemoryManager  # noqa: E402
+from classes.memory import MemoryType  # noqa: E402
+
+
+def test_fetch_all_memories_forwards_column_projection(tmp_path):
+    async def fetch():
+        memory_manager = AsyncMemoryManager(db_path=str(tmp_path / "m.db"))
+        try:
+            await memory_manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+            return await memory_manager.fetch_all_memories(columns=("content",))
+        finally:
+            await memory_manager.aclose()
+
+    (memory,) = asyncio.run(fetch())
+    assert set(memory) == {"id", "content", "expires_at"}
+    assert memory["content"] == "likes tacos"
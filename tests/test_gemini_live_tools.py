@@ -0,0 +1,151 @@
+"""Regression tests for GeminiLive tool call cancellation."""
+
+import asyncio
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+from google.genai import types
+from pythonosc.osc_message import OscMessage
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.gemini_live import GeminiLive  # noqa: E402
+from classes.osc import VRChatOSC  # noqa: E402
+
+
+class _Session:
+    """Records what GeminiLive sends back over the live session."""
+
+    def __init__(self):
+        self.tool_responses = []
+        self.notes = []
+
+    async def send_tool_response(self, function_responses):
+        self.tool_responses.append(function_responses)
+
+    async def send_client_content(self, turns, turn_complete):
+        self.notes.append(turns.parts[0].text)
+
+
+@pytest.fixture
+def osc_inbox():
+    """UDP socket standing in for VRChat's OSC input port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as inbox:
+        inbox.bind(("127.0.0.1", 0))
+        yield inbox
+
+
+def _received(inbox: socket.socket) -> list[tuple]:
+    messages = []
+    inbox.settimeout(0.2)
+    try:
+        while True:
+            message = OscMessage(inbox.recv(1024))
+            messages.append((message.address, *message.params))
+    except socket.timeout:
+        return messages
+
+
+def _gemini(osc: VRChatOSC, **kwargs) -> GeminiLive:
+    return GeminiLive(
+        api_key="unused",
+        model="unused",
+        input_sample_rate=16000,
+        tool_mapping={"move_forward": osc.move_forward, "jump": osc.jump},
+        **kwargs,
+    )
+
+
+def _response(**fields) -> types.LiveServerMessage:
+    return types.LiveServerMessage(**fields)
+
+
+async def _receive(gemini: GeminiLive, session: _Session, response, events):
+    await gemini._process_received_response(session, response, None, None, events)
+
+
+async def _settle(gemini: GeminiLive) -> None:
+    """Wait for tool calls, action reports and the tasks they spawn."""
+    while gemini._tool_jobs or gemini._tool_tasks:
+        await asyncio.gather(
+            *gemini._tool_jobs, *gemini._tool_tasks.values(), return_exceptions=True
+        )
+        # Done-callbacks run on the next iteration and may spawn reports.
+        await asyncio.sleep(0)
+
+
+def _drain(events: asyncio.Queue) -> list[dict]:
+    drained = []
+    while not events.empty():
+        drained.append(events.get_nowait())
+    return drained
+
+
+def test_interruption_cancels_a_background_move_and_releases_the_input(osc_inbox):
+    osc = VRChatOSC(*osc_inbox.getsockname())
+    gemini = _gemini(osc, background_tools={"move_forward"})
+    session = _Session()
+
+    async def turn():
+        events = asyncio.Queue()
+        call = types.FunctionCall(id="walk", name="move_forward", args={"seconds": 8})
+        await _receive(
+            gemini, session, _response(tool_call={"function_calls": [call]}), events
+        )
+        await asyncio.sleep(0.1)
+        await _receive(
+            gemini, session, _response(server_content={"interrupted": True}), events
+        )
+        await _settle(gemini)
+        return _drain(events)
+
+    events = asyncio.run(turn())
+
+    assert _received(osc_inbox) == [
+        ("/input/MoveForward", 1),
+        ("/input/MoveForward", 0),
+    ]
+    assert session.tool_responses[0][0].response == {
+        "result": {"status": "started", "action_id": "walk"}
+    }
+    done = [e for e in events if e["type"] == "tool_done"]
+    assert [(e["action_id"], e["status"]) for e in done] == [("walk", "cancelled")]
+    assert session.notes == [
+        "[Action walk (move_forward) cancelled: interrupted by the user]"
+    ]
+    assert gemini.metrics.summary("tool_cancel_ms")["count"] == 1
+    assert gemini._cancel_reasons == {}
+
+
+def test_server_cancelled_calls_are_left_out_of_the_tool_response(osc_inbox):
+    osc = VRChatOSC(*osc_inbox.getsockname())
+    gemini = _gemini(osc)
+    session = _Session()
+
+    async def turn():
+        events = asyncio.Queue()
+        calls = [
+            types.FunctionCall(id="walk", name="move_forward", args={"seconds": 8}),
+            types.FunctionCall(id="hop", name="jump", args={}),
+        ]
+        await _receive(
+            gemini, session, _response(tool_call={"function_calls": calls}), events
+        )
+        await asyncio.sleep(0.2)
+        await _receive(
+            gemini,
+            session,
+            _response(tool_call_cancellation={"ids": ["walk"]}),
+            events,
+        )
+        await _settle(gemini)
+        return _drain(events)
+
+    events = asyncio.run(turn())
+
+    assert [r.id for r in session.tool_responses[0]] == ["hop"]
+    assert _received(osc_inbox)[-1] == ("/input/MoveForward", 0)
+    assert not [e for e in events if e["type"] == "tool_cancelled"]
+    assert gemini.metrics.snapshot()["counters"]["tool_calls_cancelled"] == 1
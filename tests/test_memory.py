@@ -0,0 +1,350 @@
+"""Regression tests for MemoryManager."""
+
+import json
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.memory import MemoryManager, MemoryType  # noqa: E402
+
+# Rewording the color changes about a quarter of the features (Jaccard 0.73).
+FACT = (
+    "The user told me today that their favourite color is {} and they"
+    " really like wearing it at parties"
+)
+
+
+def _store_correction(manager: MemoryManager) -> tuple[int, int]:
+    first = manager.store_memory(FACT.format("blue"), MemoryType.LONG_TERM)
+    manager.flush()
+    second = manager.store_memory(FACT.format("green"), MemoryType.LONG_TERM)
+    manager.flush()
+    return first, second
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_reworded_correction_is_kept_at_default_threshold(tmp_path, write_behind):
+    with MemoryManager(str(tmp_path / "m.db"), write_behind=write_behind) as manager:
+        first, second = _store_correction(manager)
+
+        assert second != first
+        assert manager.get_memory(second)["content"] == FACT.format("green")
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_merged_correction_keeps_newer_content(tmp_path, write_behind):
+    with MemoryManager(
+        str(tmp_path / "m.db"), write_behind=write_behind, near_duplicate_threshold=0.7
+    ) as manager:
+        first, second = _store_correction(manager)
+
+        assert second == first
+        assert manager.get_memory(first)["content"] == FACT.format("green")
+        assert [m["id"] for m in manager.search_memories("green")] == [first]
+        assert manager.search_memories("blue") == []
+
+
+def test_delete_memories_reports_each_distinct_id_once(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        kept = manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+        gone = manager.store_memory("owns a cat", MemoryType.LONG_TERM)
+
+        assert manager.delete_memories([gone, gone, 999]) == [True, False, False]
+        assert manager.get_memory(gone) is None
+        assert manager.get_memory(kept) is not None
+
+
+def test_legacy_import_writes_non_string_values_as_json(tmp_path):
+    legacy = tmp_path / "memory.json"
+    legacy.write_text(
+        json.dumps({"name": "Nova", "likes": ["tacos", "cats"], "age": 3}),
+        encoding="utf-8",
+    )
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        assert manager.import_legacy_json(legacy)["inserted"] == 3
+        contents = {m["content"] for m in manager.fetch_all_memories()}
+        assert contents == {"name: Nova", 'likes: ["tacos", "cats"]', "age: 3"}
+
+        assert manager.import_legacy_json(legacy) == {
+            "inserted": 0,
+            "updated": 0,
+            "skipped": 3,
+        }
+
+
+def test_fetch_page_rejects_unknown_order(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        with pytest.raises(ValueError, match="Unknown order 'oldest'"):
+            manager.fetch_page(order="oldest")
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_read_results_are_json_serializable_dicts(tmp_path, write_behind):
+    with MemoryManager(str(tmp_path / "m.db"), write_behind=write_behind) as manager:
+        memory_id = manager.store_memory(
+            "likes tacos", MemoryType.LONG_TERM, tags=["food"]
+        )
+        reads = [
+            manager.get_memory(memory_id),
+            *manager.fetch_all_memories(),
+            *manager.fetch_memories(tags=["food"]),
+            *manager.fetch_page()[0],
+            *manager.search_memories("tacos"),
+            *manager.recall_memories(),
+        ]
+
+        for memory in reads:
+            assert isinstance(memory, dict)
+            assert json.loads(json.dumps(memory))["tags"] == ["food"]
+
+
+def test_memory_records_are_read_only(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+        (memory,) = manager.fetch_all_memories()
+
+        with pytest.raises(TypeError):
+            memory["content"] = "likes pizza"
+        copy = memory.to_dict()
+        copy["content"] = "likes pizza"
+        assert manager.fetch_all_memories()[0]["content"] == "likes tacos"
+
+
+def test_imported_memories_are_fingerprinted_by_merge_near_duplicates(tmp_path):
+    source = tmp_path / "memories.ndjson"
+    source.write_text(
+        "".join(
+            json.dumps({"type": "long_term", "content": FACT.format(color)}) + "\n"
+            for color in ("blue", "green")
+        ),
+        encoding="utf-8",
+    )
+    with MemoryManager(str(tmp_path / "m.db"), near_duplicate_threshold=0.7) as manager:
+        assert manager.import_ndjson(source)["inserted"] == 2
+
+        assert manager.merge_near_duplicates() == 1
+        (memory,) = manager.fetch_all_memories()
+        assert manager.store_memory(FACT.format("red"), MemoryType.LONG_TERM) == (
+            memory["id"]
+        )
+
+
+def test_writes_skip_lsh_keys_while_the_check_is_off(tmp_path):
+    with MemoryManager(
+        str(tmp_path / "m.db"), near_duplicate_threshold=None
+    ) as manager:
+        manager.store_memory(FACT.format("blue"), MemoryType.LONG_TERM)
+        manager.flush()
+        with manager._transaction() as conn:
+            assert conn.execute("SELECT lsh_0 FROM memories").fetchone()[0] is None
+
+
+def test_connections_are_per_thread_and_in_wal_mode(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        conn = manager._connect()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert manager._connect() is conn
+
+        other = []
+        worker = threading.Thread(target=lambda: other.append(manager._connect()))
+        worker.start()
+        worker.join()
+        assert other[0] is not conn
+
+
+def test_readers_are_not_blocked_by_an_open_write_transaction(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db"), busy_timeout_ms=100) as manager:
+        memory_id = manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+        with manager._transaction() as conn:
+            conn.execute("UPDATE memories SET content = 'likes pizza'")
+            seen = []
+            reader = threading.Thread(
+                target=lambda: seen.append(manager.get_memory(memory_id)["content"])
+            )
+            reader.start()
+            reader.join()
+        assert seen == ["likes tacos"]
+
+
+def test_closed_manager_refuses_new_connections(tmp_path):
+    manager = MemoryManager(str(tmp_path / "m.db"))
+    manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+    manager.close()
+
+    worker_errors = []
+
+    def read():
+        try:
+            manager.fetch_all_memories()
+        except sqlite3.ProgrammingError as e:
+            worker_errors.append(e)
+
+    worker = threading.Thread(target=read)
+    worker.start()
+    worker.join()
+    assert len(worker_errors) == 1
+
+
+def test_search_ranks_memories_matching_more_words_first(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        one = manager.store_memory("User likes tacos", MemoryType.LONG_TERM)
+        both = manager.store_memory("User likes spicy tacos", MemoryType.LONG_TERM)
+        manager.store_memory("User owns a cat", MemoryType.LONG_TERM)
+
+        assert [m["id"] for m in manager.search_memories("spicy tacos")] == [
+            both,
+            one,
+        ]
+        assert [m["id"] for m in manager.search_memories("spic")] == [both]
+        ranked = [m["id"] for m in manager.search_memories("tacos")]
+        assert [m["id"] for m in manager.search_memories("tacos", offset=1)] == [
+            ranked[1]
+        ]
+
+
+def test_search_follows_updates_deletes_and_tags(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        memory_id = manager.store_memory(
+            "User likes tacos", MemoryType.LONG_TERM, tags=["Food"]
+        )
+        gone = manager.store_memory("User likes nachos", MemoryType.LONG_TERM)
+        manager.update_memory(memory_id, content="User likes pizza")
+        manager.delete_memory(gone)
+
+        assert manager.search_memories("tacos") == []
+        assert manager.search_memories("nachos") == []
+        assert [m["id"] for m in manager.search_memories("pizza")] == [memory_id]
+        assert [m["id"] for m in manager.search_memories("food")] == [memory_id]
+
+
+@pytest.mark.parametrize("query", ['"tacos', "tacos AND (", "NEAR(*)", "", "!!"])
+def test_search_never_parses_input_as_fts_syntax(tmp_path, query):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        manager.store_memory("User likes tacos", MemoryType.LONG_TERM)
+
+        results = manager.search_memories(query)
+
+        assert [m["content"] for m in results] == (
+            ["User likes tacos"] if "tacos" in query else []
+        )
+
+
+def test_tag_filters_match_any_or_all_tags_case_insensitively(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        food = manager.store_memory("likes tacos", MemoryType.LONG_TERM, ["Food"])
+        both = manager.store_memory(
+            "likes cat food", MemoryType.LONG_TERM, ["food", "Pets"]
+        )
+        manager.store_memory("owns a bike", MemoryType.LONG_TERM, ["hobby"])
+
+        def ids(**kwargs):
+            return sorted(m["id"] for m in manager.fetch_memories(**kwargs))
+
+        assert ids(tags=["FOOD"]) == [food, both]
+        assert ids(tags=["food", "pets"], match_all_tags=True) == [both]
+        assert ids(tags=["pets", "missing"], match_all_tags=True) == []
+        assert manager.get_memory(food)["tags"] == ["Food"]
+
+
+def test_tag_index_follows_updates_and_deletes(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        memory_id = manager.store_memory("likes tacos", MemoryType.LONG_TERM, ["food"])
+        manager.update_memory(memory_id, tags=["dinner"])
+
+        assert manager.fetch_memories(tags=["food"]) == []
+        assert [m["id"] for m in manager.fetch_memories(tags=["dinner"])] == [memory_id]
+        manager.delete_memory(memory_id)
+        with manager._transaction() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM memory_tags").fetchone()[0] == 0
+
+
+def _all_pages(manager: MemoryManager, **kwargs) -> list[list[int]]:
+    pages, token = [], None
+    while True:
+        page, token = manager.fetch_page(page_size=3, page_token=token, **kwargs)
+        pages.append([m["id"] for m in page])
+        if token is None:
+            return pages
+
+
+@pytest.mark.parametrize("order", ["recent", "importance"])
+def test_pages_cover_every_memory_once_in_order(tmp_path, order):
+    with MemoryManager(str(tmp_path / "m.db"), near_duplicate_threshold=None) as m:
+        for i in range(8):
+            m.store_memory(f"fact number {i}", MemoryType.LONG_TERM, importance=i % 3)
+
+        pages = _all_pages(m, order=order)
+
+        assert [len(page) for page in pages] == [3, 3, 2]
+        expected = [memory["id"] for memory in m.fetch_memories(order=order)]
+        assert [memory_id for page in pages for memory_id in page] == expected
+        streamed = m.iter_memories(page_size=3, order=order)
+        assert [[memory["id"] for memory in page] for page in streamed] == pages
+
+
+def test_page_boundaries_hold_while_memories_are_added(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db"), near_duplicate_threshold=None) as m:
+        old = [m.store_memory(f"fact {i}", MemoryType.LONG_TERM) for i in range(4)]
+        first, token = m.fetch_page(page_size=2)
+        m.store_memory("brand new fact", MemoryType.LONG_TERM)
+        second, token = m.fetch_page(page_size=2, page_token=token)
+
+        assert [x["id"] for x in first + second] == old[::-1]
+        assert token is None
+
+
+def test_fetch_page_rejects_foreign_or_damaged_tokens(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db"), near_duplicate_threshold=None) as m:
+        for i in range(3):
+            m.store_memory(f"fact {i}", MemoryType.LONG_TERM)
+        _, token = m.fetch_page(page_size=1)
+
+        with pytest.raises(ValueError, match="Invalid page token"):
+            m.fetch_page(page_token=token, order="importance")
+        with pytest.raises(ValueError, match="Invalid page token"):
+            m.fetch_page(page_token="not a token")
+
+
+def test_stats_counters_follow_every_kind_of_write(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db"), near_duplicate_threshold=None) as m:
+        fact = m.store_memory("likes tacos", MemoryType.LONG_TERM, importance=3)
+        note = m.store_memory("call back", MemoryType.QUICK_NOTE)
+        m.store_memories(
+            [
+                {"content": "owns a cat", "memory_type": MemoryType.LONG_TERM},
+                {"content": "is in a café", "memory_type": MemoryType.SHORT_TERM},
+            ]
+        )
+        m.update_memory(fact, importance=5)
+        m.delete_memory(note)
+
+        stats = m.get_stats()
+        assert stats["total"] == 3
+        assert stats["content_bytes"] == len(
+            "likes tacosowns a catis in a café".encode()
+        )
+        assert stats["by_type"] == {"short_term": 1, "long_term": 2, "quick_note": 0}
+        assert stats["by_importance"] == {1: 2, 5: 1}
+        assert stats["oldest"] == m.get_memory(fact)["created_at"]
+
+
+def test_stats_leave_out_expired_memories(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as m:
+        m.store_memory("likes tacos", MemoryType.LONG_TERM)
+        m.store_memory(
+            "meet at noon",
+            MemoryType.QUICK_NOTE,
+            expires_at=datetime.now() - timedelta(seconds=1),
+        )
+
+        stats = m.get_stats()
+        assert stats["total"] == 1
+        assert stats["by_type"]["quick_note"] == 0
+        assert stats["content_bytes"] == len("likes tacos")
+        assert stats["newest"] == stats["oldest"]
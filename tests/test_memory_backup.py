@@ -0,0 +1,80 @@
+"""Regression tests for MemoryManager backups, snapshots and restores."""
+
+import sqlite3
+import sys
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.memory import MemoryManager, MemoryType  # noqa: E402
+
+
+def _contents(manager: MemoryManager) -> list[str]:
+    return sorted(m["content"] for m in manager.fetch_all_memories())
+
+
+def test_backup_is_a_complete_single_file_copy(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db"), write_behind=True) as manager:
+        manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+        backup = manager.backup(tmp_path / "backups" / "copy.db", pages_per_step=1)
+
+    assert sorted(path.name for path in backup.parent.iterdir()) == ["copy.db"]
+    with closing(sqlite3.connect(backup)) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    with MemoryManager(str(backup)) as copy:
+        assert _contents(copy) == ["likes tacos"]
+
+
+def test_restore_brings_back_the_backed_up_memories(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        kept = manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+        backup = manager.backup(tmp_path / "copy.db")
+        manager.update_memory(kept, content="likes pizza")
+        manager.store_memory("owns a cat", MemoryType.LONG_TERM)
+        assert manager.search_memories("pizza")
+
+        manager.restore(backup)
+
+        assert _contents(manager) == ["likes tacos"]
+        assert manager.search_memories("pizza") == []
+        assert manager.get_stats()["total"] == 1
+        assert manager.store_memory("owns a dog", MemoryType.LONG_TERM) != kept
+
+
+def test_snapshots_keep_only_the_newest(tmp_path):
+    backup_dir = tmp_path / "snapshots"
+    backup_dir.mkdir()
+    for stamp in ("20240101-000000", "20240102-000000"):
+        (backup_dir / f"m-{stamp}.db").write_bytes(b"")
+    unrelated = backup_dir / "m-notes.db"
+    unrelated.write_bytes(b"")
+
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        newest = manager.snapshot(backup_dir, keep=2)
+
+        assert manager.snapshots(backup_dir) == [
+            newest,
+            backup_dir / "m-20240102-000000.db",
+        ]
+    assert unrelated.exists()
+
+
+def test_restore_rejects_missing_or_unusable_files(tmp_path):
+    damaged = tmp_path / "damaged.db"
+    damaged.write_bytes(b"not a database" * 100)
+    other = tmp_path / "other.db"
+    with closing(sqlite3.connect(other)) as conn:
+        conn.execute("CREATE TABLE notes (text TEXT)")
+
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+
+        with pytest.raises(FileNotFoundError):
+            manager.restore(tmp_path / "missing.db")
+        for source in (damaged, other):
+            with pytest.raises(ValueError, match="Not a usable memory backup"):
+                manager.restore(source)
+        assert _contents(manager) == ["likes tacos"]
@@ -0,0 +1,87 @@
+"""Regression tests for MemoryManager's read cache."""
+
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.memory import MemoryManager, MemoryType  # noqa: E402
+
+
+def test_repeated_reads_are_served_from_cache(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+
+        first = manager.fetch_all_memories()
+        assert manager.fetch_all_memories() is first
+        info = manager.cache_info()
+        assert (info["hits"], info["misses"], info["size"]) == (1, 1, 1)
+
+
+def test_writes_invalidate_cached_reads(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        memory_id = manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+        assert manager.get_memory(memory_id)["content"] == "likes tacos"
+
+        manager.update_memory(memory_id, content="likes pizza")
+        assert manager.get_memory(memory_id)["content"] == "likes pizza"
+        manager.delete_memory(memory_id)
+        assert manager.get_memory(memory_id) is None
+        assert manager.get_stats()["total"] == 0
+
+
+def test_commits_from_other_connections_invalidate_the_cache(tmp_path):
+    db_path = tmp_path / "m.db"
+    with MemoryManager(str(db_path)) as manager:
+        memory_id = manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+        assert manager.get_stats()["total"] == 1
+
+        with closing(sqlite3.connect(db_path)) as other:
+            other.execute(
+                "UPDATE memories SET content = 'likes pizza' WHERE id = ?",
+                (memory_id,),
+            )
+            other.commit()
+
+        assert manager.get_memory(memory_id)["content"] == "likes pizza"
+        assert manager.cache_info()["invalidations"] >= 1
+
+
+def test_cached_results_are_dropped_when_a_memory_expires(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        manager.store_memory(
+            "meet at the cafe",
+            MemoryType.QUICK_NOTE,
+            expires_at=datetime.now() + timedelta(seconds=0.2),
+        )
+        assert len(manager.fetch_all_memories()) == 1
+
+        time.sleep(0.3)
+        assert manager.fetch_all_memories() == []
+
+
+def test_cache_can_be_disabled_or_expire(tmp_path):
+    with MemoryManager(str(tmp_path / "off.db"), cache_size=0) as manager:
+        manager.fetch_all_memories()
+        manager.fetch_all_memories()
+        assert manager.cache_info()["hits"] == 0
+
+    with MemoryManager(str(tmp_path / "ttl.db"), cache_ttl_seconds=0.1) as manager:
+        first = manager.fetch_all_memories()
+        time.sleep(0.2)
+        assert manager.fetch_all_memories() is not first
+
+
+def test_cache_keeps_at_most_cache_size_entries(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db"), cache_size=2) as manager:
+        ids = [
+            manager.store_memory(f"fact number {i}", MemoryType.LONG_TERM)
+            for i in range(3)
+        ]
+        for memory_id in ids:
+            manager.get_memory(memory_id)
+        assert manager.cache_info()["size"] == 2
@@ -0,0 +1,94 @@
+"""Regression tests for MemoryRouter."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import classes.tool_definitions as tool_definitions  # noqa: E402
+from classes.memory import MemoryManager, MemoryType  # noqa: E402
+from classes.memory_router import MemoryRouter  # noqa: E402
+
+FD_DIR = Path("/proc/self/fd")
+
+
+@pytest.mark.skipif(not FD_DIR.exists(), reason="needs /proc/self/fd")
+def test_evicted_shards_release_their_file_descriptors(tmp_path):
+    router = MemoryRouter(
+        str(tmp_path / "memories.db"),
+        str(tmp_path / "shards"),
+        max_open=1,
+        write_behind=True,
+        vector_index=True,
+    )
+    try:
+        for i in range(20):
+            router.set_context(f"world-{i}")
+            router.store_memory(
+                f"tacos at the party in world {i}", MemoryType.LONG_TERM
+            )
+        router.search_shards("tacos", method="semantic_search")
+        baseline = len(os.listdir(FD_DIR))
+
+        for _ in range(3):
+            router.search_shards("tacos", method="semantic_search")
+            for i in range(20):
+                router.set_context(f"world-{i}")
+                router.store_memory(f"more tacos in world {i}", MemoryType.LONG_TERM)
+
+        assert len(os.listdir(FD_DIR)) <= baseline
+    finally:
+        router.close()
+
+
+@pytest.fixture
+def router(tmp_path):
+    with MemoryRouter(str(tmp_path / "memories.db"), str(tmp_path / "shards")) as r:
+        yield r
+
+
+def _cross_context_hit(tools, query):
+    result = json.loads(tools["search_all_memory_contexts"](query))
+    row = dict(zip(result["columns"], result["rows"][0]))
+    return row["id"], row["context"]
+
+
+def test_cross_context_results_are_updated_and_deleted_in_their_shard(router):
+    tools = tool_definitions._memory_tool_mapping(router, 6000)
+    router.store_memory("default shard note", MemoryType.LONG_TERM)
+    router.set_context("world:cafe")
+    cafe_id = router.store_memory("the cafe serves tacos", MemoryType.LONG_TERM)
+    router.set_context(None)
+    # Both shards numbered their first memory 1.
+    memory_id, context = _cross_context_hit(tools, "tacos")
+    assert (memory_id, context) == (cafe_id, "world:cafe")
+
+    assert tools["update_memory"](memory_id, "the cafe sells tacos", context=context)
+    assert router.get_memory(memory_id)["content"] == "default shard note"
+    with router.lease(context) as cafe:
+        assert cafe.get_memory(memory_id)["content"] == "the cafe sells tacos"
+
+    deleted = json.loads(tools["delete_memories"]([memory_id], context=context))
+    assert deleted == [{"memory_id": memory_id, "deleted": True}]
+    assert router.get_memory(memory_id) is not None
+
+
+def test_context_switches_are_serialized_with_every_memory_tool(router):
+    groups = {
+        tool_definitions.TOOL_CONFLICT_GROUPS.get(name)
+        for name in tool_definitions._memory_tool_mapping(router, 6000)
+    }
+    assert groups == {tool_definitions.TOOL_CONFLICT_GROUPS["switch_memory_context"]}
+
+
+def test_context_argument_needs_sharded_memories(tmp_path):
+    with MemoryManager(str(tmp_path / "m.db")) as manager:
+        tools = tool_definitions._memory_tool_mapping(manager, 6000)
+        memory_id = tools["save_long_term_memory"]("single database note")
+        assert tools["delete_memory"](memory_id, context="default")
+        result = json.loads(tools["delete_memory"](memory_id, context="world:cafe"))
+        assert result == {"error": "Memory contexts are not enabled"}
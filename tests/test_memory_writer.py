@@ -0,0 +1,85 @@
+"""Regression tests for MemoryManager's write-behind queue."""
+
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.memory import MemoryManager, MemoryType  # noqa: E402
+
+
+def _stored_ids(db_path: Path) -> list[int]:
+    """IDs committed to the database, read without the manager."""
+    with closing(sqlite3.connect(db_path)) as conn:
+        return [row[0] for row in conn.execute("SELECT id FROM memories ORDER BY id")]
+
+
+def _queueing_manager(db_path: Path, **kwargs) -> MemoryManager:
+    """Write-behind manager whose flusher only runs when asked to."""
+    return MemoryManager(
+        str(db_path),
+        write_behind=True,
+        flush_interval_ms=60_000,
+        flush_max_rows=1000,
+        **kwargs,
+    )
+
+
+def test_queued_writes_are_visible_to_reads(tmp_path):
+    db_path = tmp_path / "m.db"
+    with _queueing_manager(db_path) as manager:
+        first = manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+        second = manager.store_memory("owns a cat", MemoryType.LONG_TERM)
+        assert _stored_ids(db_path) == []
+
+        assert manager.get_memory(second)["content"] == "owns a cat"
+        assert _stored_ids(db_path) == []
+        assert [m["id"] for m in manager.fetch_all_memories()] == [second, first]
+        assert _stored_ids(db_path) == [first, second]
+        assert manager.flush() == 0
+
+
+def test_close_writes_queued_memories(tmp_path):
+    db_path = tmp_path / "m.db"
+    manager = _queueing_manager(db_path)
+    memory_id = manager.store_memory("likes tacos", MemoryType.LONG_TERM)
+    manager.close()
+
+    assert _stored_ids(db_path) == [memory_id]
+
+
+def test_reserved_ids_never_collide_with_other_writers(tmp_path):
+    db_path = tmp_path / "m.db"
+    with _queueing_manager(
+        db_path, near_duplicate_threshold=None
+    ) as queued, MemoryManager(str(db_path)) as direct:
+        reserved = queued.store_memory("likes tacos", MemoryType.LONG_TERM)
+        other = direct.store_memory("owns a cat", MemoryType.LONG_TERM)
+        # Past the reserved block, so a second block is reserved.
+        later = [
+            queued.store_memory(f"fact number {i}", MemoryType.LONG_TERM)
+            for i in range(1000)
+        ]
+        queued.flush()
+
+        ids = [reserved, other, *later]
+        assert len(set(ids)) == len(ids)
+        assert _stored_ids(db_path) == sorted(ids)
+
+
+def test_flush_max_rows_wakes_the_flusher(tmp_path):
+    db_path = tmp_path / "m.db"
+    with MemoryManager(
+        str(db_path), write_behind=True, flush_interval_ms=60_000, flush_max_rows=2
+    ) as manager:
+        ids = [
+            manager.store_memory(f"fact number {i}", MemoryType.LONG_TERM)
+            for i in range(2)
+        ]
+        deadline = time.monotonic() + 5
+        while _stored_ids(db_path) != ids and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _stored_ids(db_path) == ids
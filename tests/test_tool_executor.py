@@ -0,0 +1,91 @@
+"""Regression tests for ToolExecutor."""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.tool_executor import ToolExecutor, ToolTimeoutError  # noqa: E402
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_sync_tools_run_on_their_own_pool():
+    executor = ToolExecutor(tool_pools={"capture": "cpu", "odd": "missing"})
+    try:
+        worker = _run(executor.run("capture", threading.current_thread, {}))
+        assert worker.name.startswith("tool-cpu")
+        assert executor.pool_of("capture") == "cpu"
+        assert executor.pool_of("odd") == "io"
+        assert executor.pool_of("unlisted") == "io"
+    finally:
+        executor.shutdown()
+
+
+def test_per_tool_timeouts_override_the_default():
+    executor = ToolExecutor(timeout_seconds=5, timeouts={"slow": 0, "quick": 0.5})
+
+    assert executor.timeout_of("other") == 5
+    assert executor.timeout_of("quick") == 0.5
+    assert executor.timeout_of("slow") is None
+
+
+@pytest.mark.parametrize("sync", [True, False])
+def test_timed_out_calls_raise_a_structured_error(sync):
+    release = threading.Event()
+
+    def blocking():
+        release.wait(5)
+
+    async def sleeping():
+        await asyncio.sleep(5)
+
+    executor = ToolExecutor(timeout_seconds=0.05)
+    try:
+        with pytest.raises(ToolTimeoutError) as raised:
+            _run(executor.run("lookup", blocking if sync else sleeping, {}))
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert raised.value.result == {
+        "error": "timeout",
+        "tool": "lookup",
+        "timeout_seconds": 0.05,
+        "message": "lookup did not finish within 0.05 s and was abandoned;"
+        " try again later",
+    }
+    assert executor.metrics.snapshot()["counters"]["tool_timeouts"] == 1
+    assert executor.metrics.summary("tool_ms.lookup")["count"] == 1
+
+
+def test_call_timing_out_in_the_queue_never_runs():
+    release = threading.Event()
+    ran = []
+    executor = ToolExecutor(
+        workers={"osc": 1}, tool_pools={"hold": "osc", "queued": "osc"}
+    )
+
+    async def turn():
+        holding = asyncio.ensure_future(
+            executor.run("hold", lambda: release.wait(5), {})
+        )
+        await asyncio.sleep(0.05)
+        executor.timeouts["queued"] = 0.05
+        with pytest.raises(ToolTimeoutError):
+            await executor.run("queued", lambda: ran.append(True), {})
+        assert executor.queue_depths()["osc"] == 0
+        release.set()
+        await holding
+
+    try:
+        _run(turn())
+    finally:
+        executor.shutdown()
+    assert ran == []
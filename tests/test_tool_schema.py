@@ -0,0 +1,100 @@
+"""Regression tests for ToolSchema declarations and argument coercion."""
+
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes import tool_definitions, tool_schema  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def schema():
+    return tool_schema.ToolSchema.build(tool_definitions.get_tool_definitions())
+
+
+def test_every_registered_tool_is_declared_with_its_optional_parameters(schema):
+    names = [d.name for d in schema.declarations]
+    assert names == [f.__name__ for f in tool_definitions.get_tool_definitions()]
+
+    save = tool_schema.declare(tool_definitions.save_long_term_memory)
+    assert save.parameters.required == ["content"]
+    assert save.parameters.properties["tags"].items.type == "STRING"
+    assert save.parameters.properties["importance"].description.startswith(
+        "Importance level"
+    )
+    assert "Args:" not in save.description
+
+
+def test_arguments_are_coerced_to_the_declared_types(schema):
+    assert schema.coerce(
+        "save_long_term_memory", {"content": 42, "tags": "food", "importance": "3"}
+    ) == {"content": "42", "tags": ["food"], "importance": 3}
+    assert schema.coerce(
+        "update_memories", {"updates": [{"memory_id": "7", "importance": 2.0}]}
+    ) == {"updates": [{"memory_id": 7, "importance": 2}]}
+    assert schema.coerce("capture_screenshot", None) == {}
+
+
+@pytest.mark.parametrize(
+    "name, args, message",
+    [
+        ("no_such_tool", {}, "unknown tool"),
+        ("jump", {"height": 2}, "unknown parameter height"),
+        ("save_long_term_memory", {}, "missing content"),
+        ("save_long_term_memory", {"content": "x", "importance": 1.5}, "whole"),
+        ("look_left", {"seconds": "soon"}, "expected a number"),
+        ("look_left", {"seconds": True}, "expected a number"),
+        ("update_memories", {"updates": [{"content": "x"}]}, "missing memory_id"),
+    ],
+)
+def test_invalid_arguments_raise_tool_argument_errors(schema, name, args, message):
+    with pytest.raises(tool_schema.ToolArgumentError, match=message) as raised:
+        schema.coerce(name, args)
+
+    assert raised.value.result["error"] == "invalid_arguments"
+    assert raised.value.result["tool"] == name
+
+
+def test_undeclarable_tools_are_rejected():
+    def no_docs(seconds: float):
+        pass
+
+    def untyped(seconds):
+        """Wait.
+
+        Args:
+            seconds: How long.
+        """
+
+    def union(value: Optional[int | str] = None):
+        """Set a value.
+
+        Args:
+            value: The value.
+        """
+
+    with pytest.raises(tool_schema.ToolSchemaError, match="missing description"):
+        tool_schema.ToolSchema.build([no_docs])
+    with pytest.raises(tool_schema.ToolSchemaError, match="missing type annotation"):
+        tool_schema.ToolSchema.build([untyped])
+    with pytest.raises(tool_schema.ToolSchemaError, match="unions are not supported"):
+        tool_schema.ToolSchema.build([union])
+
+
+def test_declarations_are_cached_on_disk(tmp_path):
+    functions = tool_definitions.get_tool_definitions()
+    cache_path = tmp_path / "tools.json"
+    built = tool_schema.ToolSchema.build(functions)
+    built._write_cache("key", str(cache_path))
+
+    loaded = tool_schema.ToolSchema._read_cache("key", str(cache_path))
+    assert [d.name for d in loaded.declarations] == [d.name for d in built.declarations]
+    assert tool_schema.ToolSchema._read_cache("other key", str(cache_path)) is None
+
+    cache_path.write_text(json.dumps({"key": "key"}), encoding="utf-8")
+    assert tool_schema.ToolSchema._read_cache("key", str(cache_path)) is None
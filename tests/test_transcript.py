@@ -0,0 +1,86 @@
+"""Regression tests for TranscriptStore."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.transcript import TranscriptStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TranscriptStore(str(tmp_path / "t.db"), flush_interval_ms=50)
+    yield store
+    store.close()
+
+
+def _say(store: TranscriptStore, speaker: str, *fragments: str) -> None:
+    for text in fragments:
+        store.handle_event({"type": speaker, "text": text})
+
+
+def _utterances(store: TranscriptStore) -> list[tuple]:
+    return [
+        (u["speaker"], u["text"], u["interrupted"])
+        for u in store.recent(session_id=store.session_id)
+    ]
+
+
+def test_fragments_join_into_one_utterance_per_speaker_and_turn(store):
+    _say(store, "user", "What's ", "your  favourite", " food?")
+    _say(store, "gemini", "Ta", "cos!")
+    store.handle_event({"type": "turn_complete"})
+    _say(store, "user", "Nice.")
+    _say(store, "gemini", "I could talk about")
+    store.handle_event({"type": "interrupted"})
+    store.handle_event({"type": "audio", "data": b"ignored"})
+
+    assert _utterances(store) == [
+        ("user", "What's your favourite food?", False),
+        ("gemini", "Tacos!", False),
+        ("user", "Nice.", False),
+        ("gemini", "I could talk about", True),
+    ]
+
+
+def test_long_utterances_are_cut_at_max_utterance_chars(tmp_path):
+    store = TranscriptStore(str(tmp_path / "t.db"), max_utterance_chars=10)
+    try:
+        _say(store, "gemini", "12345", "67890", "abc")
+        store.handle_event({"type": "turn_complete"})
+
+        assert [text for _, text, _ in _utterances(store)] == ["1234567890", "abc"]
+    finally:
+        store.close()
+
+
+def test_search_finds_words_and_prefixes_best_match_first(store):
+    _say(store, "user", "I like tacos")
+    _say(store, "gemini", "Spicy tacos are the best tacos")
+    _say(store, "user", "What about pizza?")
+    store.handle_event({"type": "turn_complete"})
+
+    assert [u["text"] for u in store.search("tacos")] == [
+        "Spicy tacos are the best tacos",
+        "I like tacos",
+    ]
+    assert [u["text"] for u in store.search("piz")] == ["What about pizza?"]
+    assert [u["text"] for u in store.search("tacos", offset=1)] == ["I like tacos"]
+    assert store.search("!!") == []
+
+
+def test_close_stores_unfinished_utterances_for_later_sessions(tmp_path):
+    db_path = str(tmp_path / "t.db")
+    first = TranscriptStore(db_path)
+    _say(first, "user", "Remember the cafe")
+    first.close()
+
+    second = TranscriptStore(db_path)
+    try:
+        assert [u["session_id"] for u in second.search("cafe")] == [first.session_id]
+        assert second.recent(session_id=second.session_id) == []
+    finally:
+        second.close()